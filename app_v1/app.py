@@ -25,7 +25,7 @@ from app_v1.routers import (
     terms,
     users,
 )
-from app_v1.services import load_data
+from app_v1.services import flush_data, load_data
 
 APP_VERSION = "0.1.0"
 _ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -39,6 +39,7 @@ async def lifespan(app: FastAPI):
             logging.warning("LDNOOBW dictionary %s not found in %s", filename, data_dir)
     _ = load_data()
     yield
+    flush_data()
 
 
 app = FastAPI(
@@ -18,7 +18,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app_v1.deps import get_current_user, require_role
 from app_v1.schemas import ErrorResponse, RoleUpdate, RoleUpdateResponse, User, UserListResponse
-from app_v1.services import delete_user, get_post, get_user, get_users, load_data, lock_post, shadowban_user, sticky_post, update_user_roles
+from app_v1.services import delete_user, get_post_summary, get_user, get_users, get_users_enrichment, load_data, lock_post, migrate_timestamps, rebuild_user_karma, rebuild_vote_counters, shadowban_user, sticky_post, update_user_roles
 from app_v1.utils.roles import Role
 
 router = APIRouter(
@@ -60,7 +60,9 @@ def list_users_admin(
 
     Retorna usuarios ordenados por ID ascendente. El campo password se omite
     de todos los registros. A diferencia de GET /users (público), este endpoint
-    muestra datos completos incluyendo roles. Solo accesible para administradores.
+    muestra datos completos incluyendo roles. Posts y karma de la página se
+    obtienen con una sola llamada a get_users_enrichment(). Solo accesible
+    para administradores.
 
     Args:
         limit: Número máximo de usuarios a retornar (1-200, default 50).
@@ -79,7 +81,8 @@ def list_users_admin(
     sliced = users[:limit]
     has_more = len(users) > limit
     next_cursor = sliced[-1]["id"] if sliced and has_more else None
-    items = [_sanitize(u) for u in sliced]
+    enrichment = get_users_enrichment([u["id"] for u in sliced])
+    items = [{**_sanitize(u), **enrichment[u["id"]]} for u in sliced]
     return UserListResponse(items=items, limit=limit, next_cursor=next_cursor)
 
 
@@ -275,7 +278,7 @@ def lock_post_admin(post_id: int) -> dict:
         HTTPException 403: Si el usuario no tiene rol admin.
         HTTPException 404: Si el post no existe.
     """
-    post = get_post(post_id)
+    post = get_post_summary(post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     updated = lock_post(post_id)
@@ -312,7 +315,7 @@ def sticky_post_admin(post_id: int) -> dict:
         HTTPException 403: Si el usuario no tiene rol admin.
         HTTPException 404: Si el post no existe.
     """
-    post = get_post(post_id)
+    post = get_post_summary(post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     updated = sticky_post(post_id)
@@ -371,3 +374,70 @@ def shadowban_user_admin(
         "shadowbanned": updated.get("shadowbanned", True),
         "detail": "User shadowbanned",
     }
+
+
+@router.post(
+    "/maintenance/vote-counters",
+    responses={status.HTTP_403_FORBIDDEN: {"model": ErrorResponse}},
+)
+def rebuild_vote_counters_admin() -> dict:
+    """
+    Recalcula los contadores de votos de posts y comentarios. Solo admin.
+
+    Rutina de reparación: reconstruye upvotes/downvotes/score de cada
+    entity a partir de la colección de votos. Idempotente.
+
+    Returns:
+        Dict con repaired (entities corregidos) y detail.
+
+    Raises:
+        HTTPException 401: Si no se provee un token válido.
+        HTTPException 403: Si el usuario no tiene rol admin.
+    """
+    repaired = rebuild_vote_counters()
+    return {"repaired": repaired, "detail": "Vote counters rebuilt"}
+
+
+@router.post(
+    "/maintenance/karma",
+    responses={status.HTTP_403_FORBIDDEN: {"model": ErrorResponse}},
+)
+def rebuild_user_karma_admin() -> dict:
+    """
+    Recalcula desde cero el karma materializado de todos los usuarios. Solo admin.
+
+    Rutina de reparación: reconstruye post_karma/comment_karma a partir
+    de la colección de votos. Idempotente.
+
+    Returns:
+        Dict con repaired (usuarios corregidos) y detail.
+
+    Raises:
+        HTTPException 401: Si no se provee un token válido.
+        HTTPException 403: Si el usuario no tiene rol admin.
+    """
+    repaired = rebuild_user_karma()
+    return {"repaired": repaired, "detail": "User karma rebuilt"}
+
+
+@router.post(
+    "/maintenance/timestamps",
+    responses={status.HTTP_403_FORBIDDEN: {"model": ErrorResponse}},
+)
+def migrate_timestamps_admin() -> dict:
+    """
+    Migra las fechas de posts, comentarios y boards heredados. Solo admin.
+
+    Migración única: normaliza created_at/updated_at y guarda
+    created_epoch en los registros anteriores a la normalización al
+    escribir. Idempotente.
+
+    Returns:
+        Dict con migrated (registros migrados) y detail.
+
+    Raises:
+        HTTPException 401: Si no se provee un token válido.
+        HTTPException 403: Si el usuario no tiene rol admin.
+    """
+    migrated = migrate_timestamps()
+    return {"migrated": migrated, "detail": "Timestamps migrated"}
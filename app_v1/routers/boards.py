@@ -15,11 +15,12 @@ posts, los comentarios de esos posts y los votos asociados.
 """
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app_v1.deps import get_current_user, require_role
 from app_v1.schemas import Board, BoardCreate, BoardListResponse, BoardUpdate, ErrorResponse
-from app_v1.services import create_board, delete_board, get_board, list_boards, update_board
+from app_v1.services import create_board, delete_board, get_board, get_read_version, list_boards, update_board
+from app_v1.utils.conditional import not_modified
 from app_v1.utils.content import enforce_clean_text
 from app_v1.utils.roles import Role
 
@@ -31,6 +32,8 @@ router = APIRouter(prefix="/boards", tags=["Boards"])
     response_model=BoardListResponse,
 )
 def list_all_boards(
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[int] = Query(default=None, description="Resume from board id greater than this value."),
 ) -> BoardListResponse:
@@ -42,14 +45,23 @@ def list_all_boards(
     calculado al vuelo.
     Endpoint público (no requiere autenticación).
 
+    GET condicional: la respuesta lleva ETag y Last-Modified; si ningún
+    board ni post cambió desde la versión del cliente, se responde 304.
+
     Args:
+        request: Request entrante (If-None-Match / If-Modified-Since).
+        response: Response donde se agregan ETag y Last-Modified.
         limit: Número máximo de boards a retornar (1-200, default 50).
         cursor: ID del último board visto. Si se omite, retorna desde el inicio.
 
     Returns:
         BoardListResponse con items (lista de Board), limit y next_cursor
-        (ID del último item si hay más páginas, null si es la última página).
+        (ID del último item si hay más páginas, null si es la última página),
+        o 304 si el cliente ya tiene esta versión.
     """
+    unchanged = not_modified(request, response, *get_read_version(("boards", "posts")))
+    if unchanged is not None:
+        return unchanged
     boards = list_boards()
     if cursor is not None:
         boards = [board for board in boards if board.get("id") > cursor]
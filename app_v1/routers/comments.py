@@ -5,6 +5,11 @@ Los comentarios soportan anidación mediante el campo parent_id.
 La respuesta siempre es un árbol con replies anidados hasta
 un máximo de 6 niveles de profundidad.
 
+Los listados pueden recortar el árbol por nivel si se pide (max_depth,
+replies_limit; sin ellos se retorna completo); los comentarios
+recortados traen more_replies y replies_cursor, y se continúan con
+GET /comments/{id}/replies.
+
 Reglas de anidación:
   - parent_id=null → comentario raíz (depth=0).
   - parent_id=<id> → reply al comentario con ese ID.
@@ -17,11 +22,22 @@ build_comment_tree() en las respuestas de lectura.
 """
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app_v1.deps import get_current_user
-from app_v1.schemas import Comment, CommentCreate, CommentUpdate, CommentListResponse, ErrorResponse
-from app_v1.services import build_comment_tree, create_comment, delete_comment, get_comment, get_comments, get_comments_for_post, get_post, update_comment
+from app_v1.schemas import Comment, CommentCreate, CommentUpdate, CommentListResponse, CommentSort, ErrorResponse
+from app_v1.services import (
+    COMMENT_MAX_DEPTH,
+    create_comment,
+    delete_comment,
+    get_comment,
+    get_comment_page,
+    get_post_summary,
+    get_read_version,
+    get_reply_page,
+    update_comment,
+)
+from app_v1.utils.conditional import not_modified
 from app_v1.utils.content import enforce_clean_text
 from app_v1.utils.helpers import sanitize_html
 
@@ -92,7 +108,7 @@ def create_new_comment(
         HTTPException 404: Si el post (post_id) no existe.
         HTTPException 404: Si parent_id no existe.
     """
-    post = get_post(payload.post_id)
+    post = get_post_summary(payload.post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     if post.get("locked"):
@@ -142,7 +158,7 @@ def delete_existing_comment(comment_id: int, current_user: dict = Depends(get_cu
         HTTPException 403: Si el usuario no es owner ni mod/admin.
         HTTPException 404: Si el comentario no existe.
     """
-    comment = next((c for c in get_comments() if c.get("id") == comment_id), None)
+    comment = get_comment(comment_id)
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
     _check_comment_ownership(comment, current_user)
@@ -176,8 +192,6 @@ def get_comment_by_id(comment_id: int) -> Comment:
     comment = get_comment(comment_id)
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-    comment.setdefault("replies", [])
-    comment.setdefault("depth", 0)
     return comment
 
 
@@ -222,19 +236,95 @@ def update_existing_comment(
     enforce_clean_text(payload.body)
     body = sanitize_html(payload.body)
     updated = update_comment(comment_id, body)
-    updated.setdefault("replies", [])
-    updated.setdefault("depth", 0)
     return updated
 
 
+@router.get(
+    "/{comment_id}/replies",
+    response_model=CommentListResponse,
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+    },
+)
+def list_comment_replies(
+    comment_id: int,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[int] = Query(default=None, description="Id of the last reply seen (next_cursor or replies_cursor)."),
+    max_depth: int = Query(
+        COMMENT_MAX_DEPTH,
+        ge=0,
+        le=COMMENT_MAX_DEPTH,
+        description="Levels of replies to include below each reply.",
+    ),
+    replies_limit: Optional[int] = Query(
+        None, ge=1, le=50, description="Maximum replies included per comment (default: all)."
+    ),
+    sort: CommentSort = Query(
+        CommentSort.old, description="Order within each group of siblings: old (default), new, top, controversial, best"
+    ),
+) -> CommentListResponse:
+    """
+    Lista las replies directas de un comentario, con su subárbol, por páginas.
+
+    Es el "cargar más respuestas" de los árboles recortados: un comentario
+    con more_replies > 0 se continúa con ?cursor=<replies_cursor> (o sin
+    cursor si replies_cursor es null). Cada reply trae hasta max_depth
+    niveles y hasta replies_limit replies por comentario, con los mismos
+    marcadores de recorte. Para continuar un recorte hay que pedir el
+    mismo sort que el listado de origen.
+
+    Endpoint público (no requiere autenticación).
+
+    Args:
+        comment_id: ID del comentario cuyas replies se quieren listar.
+        limit: Número máximo de replies directas a retornar (1-100, default 50).
+        cursor: ID de la última reply vista para continuar la paginación.
+        max_depth: Niveles de replies bajo cada reply (0-6, default 6:
+            todos).
+        replies_limit: Máximo de replies por comentario (1-50, default
+            None: todas).
+        sort: Orden de cada grupo de hermanos (default old).
+
+    Returns:
+        CommentListResponse con items (replies con su subárbol recortado),
+        limit y next_cursor.
+
+    Raises:
+        HTTPException 400: Si el cursor no corresponde a un comentario del árbol.
+        HTTPException 404: Si el comentario no existe.
+    """
+    try:
+        page = get_reply_page(comment_id, limit, cursor, max_depth, replies_limit, sort.value)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+    items, next_cursor = page
+    return CommentListResponse(items=items, limit=limit, next_cursor=next_cursor)
+
+
 @router.get(
     "",
     response_model=CommentListResponse,
 )
 def list_comments(
+    request: Request,
+    response: Response,
     post_id: int = Query(..., ge=1, description="Filter comments by post id."),
     limit: int = Query(50, ge=1, le=200),
-    cursor: Optional[int] = Query(default=None, description="Resume from root comment id greater than this value."),
+    cursor: Optional[int] = Query(default=None, description="Id of the last root comment seen (next_cursor)."),
+    max_depth: int = Query(
+        COMMENT_MAX_DEPTH,
+        ge=0,
+        le=COMMENT_MAX_DEPTH,
+        description="Levels of replies to include below each root comment.",
+    ),
+    replies_limit: Optional[int] = Query(
+        None, ge=1, le=50, description="Maximum replies included per comment (default: all)."
+    ),
+    sort: CommentSort = Query(
+        CommentSort.old, description="Order within each group of siblings: old (default), new, top, controversial, best"
+    ),
 ) -> CommentListResponse:
     """
     Lista los comentarios de un post como árbol anidado con paginación.
@@ -245,31 +335,45 @@ def list_comments(
     con path parameter.
 
     La paginación actúa sobre comentarios raíz: el cursor filtra
-    raíces con id > cursor. Los replies se incluyen completos para
-    cada raíz retornada.
+    raíces con id > cursor. Bajo cada raíz se incluyen hasta max_depth
+    niveles de replies y hasta replies_limit replies por comentario (por
+    defecto, el árbol completo); los recortados se continúan con GET /comments/{id}/replies. sort ordena
+    cada grupo de hermanos (ver GET /posts/{post_id}/comments).
+
+    GET condicional con el mismo ETag que GET /posts/{post_id}/comments:
+    304 si ningún comentario del post cambió.
 
     Endpoint público (no requiere autenticación).
 
     Args:
+        request: Request entrante (If-None-Match / If-Modified-Since).
+        response: Response donde se agregan ETag y Last-Modified.
         post_id: ID del post cuyos comentarios se quieren listar (requerido).
         limit: Número máximo de comentarios raíz a retornar (1-200, default 50).
         cursor: ID del último comentario raíz visto para continuar la paginación.
+        max_depth: Niveles de replies bajo cada raíz (0-6, default 6:
+            todos).
+        replies_limit: Máximo de replies por comentario (1-50, default
+            None: todas).
+        sort: Orden de cada grupo de hermanos (default old).
 
     Returns:
         CommentListResponse con items (árbol de comentarios raíz con replies
-        anidados), limit y next_cursor.
+        anidados), limit y next_cursor, o 304 si el cliente ya tiene esta
+        versión.
 
     Raises:
+        HTTPException 400: Si el cursor no corresponde a un comentario del árbol.
         HTTPException 404: Si el post no existe.
         HTTPException 422: Si post_id se omite o es menor a 1.
     """
-    if not get_post(post_id):
+    if not get_post_summary(post_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    all_comments = get_comments_for_post(post_id)
-    tree = build_comment_tree(all_comments)
-    if cursor is not None:
-        tree = [c for c in tree if c.get("id") > cursor]
-    sliced = tree[:limit]
-    has_more = len(tree) > limit
-    next_cursor = sliced[-1]["id"] if sliced and has_more else None
-    return CommentListResponse(items=sliced, limit=limit, next_cursor=next_cursor)
+    unchanged = not_modified(request, response, *get_read_version(post_id=post_id))
+    if unchanged is not None:
+        return unchanged
+    try:
+        items, next_cursor = get_comment_page(post_id, limit, cursor, max_depth, replies_limit, sort.value)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return CommentListResponse(items=items, limit=limit, next_cursor=next_cursor)
@@ -28,7 +28,7 @@ from app_v1.services import (
     get_user,
     delete_user,
     ban_user,
-    get_post,
+    get_post_summary,
     delete_post,
     get_comment,
     delete_comment,
@@ -186,7 +186,7 @@ def moderation_actions(payload: ModerationActionRequest):
     # POST
     if payload.target_type == TargetType.post:
         if payload.action == ActionType.remove:
-            post = get_post(payload.target_id)
+            post = get_post_summary(payload.target_id)
             if not post:
                 raise HTTPException(status_code=404, detail="Post no encontrado")
             ok = delete_post(payload.target_id)
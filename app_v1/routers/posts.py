@@ -10,21 +10,29 @@ Sorting disponible en GET /posts via ?sort=:
   - hot  → algoritmo score = votos / (horas_desde_creación + 2)^1.5,
             decae con el tiempo favoreciendo posts recientes y votados.
 
-Nota: el cursor de paginación es siempre por ID, independientemente
-del sort elegido. Mezclar cursor con sort!=new puede producir
-páginas incompletas si los IDs no coinciden con el orden de sort.
+Los tres órdenes salen de feeds precalculados en la capa de servicios
+(globales y por board); una página es un recorrido parcial del feed.
+
+Paginación keyset: next_cursor es un token opaco con la clave de orden
+y el ID del último post de la página, válido solo para el mismo sort.
+Por compatibilidad se sigue aceptando un ID numérico como cursor.
 
 Cascade delete: eliminar un post elimina todos sus comentarios
 y los votos sobre el post y sus comentarios.
+
+GET /posts y GET /posts/{id}/comments son GET condicionales: llevan
+ETag y Last-Modified, y con If-None-Match / If-Modified-Since vigentes
+responden 304 sin armar la respuesta (ver utils/conditional.py).
 """
 from enum import Enum
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app_v1.deps import get_current_user
 from app_v1.schemas import (
     CommentListResponse,
+    CommentSort,
     ErrorResponse,
     Post,
     PostCreate,
@@ -32,16 +40,19 @@ from app_v1.schemas import (
     PostUpdate,
 )
 from app_v1.services import (
-    build_comment_tree,
+    COMMENT_MAX_DEPTH,
     create_post,
     delete_post,
     get_board,
-    get_comments_for_post,
+    get_comment_page,
     get_post,
+    get_post_summary,
     get_posts,
-    get_posts_sorted,
+    get_posts_page,
+    get_read_version,
     update_post,
 )
+from app_v1.utils.conditional import not_modified
 from app_v1.utils.content import enforce_clean_text
 from app_v1.utils.helpers import sanitize_html
 
@@ -84,12 +95,25 @@ def _check_post_ownership(post: dict, current_user: dict) -> None:
 @router.get(
     "",
     response_model=PostListResponse,
-    responses={status.HTTP_404_NOT_FOUND: {"model": ErrorResponse}},
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorResponse},
+        status.HTTP_404_NOT_FOUND: {"model": ErrorResponse},
+    },
 )
 def list_posts(
+    request: Request,
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
-    cursor: Optional[int] = Query(default=None, description="Resume from post id greater than this value."),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque next_cursor from the previous page (same sort). A numeric post id is accepted for compatibility.",
+    ),
     sort: SortMode = Query(SortMode.new, description="Sort order: new (default), top, hot"),
+    include_comments: bool = Query(
+        True,
+        description="If false, return summary posts: comment_count only, empty comments.",
+    ),
+    board_id: Optional[int] = Query(default=None, description="Only posts from this board."),
 ) -> PostListResponse:
     """
     Lista posts con paginación cursor-based y ordenamiento configurable.
@@ -98,34 +122,59 @@ def list_posts(
     campo comments, además de comment_count, votes, score, tags y
     attachments. Endpoint público (no requiere autenticación).
 
+    Con include_comments=false se retorna la proyección resumida: cada
+    post trae comment_count pero comments vacío, sin construir árboles.
+    Es el modo recomendado para feeds.
+
     Criterios de sort:
     - new  → created_at descendente (más recientes primero, default).
     - top  → votes descendente (más votados primero).
     - hot  → score decreciente: votos / (horas + 2)^1.5.
 
-    Nota sobre cursor + sort: el cursor filtra por ID (>cursor),
-    no por posición en el sort. Para paginación correcta con sort=top
-    o sort=hot, el cliente debe gestionar que el next_cursor sea
-    coherente con el ordenamiento elegido.
+    Paginación: next_cursor es un token opaco (clave de orden + ID) que
+    retoma el feed justo después del último post entregado, con páginas
+    estables aunque cambien los votos. Solo es válido con el mismo sort.
+    Un cursor numérico se interpreta como ID (legacy: posts con id > cursor).
+
+    GET condicional: la respuesta lleva ETag y Last-Modified; si el
+    cliente envía If-None-Match / If-Modified-Since y ningún post ni
+    comentario cambió desde entonces, se responde 304 sin cuerpo.
 
     Args:
+        request: Request entrante (If-None-Match / If-Modified-Since).
+        response: Response donde se agregan ETag y Last-Modified.
         limit: Número máximo de posts a retornar (1-100, default 20).
-        cursor: ID del último post visto. Si se omite, retorna desde el inicio.
+        cursor: next_cursor de la página anterior, o un ID legacy. Si se
+            omite, retorna desde el inicio.
         sort: Criterio de ordenamiento (new|top|hot, default new).
+        include_comments: Si es False, omite el árbol de comentarios
+            (default True).
+        board_id: Si se indica, lista solo los posts de ese board.
 
     Returns:
         PostListResponse con items (lista de Post con comments anidados),
-        limit y next_cursor.
+        limit y next_cursor, o 304 si el cliente ya tiene esta versión.
 
     Raises:
+        HTTPException 400: Si el cursor es inválido o de otro sort.
         HTTPException 422: Si sort contiene un valor no válido.
     """
-    posts = get_posts_sorted(sort.value)
-    if cursor is not None:
-        posts = [post for post in posts if post.get("id") > cursor]
-    sliced = posts[:limit]
-    has_more = len(posts) > limit
-    next_cursor = sliced[-1]["id"] if sliced and has_more else None
+    version = get_read_version(("posts", "comments"), hot=sort is SortMode.hot)
+    unchanged = not_modified(request, response, *version)
+    if unchanged is not None:
+        return unchanged
+    legacy_id = int(cursor) if cursor is not None and cursor.isdigit() else None
+    try:
+        sliced, next_cursor = get_posts_page(
+            sort.value,
+            limit,
+            cursor=cursor if legacy_id is None else None,
+            after_id=legacy_id,
+            include_comments=include_comments,
+            board_id=board_id,
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
     return PostListResponse(items=sliced, limit=limit, next_cursor=next_cursor)
 
 
@@ -237,7 +286,7 @@ def update_existing_post(
         HTTPException 403: Si el usuario no es owner ni mod/admin.
         HTTPException 404: Si el post no existe.
     """
-    post = get_post(post_id)
+    post = get_post_summary(post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     _check_post_ownership(post, current_user)
@@ -283,7 +332,7 @@ def delete_existing_post(post_id: int, current_user: dict = Depends(get_current_
         HTTPException 403: Si el usuario no es owner ni mod/admin.
         HTTPException 404: Si el post no existe.
     """
-    post = get_post(post_id)
+    post = get_post_summary(post_id)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     _check_post_ownership(post, current_user)
@@ -300,9 +349,23 @@ def delete_existing_post(post_id: int, current_user: dict = Depends(get_current_
     },
 )
 def list_comments_for_post(
+    request: Request,
+    response: Response,
     post_id: int,
     limit: int = Query(50, ge=1, le=200),
-    cursor: Optional[int] = Query(default=None, description="Resume from root comment id greater than this value."),
+    cursor: Optional[int] = Query(default=None, description="Id of the last root comment seen (next_cursor)."),
+    max_depth: int = Query(
+        COMMENT_MAX_DEPTH,
+        ge=0,
+        le=COMMENT_MAX_DEPTH,
+        description="Levels of replies to include below each root comment.",
+    ),
+    replies_limit: Optional[int] = Query(
+        None, ge=1, le=50, description="Maximum replies included per comment (default: all)."
+    ),
+    sort: CommentSort = Query(
+        CommentSort.old, description="Order within each group of siblings: old (default), new, top, controversial, best"
+    ),
 ) -> CommentListResponse:
     """
     Lista los comentarios de un post como árbol anidado con paginación.
@@ -312,31 +375,54 @@ def list_comments_for_post(
     padre. El árbol tiene un máximo de 6 niveles de profundidad.
 
     La paginación actúa sobre los comentarios raíz: el cursor filtra
-    raíces con id > cursor. Los replies de cada raíz se incluyen
-    completos independientemente de la paginación.
+    raíces con id > cursor. Bajo cada raíz se incluyen hasta max_depth
+    niveles de replies y hasta replies_limit replies por comentario, de
+    modo que el tamaño de la respuesta no depende de la forma del hilo.
+    Por defecto no se recorta: se retorna el árbol completo.
+    Los comentarios recortados traen more_replies > 0 y replies_cursor
+    para seguir con GET /comments/{id}/replies?cursor=.
+
+    sort ordena cada grupo de hermanos (raíces y replies de un mismo
+    comentario): old (ID ascendente, default), new (más recientes),
+    top (más votados), controversial (muchos votos repartidos parejo) y
+    best (límite inferior de Wilson). Con un sort distinto de old el
+    cursor retoma desde la posición actual del comentario indicado.
+
+    GET condicional: el ETag cambia solo con escrituras sobre los
+    comentarios de este post; con If-None-Match / If-Modified-Since
+    vigentes se responde 304 sin armar el árbol.
 
     Endpoint alternativo a GET /comments?post_id=X — ambos retornan
     el mismo árbol.
 
     Args:
+        request: Request entrante (If-None-Match / If-Modified-Since).
+        response: Response donde se agregan ETag y Last-Modified.
         post_id: ID del post cuyos comentarios se quieren obtener.
         limit: Número máximo de comentarios raíz a retornar (1-200, default 50).
         cursor: ID del último comentario raíz visto para continuar la paginación.
+        max_depth: Niveles de replies bajo cada raíz (0-6, default 6:
+            todos).
+        replies_limit: Máximo de replies por comentario (1-50, default
+            None: todas).
+        sort: Orden de cada grupo de hermanos (default old).
 
     Returns:
         CommentListResponse con items (árbol de comentarios raíz con replies
-        anidados), limit y next_cursor.
+        anidados), limit y next_cursor, o 304 si el cliente ya tiene esta
+        versión.
 
     Raises:
+        HTTPException 400: Si el cursor no corresponde a un comentario del árbol.
         HTTPException 404: Si el post no existe.
     """
-    if not get_post(post_id):
+    if not get_post_summary(post_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    all_comments = get_comments_for_post(post_id)
-    tree = build_comment_tree(all_comments)
-    if cursor is not None:
-        tree = [c for c in tree if c.get("id") > cursor]
-    sliced = tree[:limit]
-    has_more = len(tree) > limit
-    next_cursor = sliced[-1]["id"] if sliced and has_more else None
-    return CommentListResponse(items=sliced, limit=limit, next_cursor=next_cursor)
+    unchanged = not_modified(request, response, *get_read_version(post_id=post_id))
+    if unchanged is not None:
+        return unchanged
+    try:
+        items, next_cursor = get_comment_page(post_id, limit, cursor, max_depth, replies_limit, sort.value)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return CommentListResponse(items=items, limit=limit, next_cursor=next_cursor)
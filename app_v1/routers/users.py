@@ -8,11 +8,12 @@ Expone operaciones CRUD sobre usuarios con control de acceso:
 - Escritura admin: los administradores pueden eliminar cualquier usuario
   (DELETE /{user_id}).
 
-Todos los endpoints de perfil incluyen karma calculado al vuelo
-(post_karma + comment_karma + karma total) vía calculate_user_karma().
+Todos los endpoints de perfil incluyen el karma materializado del usuario
+(post_karma + comment_karma + karma total) y sus posts vía
+get_users_enrichment(), una sola llamada por página de usuarios.
 La contraseña nunca se expone en ninguna respuesta (_sanitize_user).
 """
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, Security, status
 
@@ -20,11 +21,10 @@ from app_v1.deps import get_current_payload, get_current_user, oauth2_scheme
 from app_v1.utils.token_blacklist import revoke as revoke_token
 from app_v1.schemas import ErrorResponse, UserListResponse, UserResponse, UserUpdate
 from app_v1.services import (
-    calculate_user_karma,
     delete_user as service_delete_user,
-    get_posts,
     get_user,
     get_users,
+    get_users_enrichment,
     update_user as service_update_user,
 )
 from app_v1.utils.content import enforce_clean_text
@@ -48,30 +48,28 @@ def _sanitize_user(user: dict) -> dict:
     return clean
 
 
-def _attach_posts(user: dict) -> dict:
+def _attach_posts(users: List[dict]) -> List[dict]:
     """
-    Enriquece un usuario sanitizado con sus posts y karma calculado.
+    Enriquece usuarios sanitizados con sus posts y karma.
 
     Combina tres operaciones en una:
     1. Sanitiza (elimina password via _sanitize_user).
-    2. Calcula la lista de IDs de posts del usuario.
-    3. Añade karma, post_karma y comment_karma al vuelo.
+    2. Añade la lista de IDs de posts de cada usuario.
+    3. Añade karma, post_karma y comment_karma (materializados).
 
-    Se usa como paso final en todos los endpoints GET de usuario
-    antes de retornar la respuesta.
+    Los pasos 2 y 3 se resuelven para todos los usuarios con una sola
+    llamada a get_users_enrichment(). Se usa como paso final en todos
+    los endpoints GET de usuario antes de retornar la respuesta.
 
     Args:
-        user: Dict de usuario tal como está en data.json.
+        users: Dicts de usuario tal como están en data.json.
 
     Returns:
-        Dict del usuario con password eliminado, campo posts (lista de IDs),
-        y campos karma, post_karma, comment_karma calculados.
+        Lista de dicts de usuario con password eliminado, campo posts
+        (lista de IDs) y campos karma, post_karma, comment_karma.
     """
-    clean = _sanitize_user(user)
-    posts = get_posts()
-    clean["posts"] = [post["id"] for post in posts if post.get("user_id") == clean.get("id")]
-    clean.update(calculate_user_karma(clean["id"]))
-    return clean
+    enrichment = get_users_enrichment([user["id"] for user in users])
+    return [{**_sanitize_user(user), **enrichment[user["id"]]} for user in users]
 
 
 @router.get(
@@ -88,7 +86,7 @@ def list_users(
 
     Los usuarios se ordenan por ID ascendente. El cursor indica el último
     ID visto; la siguiente página retorna IDs mayores al cursor.
-    Cada usuario incluye karma calculado al vuelo y lista de IDs de posts.
+    Cada usuario incluye su karma y la lista de IDs de sus posts.
     Endpoint público (no requiere autenticación).
 
     Args:
@@ -108,7 +106,7 @@ def list_users(
     sliced = users[:limit]
     has_more = len(users) > limit
     next_cursor = sliced[-1]["id"] if sliced and has_more else None
-    items = [_attach_posts(user) for user in sliced]
+    items = _attach_posts(sliced)
     return UserListResponse(items=items, limit=limit, next_cursor=next_cursor)
 
 
@@ -124,7 +122,7 @@ def read_me(
     """
     Retorna el perfil del usuario actualmente autenticado.
 
-    Requiere un access token válido. Incluye karma calculado al vuelo
+    Requiere un access token válido. Incluye el karma
     y lista de IDs de posts del usuario autenticado.
 
     Args:
@@ -139,7 +137,7 @@ def read_me(
         HTTPException 401: Si el token no se provee, es inválido o está revocado.
     """
     _ = token
-    return _attach_posts(current_user)
+    return _attach_posts([current_user])[0]
 
 
 @router.get(
@@ -151,8 +149,8 @@ def retrieve_user(user_id: int) -> UserResponse:
     """
     Retorna el perfil público de un usuario por su ID.
 
-    Endpoint público (no requiere autenticación). Incluye karma calculado
-    al vuelo y lista de IDs de posts del usuario.
+    Endpoint público (no requiere autenticación). Incluye karma y lista
+    de IDs de posts del usuario.
 
     Args:
         user_id: ID entero del usuario a buscar.
@@ -166,7 +164,7 @@ def retrieve_user(user_id: int) -> UserResponse:
     user = get_user(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return _attach_posts(user)
+    return _attach_posts([user])[0]
 
 
 @router.put(
@@ -227,7 +225,7 @@ def update_existing_user(
     updated = service_update_user(user_id, updates)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return _attach_posts(updated)
+    return _attach_posts([updated])[0]
 
 
 @router.delete(
@@ -31,6 +31,7 @@ from .schemas import (
     CommentCreate,
     CommentUpdate,
     Comment,
+    CommentSort,
     CommentListResponse,
     Reply,
     # Social graph
@@ -80,6 +81,7 @@ __all__ = [
     "CommentCreate",
     "CommentUpdate",
     "Comment",
+    "CommentSort",
     "CommentListResponse",
     "Reply",
     "Vote",
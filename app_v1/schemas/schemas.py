@@ -168,7 +168,7 @@ class User(OrmBase, UserBase):
         posts: Lista de IDs de posts creados por el usuario.
         roles: Lista de roles asignados (ej: ["user", "mod"]).
         is_active: Indica si la cuenta está activa.
-        karma: Karma total (post_karma + comment_karma), calculado al vuelo.
+        karma: Karma total (post_karma + comment_karma).
         post_karma: Suma de votos recibidos en posts del usuario.
         comment_karma: Suma de votos recibidos en comentarios del usuario.
     """
@@ -360,6 +360,9 @@ class Comment(OrmBase, CommentBase):
         parent_id: ID del comentario padre. None si es comentario raíz.
         depth: Nivel de anidación (0 = raíz, 1 = reply directa, etc.).
         replies: Lista de comentarios hijo anidados (recursivo hasta 6 niveles).
+        more_replies: Replies directas que el listado recortó (0 = ninguna).
+        replies_cursor: Cursor para seguir con GET /comments/{id}/replies
+            cuando more_replies > 0 (None = desde el principio).
 
     Nota: body no tiene min_length en este schema de respuesta; la
     restricción aplica solo en CommentCreate (input del cliente). Tras
@@ -377,11 +380,28 @@ class Comment(OrmBase, CommentBase):
     parent_id: Optional[int] = None
     depth: int = 0
     replies: List["Comment"] = Field(default_factory=list)
+    more_replies: int = 0
+    replies_cursor: Optional[int] = None
 
 
 Comment.model_rebuild()
 
 
+class CommentSort(str, Enum):
+    """
+    Orden de los comentarios dentro de cada grupo de hermanos.
+
+    Usada en ?sort= de GET /posts/{id}/comments, /comments y
+    /comments/{id}/replies.
+    """
+
+    old = "old"
+    new = "new"
+    top = "top"
+    controversial = "controversial"
+    best = "best"
+
+
 class CommentListResponse(CursorPage):
     """Response de listado paginado de comentarios como árbol anidado."""
 
@@ -503,9 +523,18 @@ class Post(OrmBase, PostBase):
 
 
 class PostListResponse(CursorPage):
-    """Response de listado paginado de posts. Extiende CursorPage con items."""
+    """
+    Response de listado paginado de posts. Extiende CursorPage con items.
+
+    A diferencia del resto de listados, next_cursor es un token opaco
+    (clave de orden + ID) en lugar de un ID.
+    """
 
     items: List[Post] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor for the next page of the same sort, when available.",
+    )
 
 
 # ---------------------------------------------------------------------------
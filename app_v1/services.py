@@ -11,16 +11,56 @@ users, boards, posts, comments, votes y moderation.
 
 Persistencia: escritura atómica vía archivo .tmp para evitar
 corrupción parcial del JSON ante errores de I/O.
+
+Caché: el documento parseado se mantiene en memoria a nivel de proceso.
+load_data() solo vuelve a leer data.json si cambia su firma en disco
+(mtime, tamaño o inode); save_data() actualiza la caché en el acto.
+
+SQLite: con DATA_BACKEND=sqlite el documento se guarda en una base SQLite
+y cada commit escribe solo los registros que cambió (ver
+utils/sqlite_store.py, que incluye la migración desde data.json).
+
+Journal: con DATA_PERSISTENCE=journal los commits no reescriben data.json;
+añaden sus operaciones a data.journal.jsonl (ver utils/journal.py) con
+fsync agrupado, y el journal se compacta en data.json cada
+DATA_JOURNAL_COMPACT_EVERY entradas. load_data() reproduce el snapshot
+más el journal.
+
+Concurrencia: las funciones que escriben (@_serialized) corren bajo un
+RLock del proceso más un flock sobre data.lock, compartido entre workers.
+Las lecturas no toman el lock: sirven el documento cacheado y, si el
+disco cambió mientras otro escribe, siguen con la versión en memoria.
+
+Group commit: con DATA_GROUP_COMMIT_MS > 0 las mutaciones de esa ventana
+se persisten en una sola escritura; cada llamador retorna cuando su lote
+ya está en disco.
 """
 from __future__ import annotations
 
+import atexit
+import functools
 import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: only the in-process lock
+    fcntl = None
 
-from app_v1.utils.helpers import normalize_email
+from app_v1.utils import codec, journal, sqlite_store
+from app_v1.utils.helpers import decode_cursor, encode_cursor, normalize_email
+from app_v1.utils.records import compact, compact_document
+from app_v1.utils.vote_ledger import VoteLedger
+from app_v1.utils.views import RecordView
 
 # ---------------------------------------------------------------------------
 # Storage helpers
@@ -28,6 +68,29 @@ from app_v1.utils.helpers import normalize_email
 BASE_DIR = Path(__file__).resolve().parent
 DATA_PATH = BASE_DIR / "data" / "data.json"
 
+# "json" persiste en data.json (con o sin journal); "sqlite" en una base
+# SQLite (ver utils/sqlite_store.py). En ambos casos el documento vive en
+# memoria y las funciones de servicio son las mismas.
+STORAGE_BACKEND = os.getenv("DATA_BACKEND", "json").strip().lower()
+# Ruta de la base SQLite. Default: junto a DATA_PATH (data.sqlite3).
+SQLITE_PATH = os.getenv("DATA_SQLITE_PATH", "").strip()
+
+# "snapshot" reescribe data.json en cada commit; "journal" añade las
+# operaciones del commit al journal y compacta periódicamente.
+PERSISTENCE_MODE = os.getenv("DATA_PERSISTENCE", "snapshot").strip().lower()
+# Intervalo mínimo entre fsync del journal. Un corte de energía puede
+# perder a lo sumo esta ventana (si no llegan más escrituras, un timer
+# hace el fsync pendiente al vencer); una caída del proceso no pierde nada.
+JOURNAL_FSYNC_INTERVAL_MS = int(os.getenv("DATA_JOURNAL_FSYNC_MS", "50"))
+# Entradas del journal tras las que se compacta en un snapshot nuevo.
+JOURNAL_COMPACT_EVERY = int(os.getenv("DATA_JOURNAL_COMPACT_EVERY", "1000"))
+# Group commit: las escrituras de esta ventana se persisten juntas en una
+# sola escritura a disco (0 = desactivado, cada commit escribe).
+GROUP_COMMIT_WINDOW_MS = int(os.getenv("DATA_GROUP_COMMIT_MS", "0"))
+# data.json se escribe compacto; con DATA_JSON_PRETTY=1 se indenta para
+# poder leerlo a mano (más lento y más grande, solo para depurar).
+PRETTY_JSON = os.getenv("DATA_JSON_PRETTY", "0").strip().lower() in {"1", "true", "yes"}
+
 EMPTY_STRUCTURE: Dict[str, Any] = {
     "users": [],
     "posts": [],
@@ -44,6 +107,8 @@ EMPTY_STRUCTURE: Dict[str, Any] = {
     },
     "terms_and_conditions": [],
     "terms_acceptances": [],
+    "sequences": [],
+    "versions": [],
 }
 
 
@@ -85,6 +150,103 @@ def _normalize_timestamp(value: Optional[str]) -> str:
     return _now_utc_iso()
 
 
+def _timestamp_epoch(value: Any) -> float:
+    """
+    Convierte un timestamp ISO 8601 a segundos desde epoch (UTC).
+
+    Los valores sin zona horaria se asumen UTC. Valores vacíos o no
+    parseables retornan 0.0, de modo que ordenan como los más antiguos.
+
+    Args:
+        value: String de fecha/hora, o None.
+
+    Returns:
+        Float con los segundos desde epoch.
+    """
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# Colecciones cuyos registros guardan las fechas ya normalizadas y el
+# instante de creación precalculado en created_epoch (segundos UTC).
+_TIMESTAMPED = frozenset({"posts", "comments", "boards"})
+
+
+def _stamp_times(record: Dict[str, Any]) -> None:
+    """
+    Normaliza las fechas de un registro y cachea created_epoch (in place).
+
+    Se aplica al escribir (_insert_record(), _update_record()), de modo
+    que las lecturas no vuelven a parsear fechas: un registro con
+    created_epoch ya tiene created_at y updated_at en su forma normalizada.
+
+    Args:
+        record: Registro de una colección de _TIMESTAMPED.
+    """
+    record["created_at"] = _normalize_timestamp(record.get("created_at"))
+    if record.get("updated_at"):
+        record["updated_at"] = _normalize_timestamp(record["updated_at"])
+    record["created_epoch"] = _timestamp_epoch(record["created_at"])
+
+
+def _created_epoch(record: Dict[str, Any]) -> float:
+    """Instante de creación de un registro en segundos UTC (0.0 si no se puede parsear)."""
+    epoch = record.get("created_epoch")
+    if epoch is None:
+        return _timestamp_epoch(record.get("created_at"))
+    return epoch
+
+
+def _time_overlay(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fechas normalizadas de un registro para superponerlas en su vista.
+
+    Los registros escritos por esta capa (con created_epoch) ya las tienen
+    normalizadas y no se parsean; solo los heredados que aún no pasaron
+    por migrate_timestamps() se normalizan en cada lectura.
+
+    Args:
+        record: Registro tal como está almacenado.
+
+    Returns:
+        Dict con created_at/updated_at a superponer (vacío si no hace falta).
+    """
+    if "created_epoch" in record:
+        return {}
+    overlay = {"created_at": _normalize_timestamp(record.get("created_at"))}
+    if record.get("updated_at"):
+        overlay["updated_at"] = _normalize_timestamp(record.get("updated_at"))
+    return overlay
+
+
+def _migrate_timestamps(data: Dict[str, Any]) -> int:
+    """
+    Normaliza las fechas de los registros heredados sin created_epoch.
+
+    Es O(n), por lo que solo se usa en save_data(), que ya escribe el
+    documento completo. Para migrar el documento en uso ver
+    migrate_timestamps().
+
+    Args:
+        data: Documento completo. Modificado in-place.
+
+    Returns:
+        Cantidad de registros modificados.
+    """
+    touched = 0
+    for collection in sorted(_TIMESTAMPED):
+        for record in data.get(collection, []):
+            if "created_epoch" not in record:
+                _stamp_times(record)
+                touched += 1
+    return touched
+
+
 def _ensure_data_file() -> None:
     """
     Crea el archivo data.json con estructura vacía si no existe.
@@ -93,49 +255,1374 @@ def _ensure_data_file() -> None:
     """
     DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
     if not DATA_PATH.exists():
-        DATA_PATH.write_text(
-            json.dumps(EMPTY_STRUCTURE, ensure_ascii=False, indent=4),
-            encoding="utf-8",
-        )
+        DATA_PATH.write_bytes(codec.dumps(EMPTY_STRUCTURE, pretty=PRETTY_JSON))
+
+
+# Documento cacheado del proceso. "stamp" es la firma de data.json y del
+# journal (mtime_ns, size, inode) en el momento en que "data" fue leído o
+# escrito; "journal_offset" es el byte del journal hasta el que se aplicó.
+_cache: Dict[str, Any] = {"path": None, "stamp": None, "data": None, "journal_offset": 0}
+
+# Estado del journal: entradas desde el último snapshot, último fsync y
+# timer del fsync diferido pendiente (ver _schedule_journal_sync()).
+_journal_state: Dict[str, Any] = {"entries": 0, "last_fsync": 0.0, "timer": None}
+
+# Operaciones de registro pendientes de persistir en el próximo _commit():
+# ("put", colección, registro) o ("del", colección, [ids]).
+_pending_ops: List[Tuple[str, str, Any]] = []
+
+
+def _journal_path() -> Path:
+    """Ruta del journal, junto a DATA_PATH (data.journal.jsonl)."""
+    return DATA_PATH.with_name(DATA_PATH.stem + ".journal.jsonl")
+
+
+def _sqlite_path() -> Path:
+    """Ruta de la base SQLite: DATA_SQLITE_PATH o data.sqlite3 junto a DATA_PATH."""
+    return Path(SQLITE_PATH) if SQLITE_PATH else DATA_PATH.with_suffix(".sqlite3")
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    """
+    Retorna la firma (mtime_ns, size, inode) de un archivo, o None si no existe.
+
+    Args:
+        path: Ruta del archivo a inspeccionar.
+
+    Returns:
+        Tupla con mtime en nanosegundos, tamaño en bytes e inode.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _store_stamp() -> Tuple[Any, Any]:
+    """Firma conjunta de data.json y del journal."""
+    return (_file_stamp(DATA_PATH), _file_stamp(_journal_path()))
+
+
+def _remember(data: Dict[str, Any], journal_offset: int = 0) -> None:
+    """Registra data como documento vigente para la firma actual en disco."""
+    _cache["path"] = DATA_PATH
+    _cache["stamp"] = _store_stamp()
+    _cache["data"] = data
+    _cache["journal_offset"] = journal_offset
+
+
+def _invalidate_cache() -> None:
+    """
+    Descarta el documento cacheado en memoria.
+
+    La siguiente llamada a load_data() volverá a leer data.json desde disco.
+    """
+    _cache["path"] = None
+    _cache["stamp"] = None
+    _cache["data"] = None
+    _cache["journal_offset"] = 0
+    _pending_ops.clear()
+
+
+# Serialización de escrituras. _lock ordena los hilos del proceso; el
+# flock sobre data.lock, los procesos (uvicorn --workers N). "depth"
+# cuenta las adquisiciones anidadas del hilo que tiene _lock.
+_lock = threading.RLock()
+_file_lock: Dict[str, Any] = {"path": None, "pid": None, "fd": None, "depth": 0}
+
+
+def _lock_path() -> Path:
+    """Ruta del archivo de lock entre procesos, junto a DATA_PATH (data.lock)."""
+    return DATA_PATH.with_suffix(".lock")
+
+
+def _lock_fd() -> int:
+    """Descriptor abierto de data.lock para este proceso y DATA_PATH."""
+    path = _lock_path()
+    if _file_lock["fd"] is not None and (_file_lock["path"], _file_lock["pid"]) != (path, os.getpid()):
+        # DATA_PATH changed, or we are a forked child: flock is per open file
+        if _file_lock["pid"] == os.getpid():
+            os.close(_file_lock["fd"])
+        _file_lock["fd"] = None
+    if _file_lock["fd"] is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _file_lock["fd"] = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        _file_lock["path"] = path
+        _file_lock["pid"] = os.getpid()
+    return _file_lock["fd"]
+
+
+@contextmanager
+def _write_lock(blocking: bool = True) -> Iterator[bool]:
+    """
+    Toma el lock de escritura: RLock del proceso más flock de data.lock.
+
+    Es reentrante: una función serializada puede llamar a otra.
+
+    Args:
+        blocking: Si es False no espera; retorna False si otro hilo o
+            proceso tiene el lock.
+
+    Yields:
+        True si se obtuvo el lock (siempre, con blocking=True).
+    """
+    if not _lock.acquire(blocking=blocking):
+        yield False
+        return
+    try:
+        if _file_lock["depth"] == 0 and fcntl is not None:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(_lock_fd(), flags)
+            except BlockingIOError:
+                yield False
+                return
+        _file_lock["depth"] += 1
+        try:
+            yield True
+        finally:
+            _file_lock["depth"] -= 1
+            if _file_lock["depth"] == 0 and fcntl is not None:
+                fcntl.flock(_file_lock["fd"], fcntl.LOCK_UN)
+    finally:
+        _lock.release()
+
+
+def _serialized(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorador: ejecuta func bajo _write_lock().
+
+    Se aplica a toda función que hace load_data() → mutación → commit, de
+    modo que el ciclo completo (incluida la asignación de IDs) es atómico
+    frente a otros hilos y workers. Dentro del lock, load_data() ve los
+    commits que otros procesos hicieron antes.
+
+    Con group commit, la llamada más externa espera fuera del lock a que
+    su lote se persista (ver _await_batch()).
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        depth = getattr(_batch_local, "depth", 0)
+        _batch_local.depth = depth + 1
+        try:
+            with _write_lock():
+                result = func(*args, **kwargs)
+        finally:
+            _batch_local.depth = depth
+        if depth == 0:
+            batch = getattr(_batch_local, "batch", None)
+            if batch is not None:
+                _batch_local.batch = None
+                _await_batch(batch)
+        return result
+
+    return wrapper
+
+
+# Group commit. "batch" es el lote abierto: mutaciones ya aplicadas en
+# memoria cuyas operaciones siguen en _pending_ops. Mientras hay un lote
+# abierto el proceso conserva el flock, así otros workers no escriben
+# sobre un disco que aún no refleja esas mutaciones.
+_batch_state: Dict[str, Any] = {"batch": None}
+_batch_cond = threading.Condition()
+_batch_local = threading.local()
+
+
+def _await_batch(batch: Dict[str, Any]) -> None:
+    """
+    Espera a que batch esté en disco; el primero en esperar lo escribe.
+
+    El líder duerme GROUP_COMMIT_WINDOW_MS para que otras mutaciones se
+    sumen al lote y luego lo persiste de una vez.
+
+    Args:
+        batch: Lote en el que quedó la mutación del llamador.
+
+    Raises:
+        Exception: La que haya producido la escritura del lote.
+    """
+    with _batch_cond:
+        lead = not batch["leader"]
+        batch["leader"] = True
+    if lead:
+        time.sleep(GROUP_COMMIT_WINDOW_MS / 1000)
+        _flush_batch(batch)
+    with _batch_cond:
+        while not batch["done"]:
+            _batch_cond.wait()
+    if batch["error"] is not None:
+        raise batch["error"]
+
+
+def _flush_batch(batch: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Persiste el lote abierto (o batch, si sigue abierto) y despierta a sus llamadores.
+
+    Args:
+        batch: Lote esperado; si ya se escribió (p. ej. por flush_data())
+            no se hace nada. None escribe el lote abierto, si lo hay.
+    """
+    with _write_lock():
+        current = _batch_state["batch"]
+        if current is None or (batch is not None and current is not batch):
+            return
+        _batch_state["batch"] = None
+        try:
+            if _cache["data"] is not None:
+                _persist(_cache["data"], durable=True)
+        except Exception as exc:
+            # The batch's mutations never reached disk: forget them
+            _invalidate_cache()
+            current["error"] = exc
+        finally:
+            _file_lock["depth"] -= 1  # release the batch's hold on the flock
+            with _batch_cond:
+                current["done"] = True
+                _batch_cond.notify_all()
+
+
+def _current_stamp() -> Any:
+    """Firma vigente del almacenamiento, comparable con _cache["stamp"]."""
+    if STORAGE_BACKEND == "sqlite":
+        return (str(_sqlite_path()), sqlite_store.head(_sqlite_path()))
+    return _store_stamp()
 
 
 def load_data() -> Dict[str, Any]:
     """
-    Carga y retorna el documento JSON completo desde disco.
+    Retorna el documento JSON completo, leyéndolo de disco solo si cambió.
+
+    El documento se cachea a nivel de proceso. Cada llamada compara la firma
+    del archivo (mtime, tamaño, inode) con la del documento cacheado y solo
+    vuelve a parsear si difiere (p. ej. otro proceso o una edición manual).
+
+    Si existe un journal (data.journal.jsonl) sus entradas se aplican sobre
+    el snapshot. Cuando solo creció el journal (otro proceso hizo commits),
+    se aplican únicamente las entradas nuevas sobre el documento cacheado.
+
+    El dict retornado es compartido: quien lo modifique debe persistir los
+    cambios con save_data(), que mantiene la caché sincronizada.
 
     Autosanea el archivo si está corrompido: en caso de error de parseo
     reescribe la estructura vacía y la retorna.
 
+    El camino habitual (nada cambió en disco) no toma ningún lock. Releer
+    sí lo toma, pero sin esperar: si otro hilo o worker está escribiendo
+    se retorna el documento cacheado tal cual.
+
     Returns:
         Diccionario con todas las colecciones: users, posts, boards,
         comments, votes, moderation, etc.
     """
-    _ensure_data_file()
+    cached = _cache["data"] if _cache["path"] == DATA_PATH else None
+    if cached is not None and _cache["stamp"] == _current_stamp():
+        return cached
+    with _write_lock(blocking=cached is None) as acquired:
+        if not acquired:
+            return cached
+        return _refresh()
+
+
+def _refresh() -> Dict[str, Any]:
+    """
+    Cuerpo de load_data(): relee o pone al día el documento cacheado.
+
+    Se llama con _write_lock() tomado.
+
+    Returns:
+        Documento completo.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return _load_sqlite()
+    if _file_stamp(DATA_PATH) is None:
+        _ensure_data_file()
+    stamp = _store_stamp()
+    cached = _cache["data"]
+    if cached is not None and _cache["path"] == DATA_PATH:
+        if _cache["stamp"] == stamp:
+            return cached
+        if _journal_grew(_cache["stamp"], stamp):
+            entries, offset = journal.read_entries(_journal_path(), _cache["journal_offset"])
+            for ops in entries:
+                _catch_up(cached, ops)
+            _journal_state["entries"] += len(entries)
+            _remember(cached, offset)
+            return cached
+
     try:
-        return json.loads(DATA_PATH.read_text(encoding="utf-8"))
+        data = codec.loads(DATA_PATH.read_bytes())
     except json.JSONDecodeError:
-        DATA_PATH.write_text(
-            json.dumps(EMPTY_STRUCTURE, ensure_ascii=False, indent=4),
-            encoding="utf-8",
-        )
-        return json.loads(json.dumps(EMPTY_STRUCTURE))
+        DATA_PATH.write_bytes(codec.dumps(EMPTY_STRUCTURE, pretty=PRETTY_JSON))
+        data = json.loads(json.dumps(EMPTY_STRUCTURE))
+    compact_document(data)
+    journal_path = _journal_path()
+    entries, offset = journal.read_entries(journal_path)
+    for ops in entries:
+        _replay(data, ops)
+    if stamp[1] is not None and stamp[1][1] > offset:
+        # Drop a torn tail left by a crash so later appends stay readable
+        os.truncate(journal_path, offset)
+    _journal_state["entries"] = len(entries)
+    _sync_sequences(data)
+    _remember(data, offset)
+    return data
+
+
+def _load_sqlite() -> Dict[str, Any]:
+    """
+    load_data() para DATA_BACKEND=sqlite.
+
+    La firma del documento cacheado es el último seq de la tabla changes.
+    Si otro proceso confirmó cambios, se aplican solo esos registros; ante
+    un reemplazo completo se relee la base.
 
+    Returns:
+        Documento completo.
+    """
+    path = _sqlite_path()
+    head = sqlite_store.head(path)
+    cached = _cache["data"]
+    stamp = _cache["stamp"]
+    if cached is not None and _cache["path"] == DATA_PATH and stamp and stamp[0] == str(path):
+        if stamp[1] == head:
+            return cached
+        delta = sqlite_store.changes_since(path, stamp[1])
+        if delta is not None:
+            ops, seq = delta
+            _catch_up(cached, ops)
+            _remember_sqlite(cached, seq)
+            return cached
+    data, seq = sqlite_store.load(path, EMPTY_STRUCTURE)
+    compact_document(data)
+    _sync_sequences(data)
+    _remember_sqlite(data, seq)
+    return data
+
+
+def _replay(data: Dict[str, Any], ops: List[Dict[str, Any]]) -> None:
+    """
+    Aplica operaciones del journal (o de la tabla changes) sobre data.
+
+    Los registros de las colecciones compactas (ver records.py) se
+    convierten antes de entrar al documento.
+
+    Args:
+        data: Documento completo. Modificado in-place.
+        ops: Operaciones put/del en el formato del journal.
+    """
+    for op in ops:
+        if op["op"] == "put":
+            op["r"] = compact(op["c"], op["r"])
+    journal.apply_ops(data, ops)
+
+
+def _catch_up(data: Dict[str, Any], ops: List[Dict[str, Any]]) -> None:
+    """
+    Aplica sobre el documento cacheado las operaciones de otro proceso.
+
+    Las colecciones indexadas pasan por _insert_record(),
+    _update_record() y _discard_records() igual que una escritura local:
+    se corrigen solo los índices, feeds y árboles de comentarios de los
+    registros tocados. Las operaciones no se vuelven a registrar para el
+    journal, y los contadores de get_read_version() llegan en las mismas
+    operaciones (colección "versions"), detrás de los cambios que cuentan.
+
+    Si data todavía no tiene índices, se aplica con _replay() y los
+    índices se construirán completos en la próxima lectura.
 
+    Args:
+        data: Documento cacheado. Modificado in-place.
+        ops: Operaciones put/del en el formato del journal.
+    """
+    if _indexes["doc"] is not data:
+        _replay(data, ops)
+        # A reader may have indexed data halfway through the replay
+        _drop_indexes()
+        return
+    idx = _indexes
+    # Version counters go last, once the changes they count are visible
+    ops = sorted(ops, key=lambda op: op["c"] == "versions")
+    others = [op for op in ops if op["c"] not in _INDEXED_COLLECTIONS]
+    if others:
+        _replay(data, others)
+    for op in ops:
+        collection = op["c"]
+        if collection not in _INDEXED_COLLECTIONS:
+            continue
+        if op["op"] == "del":
+            doomed = [idx[collection][i] for i in op["ids"] if i in idx[collection]]
+            _discard_records(data, collection, doomed, log=False)
+            continue
+        record = compact(collection, op["r"])
+        current = idx[collection].get(record.get("id"))
+        if current is None:
+            _insert_record(data, collection, record, log=False)
+        elif current.keys() - record.keys():
+            # A field was removed: update() cannot express it, replace the record
+            _discard_records(data, collection, [current], log=False)
+            _insert_record(data, collection, record, log=False)
+        else:
+            _update_record(data, collection, current, dict(record), log=False)
+
+
+def _remember_sqlite(data: Dict[str, Any], seq: int) -> None:
+    """Registra data como documento vigente de la base SQLite en el cambio seq."""
+    _cache["path"] = DATA_PATH
+    _cache["stamp"] = (str(_sqlite_path()), seq)
+    _cache["data"] = data
+    _cache["journal_offset"] = 0
+
+
+def _journal_grew(before: Tuple[Any, Any], after: Tuple[Any, Any]) -> bool:
+    """
+    Indica si entre dos firmas solo se añadieron entradas al journal.
+
+    Args:
+        before: Firma (_store_stamp) del documento cacheado.
+        after: Firma actual en disco.
+
+    Returns:
+        True si data.json no cambió y el journal es el mismo archivo (o
+        antes no existía) y no se achicó.
+    """
+    if before[0] != after[0] or after[1] is None:
+        return False
+    if before[1] is None:
+        return True
+    return before[1][2] == after[1][2] and after[1][1] >= before[1][1]
+
+
+def _write_document(data: Dict[str, Any], durable: bool = False) -> None:
+    """
+    Escribe el documento completo en disco de forma atómica y lo cachea.
+
+    Escribe primero en un archivo .tmp y luego lo renombra sobre el
+    definitivo, garantizando que una escritura parcial no corrompa
+    los datos existentes. Si la escritura falla se descarta la caché
+    para no servir cambios que no llegaron a disco.
+
+    El snapshot contiene todo lo registrado en el journal, que se
+    elimina a continuación (compactación). Como las entradas del journal
+    pueden estar ya en disco, antes de borrarlo se hace fsync del
+    snapshot y del directorio, aunque durable sea False.
+
+    Con DATA_BACKEND=sqlite reemplaza en una transacción todo el
+    contenido de la base.
+
+    Args:
+        data: Diccionario completo con todas las colecciones a guardar.
+        durable: Si es True, hace fsync del archivo antes de renombrarlo
+            aunque no haya journal que compactar.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            seq = sqlite_store.replace_all(_sqlite_path(), data)
+        except Exception:
+            _invalidate_cache()
+            raise
+        _pending_ops.clear()
+        _remember_sqlite(data, seq)
+        return
+    _ensure_data_file()
+    tmp = DATA_PATH.with_name(DATA_PATH.stem + ".tmp")
+    compacting = _journal_path().exists()
+    try:
+        tmp.write_bytes(codec.dumps(data, pretty=PRETTY_JSON))
+        if durable or compacting:
+            journal.sync(tmp)
+        tmp.replace(DATA_PATH)
+        if compacting:
+            # The rename must be on disk before the journal it replaces is gone
+            journal.sync_directory(DATA_PATH.parent)
+            _journal_path().unlink(missing_ok=True)
+    except Exception:
+        _invalidate_cache()
+        raise
+    _pending_ops.clear()
+    _journal_state["entries"] = 0
+    _remember(data)
+
+
+@_serialized
 def save_data(data: Dict[str, Any]) -> None:
     """
-    Persiste el documento JSON completo en disco de forma atómica.
+    Persiste el documento JSON completo en disco de forma atómica.
+
+    Escribe primero en un archivo .tmp y luego lo renombra sobre el
+    definitivo, garantizando que una escritura parcial no corrompa
+    los datos existentes. Tras escribir, data pasa a ser el documento
+    cacheado.
+
+    Como data pudo modificarse fuera de esta capa, los índices en memoria
+    se descartan y se reconstruyen en la próxima lectura, los contadores
+    de ID se adelantan si data trae IDs mayores y cambian todos los ETag
+    de get_read_version(). Las funciones de servicio usan _commit(), que
+    conserva los índices ya actualizados.
+
+    Args:
+        data: Diccionario completo con todas las colecciones a guardar.
+    """
+    compact_document(data)
+    _sync_sequences(data)
+    _migrate_timestamps(data)
+    _bump_document_version(data)
+    _write_document(data)
+    _drop_indexes()
+
+
+def _bump_document_version(data: Dict[str, Any]) -> None:
+    """
+    Cuenta un reemplazo completo del documento: cambia todos los ETag.
+
+    Args:
+        data: Documento completo. Modificado in-place.
+    """
+    counters = journal.resolve_collection(data, "versions")
+    counter = next((c for c in counters if c.get("id") == _DOCUMENT_VERSION), None)
+    if counter is None:
+        counter = {"id": _DOCUMENT_VERSION, "n": 0}
+        counters.append(counter)
+    counter["n"] += 1
+    counter["at"] = time.time()
+
+
+def _commit(data: Dict[str, Any]) -> None:
+    """
+    Persiste una mutación hecha por esta capa sobre el documento cacheado.
+
+    A diferencia de save_data(), no descarta los índices: el llamador ya
+    los mantuvo al día con _insert_record() / _discard_records().
+
+    En modo journal solo se añaden al journal las operaciones registradas
+    por esos helpers. Se escribe un snapshot completo en su lugar si toca
+    compactar o si no hay operaciones que describan el cambio. Con
+    DATA_BACKEND=sqlite las mismas operaciones se aplican en una
+    transacción sobre la base.
+
+    Con group commit no escribe: deja la mutación en el lote abierto, que
+    se persiste al terminar la ventana (ver _await_batch()).
+
+    Args:
+        data: Documento completo (el mismo retornado por load_data()).
+    """
+    if GROUP_COMMIT_WINDOW_MS > 0:
+        if _batch_state["batch"] is None:
+            _batch_state["batch"] = {"leader": False, "done": False, "error": None}
+            _file_lock["depth"] += 1  # hold the flock until _flush_batch()
+        _batch_local.batch = _batch_state["batch"]
+        return
+    _persist(data)
+
+
+def _persist(data: Dict[str, Any], durable: bool = False) -> None:
+    """
+    Escribe en disco las operaciones pendientes de data (ver _commit()).
+
+    Args:
+        data: Documento completo (el mismo retornado por load_data()).
+        durable: Si es True, la escritura llega a disco antes de retornar
+            (fsync del journal o del snapshot), sin esperar al intervalo
+            de JOURNAL_FSYNC_INTERVAL_MS.
+    """
+    if STORAGE_BACKEND == "sqlite":
+        ops = _drain_ops()
+        if ops is None:
+            _write_document(data, durable)
+            return
+        try:
+            seq = sqlite_store.apply(_sqlite_path(), ops)
+        except Exception:
+            _invalidate_cache()
+            raise
+        _remember_sqlite(data, seq)
+        return
+    if PERSISTENCE_MODE != "journal" or _journal_state["entries"] >= JOURNAL_COMPACT_EVERY:
+        _write_document(data, durable)
+        return
+    ops = _drain_ops()
+    if ops is None:
+        _write_document(data, durable)
+        return
+    now = time.monotonic()
+    fsync_due = durable or (now - _journal_state["last_fsync"]) * 1000 >= JOURNAL_FSYNC_INTERVAL_MS
+    try:
+        offset = journal.append_entry(_journal_path(), journal.encode_entry(ops), fsync=fsync_due)
+    except Exception:
+        _invalidate_cache()
+        raise
+    if fsync_due:
+        _journal_state["last_fsync"] = now
+    else:
+        _schedule_journal_sync(JOURNAL_FSYNC_INTERVAL_MS / 1000 - (now - _journal_state["last_fsync"]))
+    _journal_state["entries"] += 1
+    _remember(data, offset)
+
+
+def _schedule_journal_sync(delay: float) -> None:
+    """
+    Programa el fsync de las entradas del journal escritas sin fsync.
+
+    Sin él, tras una ráfaga seguida de inactividad las últimas entradas
+    quedarían sin sincronizar hasta la próxima escritura. Si ya hay un
+    fsync programado, ese cubre también las entradas nuevas.
+
+    Args:
+        delay: Segundos hasta que vence JOURNAL_FSYNC_INTERVAL_MS.
+    """
+    if _journal_state["timer"] is not None:
+        return
+    timer = threading.Timer(max(delay, 0.0), _deferred_journal_sync)
+    timer.daemon = True
+    _journal_state["timer"] = timer
+    timer.start()
+
+
+def _deferred_journal_sync() -> None:
+    """Hace el fsync programado por _schedule_journal_sync()."""
+    # Cleared first: an append after this point schedules its own fsync
+    _journal_state["timer"] = None
+    journal.sync(_journal_path())
+    _journal_state["last_fsync"] = time.monotonic()
+
+
+def _drain_ops() -> Optional[List[Dict[str, Any]]]:
+    """
+    Vacía _pending_ops y las convierte al formato del journal.
+
+    Returns:
+        Lista de operaciones, o None si no hay ninguna o si alguna no se
+        puede expresar por id (registros sin id), en cuyo caso el
+        llamador debe escribir un snapshot.
+    """
+    pending = list(_pending_ops)
+    _pending_ops.clear()
+    ops: List[Dict[str, Any]] = []
+    for kind, collection, payload in pending:
+        if kind == "put":
+            if payload.get("id") is None:
+                return None
+            ops.append({"op": "put", "c": collection, "r": payload})
+        else:
+            if any(record_id is None for record_id in payload):
+                return None
+            ops.append({"op": "del", "c": collection, "ids": payload})
+    return ops or None
+
+
+@_serialized
+def flush_data() -> None:
+    """
+    Fuerza a disco las entradas del journal aún no sincronizadas y el
+    lote de group commit abierto, si lo hay.
+
+    Se llama al apagar la aplicación; en modo snapshot sin group commit
+    no hace nada.
+    """
+    _flush_batch()
+    if PERSISTENCE_MODE == "journal":
+        timer, _journal_state["timer"] = _journal_state["timer"], None
+        if timer is not None:
+            timer.cancel()
+        journal.sync(_journal_path())
+        _journal_state["last_fsync"] = time.monotonic()
+
+
+atexit.register(flush_data)
+
+
+# ---------------------------------------------------------------------------
+# Índices en memoria
+# ---------------------------------------------------------------------------
+def _record_id(record: Dict[str, Any]) -> Any:
+    """Clave primaria de un registro."""
+    return record.get("id")
+
+
+def _vote_key(vote: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Clave natural de un voto: (user_id, target_type, target_id)."""
+    return (vote.get("user_id"), vote.get("target_type"), vote.get("target_id"))
+
+
+# Colecciones con índice de clave primaria id → registro.
+_INDEXED_COLLECTIONS = ("users", "posts", "comments", "boards", "votes", "versions")
+
+# Índices únicos: nombre → (colección, función de clave). Los de clave
+# primaria se llaman igual que su colección.
+_UNIQUE_INDEXES: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    **{name: (name, _record_id) for name in _INDEXED_COLLECTIONS},
+    "vote_keys": ("votes", _vote_key),
+}
+
+# Índices secundarios: nombre → (colección, función de clave). Cada clave
+# apunta a un dict {id(registro): registro}, que permite altas y bajas en
+# O(1) sin depender de que el registro tenga un ID válido.
+_GROUP_INDEXES: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    "comments_by_post": ("comments", lambda c: c.get("post_id")),
+    "comments_by_user": ("comments", lambda c: c.get("user_id")),
+    "posts_by_board": ("posts", lambda p: p.get("board_id")),
+    "posts_by_user": ("posts", lambda p: p.get("user_id")),
+    "votes_by_target": ("votes", lambda v: (v.get("target_type"), v.get("target_id"))),
+    "votes_by_user": ("votes", lambda v: v.get("user_id")),
+}
+
+# Feeds ordenados: nombre → (colección, función de orden). Cada feed se
+# guarda por alcance (None = global, o el board_id del post) como
+# {"keys": [(orden, id, id(registro)), ...], "records": {id(registro): registro}}
+# con "keys" ascendente, de modo que una página es un slice del feed.
+# La función de orden recibe los índices para poder leer "hot_now"; los
+# feeds hot guardan además en "hot_now" el intervalo con el que se
+# ordenaron (ver _empty_feed()). Un feed publicado es inmutable: las
+# escrituras publican una copia (ver _patch_feeds()).
+_SORTED_INDEXES: Dict[str, Tuple[str, Callable[[Dict[str, Any], Dict[str, Any]], float]]] = {
+    "posts_new": ("posts", lambda idx, p: -_created_epoch(p)),
+    "posts_top": ("posts", lambda idx, p: -(p.get("votes") or 0)),
+    "posts_hot": ("posts", lambda idx, p: -_hot_score(p, now=idx["hot_now"])),
+}
+
+# Duración del intervalo en que el feed hot usa un mismo "ahora". Los
+# scores hot se recalculan una vez por intervalo, no en cada request.
+HOT_SCORE_BUCKET_SECONDS = 60
+
+# Árboles de comentarios cacheados por post (ver _comment_tree()). Viven
+# junto a los índices, en idx["comment_trees"] como post_id → entrada
+# (ver _comment_tree_entry); idx["comment_tree_versions"] cuenta los
+# cambios de comentarios de cada post y un árbol solo se usa si está en
+# la versión vigente. Las escrituras de un comentario no lo descartan:
+# lo corrigen en el lugar (ver _splice_comment y siguientes). Se
+# conservan los árboles de los COMMENT_TREE_CACHE_SIZE posts leídos más
+# recientemente.
+COMMENT_TREE_CACHE_SIZE = 512
+
+# Profundidad máxima de anidación del árbol de comentarios; los más
+# profundos se promueven a la raíz (ver build_comment_tree()).
+COMMENT_MAX_DEPTH = 6
+
+# Índices del documento cacheado. "doc" es el documento indexado; si
+# load_data() retorna otro objeto (releído de disco) se reconstruyen.
+# _indexes_lock solo protege el reemplazo de _indexes (ver _index()).
+_indexes: Dict[str, Any] = {"doc": None}
+_indexes_lock = threading.Lock()
+
+
+def _feed_entry(idx: Dict[str, Any], name: str, record: Dict[str, Any]) -> Tuple[float, Any, int]:
+    """Clave de record dentro del feed name: (orden, id, id(registro))."""
+    _, order = _SORTED_INDEXES[name]
+    return (order(idx, record), record.get("id") or 0, id(record))
+
+
+def _empty_feed(idx: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Feed sin posts; el hot recuerda el intervalo de sus scores (ver get_posts_page)."""
+    feed: Dict[str, Any] = {"keys": [], "records": {}}
+    if name == "posts_hot":
+        feed["hot_now"] = idx["hot_now"]
+    return feed
+
+
+def _feed_scopes(record: Dict[str, Any]) -> set:
+    """Alcances en los que aparece un post: el feed global y el de su board."""
+    return {None, record.get("board_id")}
+
+
+def _hot_bucket_now() -> datetime:
+    """Inicio del intervalo HOT_SCORE_BUCKET_SECONDS vigente, en UTC."""
+    ts = datetime.now(timezone.utc).timestamp()
+    return datetime.fromtimestamp(ts - ts % HOT_SCORE_BUCKET_SECONDS, timezone.utc)
+
+
+def _index_record(
+    idx: Dict[str, Any], collection: str, record: Dict[str, Any], *, feeds: bool = True
+) -> None:
+    """
+    Registra record en todos los índices de su colección.
+
+    Con feeds=False se omiten los feeds ordenados; _build_indexes() los
+    arma aparte ordenando una sola vez en lugar de insertar uno a uno.
+    """
+    for name, (source, key) in _UNIQUE_INDEXES.items():
+        if source == collection:
+            idx[name].setdefault(key(record), record)
+    for name, (source, key) in _GROUP_INDEXES.items():
+        if source == collection:
+            idx[name].setdefault(key(record), {})[id(record)] = record
+    if feeds:
+        _patch_feeds(idx, [(record, {}, _feed_entries(idx, collection, record))])
+
+
+def _index_keys(collection: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Claves de record en los índices únicos y de grupo de su colección."""
+    return {
+        name: key(record)
+        for name, (source, key) in (*_UNIQUE_INDEXES.items(), *_GROUP_INDEXES.items())
+        if source == collection
+    }
+
+
+def _feed_entries(idx: Dict[str, Any], collection: str, record: Dict[str, Any]) -> Dict[Tuple[str, Any], Tuple]:
+    """Claves de record en los feeds ordenados de su colección, por (feed, alcance)."""
+    return {
+        (name, scope): _feed_entry(idx, name, record)
+        for name, (source, _) in _SORTED_INDEXES.items()
+        if source == collection
+        for scope in _feed_scopes(record)
+    }
+
+
+def _patch_feeds(
+    idx: Dict[str, Any],
+    changes: Iterable[Tuple[Dict[str, Any], Dict[Tuple[str, Any], Tuple], Dict[Tuple[str, Any], Tuple]]],
+) -> None:
+    """
+    Aplica a los feeds ordenados los cambios de uno o más registros.
+
+    get_posts_page() recorre los feeds sin lock, así que un feed publicado
+    nunca se modifica: cada feed tocado se copia, se le aplican todos los
+    cambios y se publica con una sola asignación, como los árboles de
+    comentarios cacheados. Un lector ve el feed anterior o el nuevo, nunca
+    uno a medio mover.
+
+    Args:
+        idx: Índices del documento (ver _build_indexes). Modificado in-place.
+        changes: Tuplas (registro, claves previas, claves nuevas), con las
+            claves por (feed, alcance) de _feed_entries(); {} si el
+            registro no estaba o deja de estar en los feeds.
+    """
+    patched: Dict[Tuple[str, Any], Tuple[List[Tuple], Dict[int, Dict[str, Any]]]] = {}
+    for record, removed, added in changes:
+        for slot in removed.keys() | added.keys():
+            name, scope = slot
+            old, new = removed.get(slot), added.get(slot)
+            if slot not in patched:
+                feed = idx[name].get(scope)
+                if feed is not None and old is not None and old == new:
+                    pos = bisect_left(feed["keys"], old)
+                    if pos < len(feed["keys"]) and feed["keys"][pos] == old:
+                        continue  # Same position: nothing to copy
+                patched[slot] = (list(feed["keys"]), dict(feed["records"])) if feed else ([], {})
+            keys, records = patched[slot]
+            if old is not None and records.pop(id(record), None) is not None:
+                pos = bisect_left(keys, old)
+                if pos < len(keys) and keys[pos] == old:
+                    del keys[pos]
+                else:
+                    # The record changed behind the index's back: drop it by reference.
+                    keys[:] = [k for k in keys if k[2] != id(record)]
+            if new is not None:
+                insort(keys, new)
+                records[id(record)] = record
+    for (name, scope), (keys, records) in patched.items():
+        if records:
+            base = idx[name].get(scope) or _empty_feed(idx, name)
+            idx[name][scope] = {**base, "keys": keys, "records": records}
+        else:
+            idx[name].pop(scope, None)
+
+
+def _invalidate_comment_tree(idx: Dict[str, Any], post_id: Any) -> None:
+    """Marca como obsoleto el árbol de comentarios cacheado de un post."""
+    versions = idx["comment_tree_versions"]
+    versions[post_id] = versions.get(post_id, 0) + 1
+    idx["comment_trees"].pop(post_id, None)
+
+
+# Contadores de versión de get_read_version(), guardados en el propio
+# documento como registros {"id": clave, "n": escrituras, "at": epoch de
+# la última} de "versions". La clave es el nombre de la colección o
+# "comments:<post_id>" para el hilo de comentarios de un post. Como se
+# persisten con cada commit (snapshot, journal o SQLite), todos los
+# workers calculan el mismo ETag. Los contadores de posts borrados se
+# conservan: los IDs no se reutilizan.
+_UNVERSIONED = frozenset({"sequences", "versions"})
+
+
+# Contador de los reemplazos completos del documento (save_data()): forma
+# parte de todos los ETag.
+_DOCUMENT_VERSION = "*"
+
+
+def _version_id(collection: str, post_id: Any = None) -> str:
+    """Clave del contador de versión de una colección o de un hilo de comentarios."""
+    return collection if post_id is None else f"{collection}:{post_id}"
+
+
+def _bump_version(
+    idx: Dict[str, Any], collection: str, post_ids: Iterable[Any] = (), *, log: bool = True
+) -> None:
+    """
+    Registra una escritura en los contadores de versión (ver get_read_version).
+
+    Se llama después de aplicar el cambio y de registrar su operación: un
+    lector (de este o de otro proceso) que leyó la versión anterior puede
+    haber visto ya los datos nuevos, nunca al revés.
+
+    Args:
+        idx: Índices del documento (ver _build_indexes).
+        collection: Colección modificada.
+        post_ids: Posts cuyos hilos de comentarios cambiaron.
+        log: Si es False no hace nada: las operaciones de otro proceso
+            traen sus propios contadores (ver _catch_up()).
+    """
+    if not log or collection in _UNVERSIONED:
+        return
+    now = time.time()
+    for version_id in (_version_id(collection), *(_version_id(collection, p) for p in post_ids)):
+        counter = idx["versions"].get(version_id)
+        if counter is None:
+            counter = {"id": version_id, "n": 1, "at": now}
+            journal.resolve_collection(idx["doc"], "versions").append(counter)
+            idx["versions"][version_id] = counter
+        else:
+            # "at" first: a concurrent reader may pair a new date with the old
+            # count (a needless 200), never the new count with the old date
+            counter["at"] = now
+            counter["n"] += 1
+        _pending_ops.append(("put", "versions", counter))
+
+
+def _build_feed(idx: Dict[str, Any], name: str) -> None:
+    """
+    Reconstruye desde cero el feed ordenado name de idx["doc"].
+
+    Args:
+        idx: Índices del documento (ver _build_indexes). Modificado in-place.
+        name: Nombre del feed (ver _SORTED_INDEXES).
+    """
+    source, _ = _SORTED_INDEXES[name]
+    feeds: Dict[Any, Dict[str, Any]] = {}
+    for record in idx["doc"].get(source, []):
+        entry = _feed_entry(idx, name, record)
+        for scope in _feed_scopes(record):
+            feed = feeds.setdefault(scope, _empty_feed(idx, name))
+            feed["keys"].append(entry)
+            feed["records"][id(record)] = record
+    for feed in feeds.values():
+        feed["keys"].sort()
+    idx[name] = feeds
+
+
+def _unindex_record(
+    idx: Dict[str, Any], collection: str, record: Dict[str, Any], *, feeds: bool = True
+) -> None:
+    """
+    Quita record de todos los índices de su colección.
+
+    Con feeds=False se omiten los feeds ordenados; _discard_records() los
+    actualiza una sola vez para todos los registros eliminados.
+    """
+    for name, (source, key) in _UNIQUE_INDEXES.items():
+        if source == collection and idx[name].get(key(record)) is record:
+            del idx[name][key(record)]
+    for name, (source, key) in _GROUP_INDEXES.items():
+        if source == collection:
+            bucket = idx[name].get(key(record))
+            if bucket is not None:
+                bucket.pop(id(record), None)
+                if not bucket:
+                    del idx[name][key(record)]
+    if feeds:
+        _patch_feeds(idx, [(record, _feed_entries(idx, collection, record), {})])
+
+
+def _reindex_record(
+    idx: Dict[str, Any],
+    collection: str,
+    record: Dict[str, Any],
+    keys: Dict[str, Any],
+    entries: Dict[Tuple[str, Any], Tuple],
+) -> None:
+    """
+    Actualiza los índices de record tras modificarlo in-place.
+
+    Solo se tocan los índices cuya clave cambió, de modo que un lector
+    concurrente nunca deja de encontrar el registro.
+
+    Args:
+        idx: Índices del documento (ver _build_indexes). Modificado in-place.
+        collection: Nombre de la colección.
+        record: Registro ya modificado.
+        keys: Claves previas de record (ver _index_keys()).
+        entries: Claves previas de record en los feeds (ver _feed_entries()).
+    """
+    for name, old in keys.items():
+        unique = name in _UNIQUE_INDEXES
+        _, key = _UNIQUE_INDEXES[name] if unique else _GROUP_INDEXES[name]
+        new = key(record)
+        if new == old:
+            continue
+        if unique:
+            if idx[name].get(old) is record:
+                del idx[name][old]
+            idx[name].setdefault(new, record)
+            continue
+        bucket = idx[name].get(old)
+        if bucket is not None:
+            bucket.pop(id(record), None)
+            if not bucket:
+                del idx[name][old]
+        idx[name].setdefault(new, {})[id(record)] = record
+    _patch_feeds(idx, [(record, entries, _feed_entries(idx, collection, record))])
+
+
+def _build_indexes(data: Dict[str, Any], publish: bool = True) -> Dict[str, Any]:
+    """
+    Construye desde cero los índices en memoria de un documento.
+
+    Ante claves únicas duplicadas (datos legacy) gana el primer registro
+    de la lista, igual que las búsquedas lineales que reemplazan.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        publish: Si es True, los índices pasan a ser los del módulo.
+
+    Returns:
+        Dict con el documento indexado ("doc"), el "ahora" del feed hot
+        ("hot_now"), una entrada por cada índice de _UNIQUE_INDEXES,
+        _GROUP_INDEXES y _SORTED_INDEXES (entre ellos "versions", los
+        contadores de get_read_version()) y la caché de árboles de
+        comentarios.
+    """
+    global _indexes
+    fresh: Dict[str, Any] = {"doc": data, "hot_now": _hot_bucket_now()}
+    for name in (*_UNIQUE_INDEXES, *_GROUP_INDEXES, *_SORTED_INDEXES):
+        fresh[name] = {}
+    for collection in _INDEXED_COLLECTIONS:
+        for record in data.get(collection, []):
+            _index_record(fresh, collection, record, feeds=False)
+    for name in _SORTED_INDEXES:
+        _build_feed(fresh, name)
+    fresh["comment_trees"] = {}
+    fresh["comment_tree_versions"] = {}
+    if publish:
+        with _indexes_lock:
+            _indexes = fresh
+    return fresh
+
+
+def _drop_indexes() -> None:
+    """Descarta los índices; se reconstruyen en el próximo acceso."""
+    global _indexes
+    with _indexes_lock:
+        _indexes = {"doc": None}
+
+
+def _index(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retorna los índices de data, construyéndolos si aún no existen.
+
+    Los índices construidos se publican para los demás lectores. Si un
+    escritor del proceso tiene el lock, no se lo espera: se construyen
+    aparte y se publican solo si nadie publicó ni descartó índices
+    mientras tanto.
+
+    Args:
+        data: Documento completo cargado con load_data().
+
+    Returns:
+        Dict de índices (ver _build_indexes).
+    """
+    global _indexes
+    stale = _indexes
+    if stale["doc"] is data:
+        return stale
+    # Only threads of this process mutate data: the thread lock is enough,
+    # another worker holding data.lock does not matter.
+    if _lock.acquire(blocking=False):
+        try:
+            idx = _indexes
+            if idx["doc"] is not data:
+                idx = _build_indexes(data)
+        finally:
+            _lock.release()
+        return idx
+    # A writer holds the lock. Writers index data before changing it (the
+    # write helpers start with _index()) and drop the indexes after any
+    # other change, so this build is safe to publish unless they did
+    # either in the meantime.
+    fresh = _build_indexes(data, publish=False)
+    with _indexes_lock:
+        if _indexes is stale:
+            _indexes = fresh
+    return fresh
+
+
+def _lookup(data: Dict[str, Any], collection: str, record_id: Any) -> Optional[Dict[str, Any]]:
+    """
+    Busca un registro por ID en O(1) usando el índice de clave primaria.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        collection: Nombre de la colección indexada (users, posts, ...).
+        record_id: ID del registro.
+
+    Returns:
+        Referencia al dict almacenado en data, o None si no existe.
+    """
+    return _index(data)[collection].get(record_id)
+
+
+def _group(data: Dict[str, Any], index_name: str, key: Any) -> List[Dict[str, Any]]:
+    """
+    Retorna los registros de un índice secundario para una clave.
+
+    El costo es proporcional al tamaño del resultado, no de la colección.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        index_name: Nombre del índice (ver _GROUP_INDEXES).
+        key: Valor de la clave (p. ej. un post_id para comments_by_post).
+
+    Returns:
+        Lista de referencias a los registros; vacía si no hay ninguno.
+    """
+    bucket = _index(data)[index_name].get(key)
+    return list(bucket.values()) if bucket else []
+
+
+def _feed(data: Dict[str, Any], name: str, scope: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Retorna un feed ordenado, refrescando el feed hot si cambió su intervalo.
+
+    Los scores hot dependen del momento de cálculo: se congelan durante
+    HOT_SCORE_BUCKET_SECONDS y al pasar a un intervalo nuevo se recalculan
+    todos de una vez.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        name: Nombre del feed (ver _SORTED_INDEXES).
+        scope: None para el feed global o un board_id.
+
+    Returns:
+        Dict {"keys", "records"} del feed (más "hot_now" en los hot), o
+        None si no tiene posts.
+    """
+    idx = _index(data)
+    if name == "posts_hot":
+        now = _hot_bucket_now()
+        if idx["hot_now"] != now:
+            with _write_lock(blocking=False) as acquired:
+                # While a writer holds the lock, keep serving the previous bucket
+                if acquired and idx["hot_now"] != now:
+                    idx["hot_now"] = now
+                    _build_feed(idx, name)
+    return idx[name].get(scope)
+
+
+def get_read_version(
+    collections: Iterable[str] = (), post_id: Optional[int] = None, hot: bool = False
+) -> Tuple[str, Optional[float]]:
+    """
+    Retorna la versión actual de los datos que lee un endpoint.
+
+    Es la base de los GET condicionales (ver utils/conditional.py): el
+    ETag cambia con cada escritura en las colecciones indicadas (o en el
+    hilo de comentarios de post_id), con cada save_data() y, con hot, al
+    pasar a otro intervalo del feed hot. Sale de los contadores guardados
+    en el documento (ver _bump_version()), no del estado del proceso: todos
+    los workers dan el mismo ETag para los mismos datos, y recargar el
+    documento no lo cambia.
+
+    Debe pedirse antes de leer los datos: si una escritura ocurre en el
+    medio, la respuesta es más nueva que su ETag y el cliente solo repite
+    una descarga; nunca recibe 304 sobre datos viejos.
+
+    Args:
+        collections: Colecciones de las que depende la respuesta.
+        post_id: Si se indica, también depende del hilo de comentarios
+            de ese post.
+        hot: Si la respuesta usa el orden hot.
+
+    Returns:
+        Tupla (etag, last_modified). etag es un ETag fuerte entre comillas.
+        last_modified es el epoch UTC de la última modificación, o None si
+        no se conoce (documento sin contadores) o si fue hace menos de un
+        segundo: Last-Modified tiene resolución de segundos y no
+        distinguiría otra escritura en ese mismo segundo.
+    """
+    data = load_data()
+    idx = _index(data)
+    version_ids = [_DOCUMENT_VERSION, *collections]
+    if post_id is not None:
+        version_ids.append(_version_id("comments", post_id))
+    counters = [idx["versions"].get(version_id) for version_id in version_ids]
+    parts = [str(counter["n"]) if counter else "0" for counter in counters]
+    # A missing counter predates every existing one: the latest is an upper bound
+    stamps = [counter["at"] for counter in counters if counter]
+    if hot:
+        # Refresh the hot feed first so that polls answered with 304 still
+        # move it to the new interval
+        _feed(data, "posts_hot")
+        bucket = idx["hot_now"].timestamp()
+        parts.append(str(int(bucket)))
+        stamps.append(bucket)
+    etag = '"' + "-".join(parts) + '"'
+    last_modified = max(stamps, default=None)
+    if last_modified is None or time.time() - last_modified < 1:
+        return etag, None
+    return etag, last_modified
+
+
+def _insert_record(
+    data: Dict[str, Any], collection: str, record: Dict[str, Any], *, log: bool = True
+) -> Dict[str, Any]:
+    """
+    Añade un registro a una colección y a sus índices.
+
+    Todas las escrituras de esta capa pasan por _insert_record(),
+    _update_record() o _discard_records(), que además registran la
+    operación para el journal (ver _commit()).
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        collection: Nombre de la colección (indexada o no; las anidadas
+            se nombran con puntos, p. ej. "moderation.reports").
+        record: Registro a insertar (ya con ID asignado).
+        log: Si es False la operación no se registra para el journal:
+            se usa al reaplicar operaciones ya persistidas (ver _catch_up()).
+
+    Returns:
+        El registro tal como quedó en el documento: votes y comments se
+        guardan como registros compactos (ver records.py), no como el dict
+        recibido.
+    """
+    if collection in _TIMESTAMPED:
+        _stamp_times(record)
+    record = compact(collection, record)
+    idx = _index(data)
+    journal.resolve_collection(data, collection).append(record)
+    _index_record(idx, collection, record)
+    threads: Iterable[Any] = ()
+    if collection == "comments":
+        _splice_comment(idx, record)
+        threads = (record.get("post_id"),)
+    if log:
+        _pending_ops.append(("put", collection, record))
+    _bump_version(idx, collection, threads, log=log)
+    return record
+
+
+def _update_record(
+    data: Dict[str, Any], collection: str, record: Dict[str, Any], changes: Dict[str, Any], *, log: bool = True
+) -> None:
+    """
+    Aplica changes sobre record manteniendo sus índices al día.
+
+    Necesario cuando los cambios pueden tocar campos indexados
+    (p. ej. mover un post a otro board_id) y para que el journal
+    registre el cambio.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        collection: Nombre de la colección.
+        record: Referencia al registro dentro de data. Modificado in-place.
+        changes: Campos a actualizar.
+        log: Si es False la operación no se registra para el journal:
+            se usa al reaplicar operaciones ya persistidas (ver _catch_up()).
+    """
+    idx = _index(data)
+    keys, entries = _index_keys(collection, record), _feed_entries(idx, collection, record)
+    placement = (record.get("post_id"), record.get("parent_id"))
+    record.update(changes)
+    if collection in _TIMESTAMPED and ({"created_at", "updated_at"} & changes.keys() or "created_epoch" not in record):
+        _stamp_times(record)
+    _reindex_record(idx, collection, record, keys, entries)
+    threads: Iterable[Any] = ()
+    if collection == "comments":
+        threads = {placement[0], record.get("post_id")}
+        if placement == (record.get("post_id"), record.get("parent_id")):
+            _refresh_comment(idx, record)
+        else:
+            # Moved within the tree or to another post: rebuild both trees
+            _invalidate_comment_tree(idx, placement[0])
+            _invalidate_comment_tree(idx, record.get("post_id"))
+    if log:
+        _pending_ops.append(("put", collection, record))
+    _bump_version(idx, collection, threads, log=log)
+
+
+def _discard_records(
+    data: Dict[str, Any], collection: str, doomed: List[Dict[str, Any]], *, log: bool = True
+) -> None:
+    """
+    Elimina registros de una colección y de sus índices.
+
+    La comparación es por identidad, de modo que registros sin ID o con
+    IDs duplicados se eliminan correctamente.
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        collection: Nombre de la colección indexada.
+        doomed: Registros (referencias del propio documento) a eliminar.
+        log: Si es False la operación no se registra para el journal:
+            se usa al reaplicar operaciones ya persistidas (ver _catch_up()).
+    """
+    if not doomed:
+        return
+    idx = _index(data)
+    doomed_refs = {id(r) for r in doomed}
+    data[collection] = [r for r in data.get(collection, []) if id(r) not in doomed_refs]
+    for record in doomed:
+        _unindex_record(idx, collection, record, feeds=False)
+    _patch_feeds(idx, [(record, _feed_entries(idx, collection, record), {}) for record in doomed])
+    threads: Iterable[Any] = ()
+    if collection == "comments":
+        threads = {r.get("post_id") for r in doomed}
+        if len(doomed) == 1:
+            _prune_comment(idx, doomed[0])
+        else:
+            # Cascades drop whole threads: rebuilding beats pruning one by one
+            for post_id in threads:
+                _invalidate_comment_tree(idx, post_id)
+    if log:
+        _pending_ops.append(("del", collection, [r.get("id") for r in doomed]))
+    _bump_version(idx, collection, threads, log=log)
+
+
+# Contadores de ID por colección, guardados en el propio documento como
+# registros {"id": colección, "last": último ID asignado} de "sequences",
+# de modo que se persisten (snapshot, journal o SQLite) como cualquier
+# otro registro.
+def _allocate_id(data: Dict[str, Any], collection: str) -> int:
+    """
+    Asigna el siguiente ID de una colección en O(1) y lo registra.
+
+    Los IDs son monótonos: borrar el registro más alto no libera su ID.
+    La primera asignación de una colección sin contador lo inicializa con
+    el máximo ID existente (datos legacy). Debe llamarse bajo el lock de
+    escritura (funciones @_serialized).
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        collection: Nombre de la colección (con puntos si es anidada).
+
+    Returns:
+        ID nuevo, nunca usado antes en la colección.
+    """
+    sequences = journal.resolve_collection(data, "sequences")
+    counter = next((s for s in sequences if s.get("id") == collection), None)
+    if counter is None:
+        counter = {"id": collection, "last": _next_id(journal.resolve_collection(data, collection))}
+        _insert_record(data, "sequences", counter)
+    else:
+        _update_record(data, "sequences", counter, {"last": counter["last"] + 1})
+    return counter["last"]
+
+
+def _sync_sequences(data: Dict[str, Any]) -> None:
+    """
+    Adelanta los contadores que quedaron por detrás del máximo ID.
 
-    Escribe primero en un archivo .tmp y luego lo renombra sobre el
-    definitivo, garantizando que una escritura parcial no corrompa
-    los datos existentes.
+    Cubre documentos escritos por fuera de esta capa (save_data() con
+    registros nuevos, ediciones a mano). Es O(n), por lo que solo se usa
+    donde ya se recorre el documento completo.
 
     Args:
-        data: Diccionario completo con todas las colecciones a guardar.
+        data: Documento completo. Modificado in-place.
     """
-    _ensure_data_file()
-    tmp = DATA_PATH.with_name(DATA_PATH.stem + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8")
-    tmp.replace(DATA_PATH)
+    for counter in data.get("sequences", []):
+        highest = _next_id(journal.resolve_collection(data, counter["id"])) - 1
+        if highest > counter.get("last", 0):
+            counter["last"] = highest
 
 
 # ---------------------------------------------------------------------------
@@ -164,8 +1651,7 @@ def get_user(user_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dict del usuario si existe, None si no se encuentra.
     """
-    data = load_data()
-    return next((u for u in data["users"] if u.get("id") == user_id), None)
+    return _lookup(load_data(), "users", user_id)
 
 
 get_user_by_id = get_user
@@ -210,6 +1696,7 @@ def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
     return next((u for u in data["users"] if u.get("username") == username), None)
 
 
+@_serialized
 def create_user(user: Dict[str, Any]) -> Dict[str, Any]:
     """
     Crea un nuevo usuario y lo persiste en data.json.
@@ -238,17 +1725,18 @@ def create_user(user: Dict[str, Any]) -> Dict[str, Any]:
     if user_copy.get("email"):
         user_copy["email"] = normalize_email(user_copy["email"])
 
-    user_copy["id"] = _next_id(data["users"])
+    user_copy["id"] = _allocate_id(data, "users")
     user_copy.setdefault("posts", [])
     user_copy.setdefault("roles", ["user"])
     user_copy.setdefault("is_active", True)
     user_copy.setdefault("created_at", _now_utc_iso())
 
-    data["users"].append(user_copy)
-    save_data(data)
+    _insert_record(data, "users", user_copy)
+    _commit(data)
     return user_copy
 
 
+@_serialized
 def update_user(user_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Actualiza campos de perfil de un usuario existente.
@@ -272,32 +1760,33 @@ def update_user(user_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any
     data = load_data()
     allowed = {"username", "email", "display_name", "bio"}
 
-    for user in data["users"]:
-        if user.get("id") == user_id:
-            safe_updates = {
-                key: value
-                for key, value in updates.items()
-                if value is not None and key in allowed
-            }
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return None
+
+    safe_updates = {
+        key: value
+        for key, value in updates.items()
+        if value is not None and key in allowed
+    }
 
-            if "email" in safe_updates:
-                new_email = normalize_email(safe_updates["email"])
-                if normalize_email(user.get("email", "")) != new_email:
-                    if any(
-                        normalize_email(other.get("email", "")) == new_email
-                        for other in data["users"]
-                        if other.get("id") != user_id
-                    ):
-                        raise ValueError("Email already in use")
-                    safe_updates["email"] = new_email
+    if "email" in safe_updates:
+        new_email = normalize_email(safe_updates["email"])
+        if normalize_email(user.get("email", "")) != new_email:
+            if any(
+                normalize_email(other.get("email", "")) == new_email
+                for other in data["users"]
+                if other.get("id") != user_id
+            ):
+                raise ValueError("Email already in use")
+            safe_updates["email"] = new_email
 
-            user.update(safe_updates)
-            user["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return user
-    return None
+    _update_record(data, "users", user, {**safe_updates, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return user
 
 
+@_serialized
 def update_user_roles(user_id: int, roles: List[str]) -> Optional[Dict[str, Any]]:
     """
     Reemplaza la lista de roles de un usuario.
@@ -316,15 +1805,15 @@ def update_user_roles(user_id: int, roles: List[str]) -> Optional[Dict[str, Any]
     """
     data = load_data()
     safe_roles = list({r for r in roles if r in {"user", "mod", "admin"}} | {"user"})
-    for user in data["users"]:
-        if user.get("id") == user_id:
-            user["roles"] = safe_roles
-            user["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return user
-    return None
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return None
+    _update_record(data, "users", user, {"roles": safe_roles, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return user
 
 
+@_serialized
 def update_user_password(user_id: int, new_hashed: str) -> bool:
     """
     Actualiza el hash de contraseña de un usuario.
@@ -340,15 +1829,15 @@ def update_user_password(user_id: int, new_hashed: str) -> bool:
         no existe.
     """
     data = load_data()
-    for user in data["users"]:
-        if user.get("id") == user_id:
-            user["password"] = new_hashed
-            user["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return True
-    return False
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return False
+    _update_record(data, "users", user, {"password": new_hashed, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return True
 
 
+@_serialized
 def update_user_iat_cutoff(user_id: int, cutoff_ts: int) -> bool:
     """
     Establece el campo iat_cutoff para invalidar sesiones activas.
@@ -366,15 +1855,15 @@ def update_user_iat_cutoff(user_id: int, cutoff_ts: int) -> bool:
         True si el campo fue actualizado, False si el usuario no existe.
     """
     data = load_data()
-    for user in data["users"]:
-        if user.get("id") == user_id:
-            user["iat_cutoff"] = cutoff_ts
-            user["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return True
-    return False
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return False
+    _update_record(data, "users", user, {"iat_cutoff": cutoff_ts, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return True
 
 
+@_serialized
 def delete_user(user_id: int) -> bool:
     """
     Elimina un usuario y todos sus datos asociados en cascada.
@@ -384,7 +1873,8 @@ def delete_user(user_id: int) -> bool:
     2. Todos sus posts.
     3. Todos sus comentarios.
     4. Todos los votos emitidos por él y todos los votos recibidos
-       en su contenido (posts y comentarios eliminados).
+       en su contenido (posts y comentarios eliminados). Los contadores
+       de votos del contenido ajeno que había votado se descuentan.
 
     Args:
         user_id: ID del usuario a eliminar.
@@ -393,28 +1883,36 @@ def delete_user(user_id: int) -> bool:
         True si el usuario fue eliminado, False si no existía.
     """
     data = load_data()
-    initial = len(data["users"])
-    data["users"] = [u for u in data["users"] if u.get("id") != user_id]
-    if len(data["users"]) != initial:
-        # Collect IDs before removing
-        post_ids = {p.get("id") for p in data["posts"] if p.get("user_id") == user_id}
-        comment_ids = {c.get("id") for c in data["comments"] if c.get("user_id") == user_id}
-        data["posts"] = [p for p in data["posts"] if p.get("user_id") != user_id]
-        data["comments"] = [c for c in data["comments"] if c.get("user_id") != user_id]
-        # Cascade: remove votes by the user and votes on their content
-        data["votes"] = [
-            v for v in data.get("votes", [])
-            if not (
-                v.get("user_id") == user_id
-                or (v.get("target_type") == "post" and v.get("target_id") in post_ids)
-                or (v.get("target_type") == "comment" and v.get("target_id") in comment_ids)
-            )
-        ]
-        save_data(data)
-        return True
-    return False
-
-
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return False
+    _discard_records(data, "users", [user])
+    # Collect records before removing
+    doomed_posts = _group(data, "posts_by_user", user_id)
+    doomed_comments = _group(data, "comments_by_user", user_id)
+    # Cascade: remove votes by the user and votes on their content
+    doomed_votes = {id(v): v for v in _group(data, "votes_by_user", user_id)}
+    for kind, records in (("post", doomed_posts), ("comment", doomed_comments)):
+        for record in records:
+            for vote in _group(data, "votes_by_target", (kind, record.get("id"))):
+                doomed_votes[id(vote)] = vote
+    # Votes the user cast on content that survives leave its counters
+    doomed_refs = {id(r) for r in (*doomed_posts, *doomed_comments)}
+    for vote in _group(data, "votes_by_user", user_id):
+        kind = vote.get("target_type")
+        if kind not in ("post", "comment"):
+            continue
+        target = _lookup(data, _ENTITY_COLLECTIONS[kind], vote.get("target_id"))
+        if target is not None and id(target) not in doomed_refs:
+            _shift_vote_counters(data, kind, target, vote.get("value", 0), 0)
+    _discard_records(data, "posts", doomed_posts)
+    _discard_records(data, "comments", doomed_comments)
+    _discard_records(data, "votes", list(doomed_votes.values()))
+    _commit(data)
+    return True
+
+
+@_serialized
 def ban_user(user_id: int) -> Optional[Dict[str, Any]]:
     """
     Suspende a un usuario marcando is_banned=True sin eliminar la cuenta.
@@ -430,20 +1928,99 @@ def ban_user(user_id: int) -> Optional[Dict[str, Any]]:
         Dict del usuario actualizado, o None si no existe.
     """
     data = load_data()
-    for user in data["users"]:
-        if user.get("id") == user_id:
-            user["is_banned"] = True
-            save_data(data)
-            return user
-    return None
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return None
+    _update_record(data, "users", user, {"is_banned": True})
+    _commit(data)
+    return user
+
+
+def _scan_user_karma(data: Dict[str, Any], user_id: int) -> Tuple[int, int]:
+    """
+    Calcula (post_karma, comment_karma) recorriendo el contenido del usuario.
+
+    Solo se recorren los posts y comentarios del usuario y los votos
+    sobre ellos (índices secundarios). Respaldo para usuarios sin
+    contadores materializados.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        user_id: ID del usuario.
+
+    Returns:
+        Tupla (post_karma, comment_karma).
+    """
+    post_karma = sum(
+        v.get("value", 0)
+        for p in _group(data, "posts_by_user", user_id)
+        for v in _group(data, "votes_by_target", ("post", p.get("id")))
+    )
+    comment_karma = sum(
+        v.get("value", 0)
+        for c in _group(data, "comments_by_user", user_id)
+        for v in _group(data, "votes_by_target", ("comment", c.get("id")))
+    )
+    return post_karma, comment_karma
+
+
+def _user_karma(data: Dict[str, Any], user: Dict[str, Any]) -> Tuple[int, int]:
+    """Retorna (post_karma, comment_karma) guardados en user, o calculados si faltan."""
+    post_karma, comment_karma = user.get("post_karma"), user.get("comment_karma")
+    if isinstance(post_karma, int) and isinstance(comment_karma, int):
+        return post_karma, comment_karma
+    return _scan_user_karma(data, user.get("id"))
+
+
+def _shift_karma(data: Dict[str, Any], owner_id: Any, target_type: str, delta: int) -> None:
+    """
+    Suma delta al post_karma o comment_karma del autor de un contenido.
+
+    Como _shift_vote_counters(), debe llamarse antes de modificar los votos
+    o el contenido afectados, para que el cálculo de respaldo vea el estado
+    anterior.
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        owner_id: ID del autor del post o comentario.
+        target_type: "post" o "comment".
+        delta: Cambio en el score del contenido.
+    """
+    if not delta:
+        return
+    user = _lookup(data, "users", owner_id)
+    if user is None:
+        return
+    post_karma, comment_karma = _user_karma(data, user)
+    if target_type == "post":
+        post_karma += delta
+    else:
+        comment_karma += delta
+    _update_record(data, "users", user, {"post_karma": post_karma, "comment_karma": comment_karma})
+
+
+def _discount_karma(data: Dict[str, Any], target_type: str, records: List[Dict[str, Any]]) -> None:
+    """
+    Descuenta del karma de sus autores el score de contenido que se va a eliminar.
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        target_type: "post" o "comment".
+        records: Posts o comentarios a punto de eliminarse (con sus votos aún presentes).
+    """
+    for record in records:
+        upvotes, downvotes = _vote_counters(data, target_type, record)
+        _shift_karma(data, record.get("user_id"), target_type, downvotes - upvotes)
 
 
 def calculate_user_karma(user_id: int) -> Dict[str, int]:
     """
-    Calcula el karma de un usuario a partir de los votos recibidos en su contenido.
+    Retorna el karma de un usuario: votos recibidos en su contenido.
 
-    El karma se calcula al vuelo en cada llamada leyendo todos los votos
-    del archivo. No se almacena en caché ni en el perfil del usuario.
+    El karma está materializado en el perfil (post_karma, comment_karma) y
+    se actualiza por delta en apply_vote() y en los borrados en cascada,
+    por lo que leerlo es O(1). Usuarios sin contadores (datos legacy) se
+    calculan al vuelo; rebuild_user_karma() los materializa.
 
     - post_karma: suma de valores de votos (+1/-1) en posts del usuario.
     - comment_karma: suma de valores de votos en comentarios del usuario.
@@ -456,24 +2033,16 @@ def calculate_user_karma(user_id: int) -> Dict[str, int]:
         Dict con las claves post_karma, comment_karma y karma (int).
         Retorna ceros si el usuario no tiene contenido o votos.
     """
-    data = load_data()
-    votes = data.get("votes", [])
-    user_post_ids = {
-        p["id"] for p in data.get("posts", []) if p.get("user_id") == user_id
-    }
-    user_comment_ids = {
-        c["id"] for c in data.get("comments", []) if c.get("user_id") == user_id
-    }
-    post_karma = sum(
-        v.get("value", 0)
-        for v in votes
-        if v.get("target_type") == "post" and v.get("target_id") in user_post_ids
-    )
-    comment_karma = sum(
-        v.get("value", 0)
-        for v in votes
-        if v.get("target_type") == "comment" and v.get("target_id") in user_comment_ids
-    )
+    return _karma_of(load_data(), user_id)
+
+
+def _karma_of(data: Dict[str, Any], user_id: int) -> Dict[str, int]:
+    """Dict de karma (post_karma, comment_karma, karma) de un usuario de data."""
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        post_karma, comment_karma = _scan_user_karma(data, user_id)
+    else:
+        post_karma, comment_karma = _user_karma(data, user)
     return {
         "post_karma": post_karma,
         "comment_karma": comment_karma,
@@ -481,9 +2050,85 @@ def calculate_user_karma(user_id: int) -> Dict[str, int]:
     }
 
 
+def get_users_enrichment(user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Retorna los IDs de posts y el karma de varios usuarios a la vez.
+
+    Pensado para los listados de usuarios: una sola lectura del documento
+    para toda la página, y por usuario solo su entrada del índice
+    posts_by_user y su karma materializado (sin construir posts ni
+    recorrer colecciones completas).
+
+    Args:
+        user_ids: IDs de los usuarios a enriquecer.
+
+    Returns:
+        Dict user_id → {"posts": [ids ascendentes], "post_karma",
+        "comment_karma", "karma"}. Usuarios inexistentes retornan listas
+        vacías y karma 0.
+    """
+    data = load_data()
+    enrichment: Dict[int, Dict[str, Any]] = {}
+    for user_id in user_ids:
+        posts = sorted(p.get("id") for p in _group(data, "posts_by_user", user_id))
+        enrichment[user_id] = {"posts": posts, **_karma_of(data, user_id)}
+    return enrichment
+
+
+@_serialized
+def rebuild_user_karma() -> int:
+    """
+    Recalcula desde cero el karma materializado de todos los usuarios.
+
+    Rutina de reparación: agrega los votos por target en el libro
+    columnar (VoteLedger), suma el score de cada post y comentario a su
+    autor y reescribe solo los usuarios cuyos valores difieren. Da los
+    mismos números que el cálculo al vuelo.
+
+    Returns:
+        Cantidad de usuarios corregidos.
+    """
+    data = load_data()
+    counts = VoteLedger.from_votes(data.get("votes", [])).target_counts()
+    karma: Dict[Any, List[int]] = {}
+    for slot, (target_type, collection) in enumerate((("post", "posts"), ("comment", "comments"))):
+        for record in data.get(collection, []):
+            upvotes, downvotes = counts.get((target_type, record.get("id")), (0, 0))
+            if upvotes != downvotes:
+                karma.setdefault(record.get("user_id"), [0, 0])[slot] += upvotes - downvotes
+    repaired = 0
+    for user in list(data.get("users", [])):
+        post_karma, comment_karma = karma.get(user.get("id"), (0, 0))
+        if user.get("post_karma") != post_karma or user.get("comment_karma") != comment_karma:
+            _update_record(data, "users", user, {"post_karma": post_karma, "comment_karma": comment_karma})
+            repaired += 1
+    if repaired:
+        _commit(data)
+    return repaired
+
+
 # ---------------------------------------------------------------------------
 # Board services
 # ---------------------------------------------------------------------------
+def _build_board(entry: Dict[str, Any], post_count: int) -> RecordView:
+    """
+    Normaliza un board crudo del JSON para su uso en respuestas.
+
+    Args:
+        entry: Dict de board tal como está almacenado en data.json.
+        post_count: Número de posts publicados en el board.
+
+    Returns:
+        Vista de solo lectura del board con fechas normalizadas,
+        description garantizado y el campo post_count.
+    """
+    overlay = _time_overlay(entry)
+    overlay["post_count"] = post_count
+    if "description" not in entry:
+        overlay["description"] = ""
+    return RecordView(entry, overlay)
+
+
 def list_boards() -> List[Dict[str, Any]]:
     """
     Retorna todos los boards ordenados por ID ascendente.
@@ -492,20 +2137,15 @@ def list_boards() -> List[Dict[str, Any]]:
     publicados en ese board) y normaliza los campos de fecha.
 
     Returns:
-        Lista de dicts de board, cada uno con: id, name, description,
-        created_at, updated_at (opcional) y post_count.
+        Lista de vistas de solo lectura (RecordView), cada una con: id,
+        name, description, created_at, updated_at (opcional) y post_count.
     """
     data = load_data()
-    boards: List[Dict[str, Any]] = []
-    posts = data.get("posts", [])
-    for entry in data.get("boards", []):
-        board = deepcopy(entry)
-        board['created_at'] = _normalize_timestamp(board.get('created_at'))
-        if board.get('updated_at'):
-            board['updated_at'] = _normalize_timestamp(board.get('updated_at'))
-        board.setdefault('description', '')
-        board["post_count"] = sum(1 for post in posts if post.get('board_id') == board.get('id'))
-        boards.append(board)
+    posts_by_board = _index(data)["posts_by_board"]
+    boards = [
+        _build_board(entry, len(posts_by_board.get(entry.get("id"), ())))
+        for entry in data.get("boards", [])
+    ]
     boards.sort(key=lambda b: b.get("id", 0))
     return boards
 
@@ -521,9 +2161,15 @@ def get_board(board_id: int) -> Optional[Dict[str, Any]]:
         Dict del board enriquecido (con post_count) si existe,
         None si no se encuentra.
     """
-    return next((b for b in list_boards() if b.get("id") == board_id), None)
+    data = load_data()
+    entry = _lookup(data, "boards", board_id)
+    if entry is None:
+        return None
+    post_count = len(_index(data)["posts_by_board"].get(board_id, ()))
+    return _build_board(entry, post_count)
 
 
+@_serialized
 def create_board(board: Dict[str, Any]) -> Dict[str, Any]:
     """
     Crea un nuevo board y lo persiste en data.json.
@@ -539,183 +2185,842 @@ def create_board(board: Dict[str, Any]) -> Dict[str, Any]:
     """
     data = load_data()
     board_copy = deepcopy(board)
-    board_copy["id"] = _next_id(data["boards"])
+    board_copy["id"] = _allocate_id(data, "boards")
     board_copy.setdefault("name", "")
     board_copy.setdefault("created_at", _now_utc_iso())
     board_copy.setdefault("description", "")
-    data.setdefault("boards", []).append(board_copy)
-    save_data(data)
+    _insert_record(data, "boards", board_copy)
+    _commit(data)
     return board_copy
 
 
+@_serialized
 def update_board(board_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Actualiza los campos name y/o description de un board.
 
-    Solo permite modificar name y description; otras claves son ignoradas.
-    Si updates no contiene campos válidos, retorna el board sin modificar.
+    Solo permite modificar name y description; otras claves son ignoradas.
+    Si updates no contiene campos válidos, retorna el board sin modificar.
+
+    Args:
+        board_id: ID del board a actualizar.
+        updates: Dict con los campos a actualizar (name, description).
+
+    Returns:
+        Dict del board actualizado, o None si el board no existe.
+    """
+    data = load_data()
+    allowed = {"name", "description"}
+    board = _lookup(data, "boards", board_id)
+    if board is None:
+        return None
+    safe_updates = {
+        key: value
+        for key, value in updates.items()
+        if value is not None and key in allowed
+    }
+    if not safe_updates:
+        return board
+    _update_record(data, "boards", board, {**safe_updates, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return board
+
+
+@_serialized
+def delete_board(board_id: int) -> bool:
+    """
+    Elimina un board y todos sus datos asociados en cascada.
+
+    Elimina en orden:
+    1. El board de la colección boards.
+    2. Todos los posts del board.
+    3. Todos los comentarios de esos posts.
+    4. Todos los votos sobre esos posts y comentarios.
+
+    Args:
+        board_id: ID del board a eliminar.
+
+    Returns:
+        True si el board fue eliminado, False si no existía.
+    """
+    data = load_data()
+    board = _lookup(data, "boards", board_id)
+    if board is None:
+        return False
+    _discard_records(data, "boards", [board])
+    # Cascade posts and comments for this board
+    doomed_posts = _group(data, "posts_by_board", board_id)
+    doomed_comments = [
+        c for p in doomed_posts for c in _group(data, "comments_by_post", p.get("id"))
+    ]
+    # Cascade: remove votes on board posts and their comments
+    doomed_votes = [
+        v
+        for kind, records in (("post", doomed_posts), ("comment", doomed_comments))
+        for record in records
+        for v in _group(data, "votes_by_target", (kind, record.get("id")))
+    ]
+    _discount_karma(data, "post", doomed_posts)
+    _discount_karma(data, "comment", doomed_comments)
+    _discard_records(data, "posts", doomed_posts)
+    _discard_records(data, "comments", doomed_comments)
+    _discard_records(data, "votes", doomed_votes)
+    _commit(data)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Comment helpers
+# ---------------------------------------------------------------------------
+def _build_comment(raw: Dict[str, Any]) -> RecordView:
+    """
+    Normaliza un comentario crudo del JSON para su uso en respuestas.
+
+    Normaliza los campos de fecha y establece votes=0 si no existe.
+
+    Args:
+        raw: Dict de comentario tal como está almacenado en data.json.
+
+    Returns:
+        Vista de solo lectura del comentario con fechas normalizadas y
+        votes garantizado.
+    """
+    overlay = _time_overlay(raw)
+    if "votes" not in raw:
+        overlay["votes"] = 0
+    return RecordView(raw, overlay)
+
+
+def _wilson_lower_bound(upvotes: int, downvotes: int) -> float:
+    """
+    Límite inferior del intervalo de Wilson para la proporción de upvotes.
+
+    Es el score del orden "best": un comentario con 10 votos a favor y 1
+    en contra supera a uno con 1 a favor y 0 en contra, porque hay más
+    confianza en su proporción. Usa z = 1.281551565545 (80% de confianza,
+    el mismo valor que el orden "best" de Reddit).
+
+    Args:
+        upvotes: Votos positivos.
+        downvotes: Votos negativos.
+
+    Returns:
+        Float entre 0 y 1; 0.0 si no hay votos.
+    """
+    n = upvotes + downvotes
+    if n <= 0:
+        return 0.0
+    z = 1.281551565545
+    p = upvotes / n
+    return (p + z * z / (2 * n) - z * math.sqrt((p * (1 - p) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+
+
+def _controversy(upvotes: int, downvotes: int) -> float:
+    """
+    Score del orden "controversial": muchos votos y repartidos parejo.
+
+    Fórmula (Reddit): (upvotes + downvotes) ^ balance, donde balance es el
+    cociente entre el menor y el mayor de los dos conteos.
+
+    Args:
+        upvotes: Votos positivos.
+        downvotes: Votos negativos.
+
+    Returns:
+        Float >= 0; 0.0 si falta alguno de los dos tipos de voto.
+    """
+    if upvotes <= 0 or downvotes <= 0:
+        return 0.0
+    balance = downvotes / upvotes if upvotes > downvotes else upvotes / downvotes
+    return (upvotes + downvotes) ** balance
+
+
+# Órdenes de comentarios dentro de cada grupo de hermanos (raíces de un
+# post o replies de un comentario): nombre → clave ascendente de un nodo.
+# Las claves terminan en el ID, que desempata y las identifica. "old" (ID
+# ascendente, el orden del propio árbol) no necesita clave.
+COMMENT_SORTS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Tuple]] = {
+    "new": lambda data, c: (-_created_epoch(c), c["id"]),
+    "top": lambda data, c: (-(c.get("votes") or 0), c["id"]),
+    "controversial": lambda data, c: (-_controversy(*_vote_counters(data, "comment", c)), c["id"]),
+    "best": lambda data, c: (-_wilson_lower_bound(*_vote_counters(data, "comment", c)), c["id"]),
+}
+
+
+def build_comment_tree(
+    comments: List[Dict[str, Any]], max_depth: int = COMMENT_MAX_DEPTH
+) -> List[Dict[str, Any]]:
+    """
+    Convierte una lista plana de comentarios en un árbol anidado.
+
+    Procesa los comentarios en orden ascendente de ID (los padres siempre
+    tienen ID menor que sus hijos, garantizando que el padre ya esté en
+    el mapa cuando se procese el hijo).
+
+    Cada nodo del árbol es un RecordView sobre el comentario que añade:
+    - depth: nivel de anidación (0 = raíz).
+    - replies: lista de comentarios hijo directos.
+
+    Los comentarios cuyo depth superaría max_depth son promovidos al
+    nivel raíz en lugar de ser descartados.
+
+    Args:
+        comments: Lista plana de dicts de comentario (sin replies ni depth).
+        max_depth: Profundidad máxima de anidación permitida. Default:
+                   COMMENT_MAX_DEPTH, 6 (equivalente al límite de Reddit).
+
+    Returns:
+        Lista de comentarios raíz, cada uno con su subárbol de replies
+        anidado recursivamente.
+    """
+    nodes: Dict[int, Dict[str, Any]] = {}
+    roots: List[Dict[str, Any]] = []
+
+    for c in sorted(comments, key=lambda x: x.get("id", 0)):
+        parent_id = c.get("parent_id")
+        parent_node = nodes.get(parent_id) if parent_id else None
+        depth = parent_node["depth"] + 1 if parent_node is not None else 0
+        node = RecordView(c, {"replies": [], "depth": depth})
+        nodes[c["id"]] = node
+        if parent_node is not None and depth <= max_depth:
+            parent_node["replies"].append(node)
+        else:
+            roots.append(node)
+
+    return roots
+
+
+def get_comments() -> List[Dict[str, Any]]:
+    """
+    Retorna todos los comentarios del sistema ordenados por ID ascendente.
+
+    Los comentarios se retornan como lista plana (sin anidar). Para obtener
+    el árbol jerárquico usar build_comment_tree() sobre el resultado.
+
+    Returns:
+        Lista de vistas de solo lectura de los comentarios normalizados
+        (fechas, votes garantizado).
+    """
+    data = load_data()
+    comments = [_build_comment(c) for c in data.get("comments", [])]
+    comments.sort(key=lambda c: c.get("id", 0))
+    return comments
+
+
+def get_comment(comment_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Retorna un comentario por su ID, o None si no existe.
+
+    Args:
+        comment_id: ID del comentario a buscar.
+
+    Returns:
+        Dict del comentario normalizado, o None si no existe.
+    """
+    raw = _lookup(load_data(), "comments", comment_id)
+    return _build_comment(raw) if raw else None
+
+
+def _post_comments(data: Dict[str, Any], post_id: int) -> List[Dict[str, Any]]:
+    """
+    Retorna los comentarios normalizados de un post, ordenados por ID.
+
+    Usa el índice comments_by_post: el costo depende solo del número de
+    comentarios del post.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        post_id: ID del post.
+
+    Returns:
+        Lista plana de comentarios normalizados (ver _build_comment).
+    """
+    comments = [_build_comment(c) for c in _group(data, "comments_by_post", post_id)]
+    comments.sort(key=lambda c: c.get("id", 0))
+    return comments
+
+
+def _comment_tree(data: Dict[str, Any], post_id: int) -> List[RecordView]:
+    """
+    Retorna el árbol de comentarios de un post, cacheado entre escrituras.
+
+    El árbol se arma una vez (build_comment_tree) y luego las escrituras
+    sobre los comentarios del post lo corrigen en el lugar en lugar de
+    descartarlo (ver _splice_comment, _refresh_comment, _prune_comment).
+    El árbol retornado es compartido y no debe mutarse.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        post_id: ID del post.
+
+    Returns:
+        Lista de comentarios raíz con sus replies anidados.
+    """
+    return _comment_tree_cache(data, post_id)["roots"]
+
+
+def _comment_tree_cache(data: Dict[str, Any], post_id: int) -> Dict[str, Any]:
+    """
+    Retorna la entrada de caché del árbol de un post, armándola si falta.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        post_id: ID del post.
+
+    Returns:
+        Entrada del árbol (ver _comment_tree_entry). Si un escritor tocó
+        los comentarios del post mientras se armaba, la entrada se usa
+        para esta lectura pero no se cachea.
+    """
+    idx = _index(data)
+    trees = idx["comment_trees"]
+    version = idx["comment_tree_versions"].get(post_id, 0)
+    cached = trees.pop(post_id, None)
+    if cached is not None and cached["version"] == version:
+        trees[post_id] = cached  # re-insert: most recently used goes last
+        return cached
+    entry = _comment_tree_entry(build_comment_tree(_post_comments(data, post_id)), post_id, version)
+    # A writer may have touched the post's comments while the tree was
+    # being built: only cache it if the version is still the same
+    if idx["comment_tree_versions"].get(post_id, 0) == version:
+        while len(trees) >= COMMENT_TREE_CACHE_SIZE:
+            trees.pop(next(iter(trees)), None)
+        trees[post_id] = entry
+    return entry
+
+
+def _comment_tree_entry(tree: List[RecordView], post_id: Any, version: int) -> Dict[str, Any]:
+    """
+    Arma la entrada de caché de un árbol recién construido.
+
+    Args:
+        tree: Resultado de build_comment_tree() para un post.
+        post_id: ID del post.
+        version: Versión de los comentarios del post con que se armó.
+
+    Returns:
+        Dict con post_id, version, roots (el árbol), nodes (ID → nodo), children
+        (ID → IDs de los hijos que se anidaron o promovieron por
+        profundidad, en orden), last_id (mayor ID del árbol) y orders
+        (órdenes de hermanos calculados, ver _sibling_keys). Si algún
+        comentario no tiene un ID entero único (datos legacy), nodes es
+        None: el árbol se cachea igual, pero no se corrige, se descarta
+        en la próxima escritura.
+    """
+    nodes: Dict[int, RecordView] = {}
+    pending = list(tree)
+    while pending:
+        node = pending.pop()
+        comment_id = node.get("id")
+        if type(comment_id) is not int or comment_id in nodes:
+            return {"post_id": post_id, "version": version, "roots": tree, "nodes": None, "orders": {}}
+        nodes[comment_id] = node
+        pending.extend(node["replies"])
+    children: Dict[int, List[int]] = {}
+    for comment_id in sorted(nodes):
+        node = nodes[comment_id]
+        # depth > 0 means build_comment_tree found the parent, nested or not
+        if node["depth"] > 0:
+            children.setdefault(node["parent_id"], []).append(comment_id)
+    return {
+        "post_id": post_id,
+        "version": version,
+        "roots": tree,
+        "nodes": nodes,
+        "children": children,
+        "last_id": max(nodes, default=0),
+        "orders": {},
+    }
+
+
+def _patchable_tree(idx: Dict[str, Any], post_id: Any) -> Optional[Dict[str, Any]]:
+    """
+    Registra un cambio en los comentarios de un post.
 
     Args:
-        board_id: ID del board a actualizar.
-        updates: Dict con los campos a actualizar (name, description).
+        idx: Índices del documento (ver _build_indexes).
+        post_id: ID del post cuyos comentarios cambian.
 
     Returns:
-        Dict del board actualizado, o None si el board no existe.
+        La entrada cacheada del árbol del post, para corregirla, o None si
+        no hay árbol cacheado o no se puede corregir (se descarta). Quien
+        la corrige debe terminar con
+        entry["version"] = idx["comment_tree_versions"][post_id].
     """
-    data = load_data()
-    allowed = {"name", "description"}
-    for board in data.get("boards", []):
-        if board.get("id") == board_id:
-            safe_updates = {
-                key: value
-                for key, value in updates.items()
-                if value is not None and key in allowed
-            }
-            if not safe_updates:
-                return board
-            board.update(safe_updates)
-            board["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return board
-    return None
+    versions = idx["comment_tree_versions"]
+    versions[post_id] = versions.get(post_id, 0) + 1
+    entry = idx["comment_trees"].get(post_id)
+    if entry is not None and entry["nodes"] is None:
+        idx["comment_trees"].pop(post_id, None)
+        return None
+    return entry
 
 
-def delete_board(board_id: int) -> bool:
+def _sibling_index(siblings: List[RecordView], comment_id: int) -> int:
+    """Posición de comment_id en una lista de nodos ordenada por ID."""
+    lo, hi = 0, len(siblings)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if siblings[mid]["id"] < comment_id:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _splice_comment(idx: Dict[str, Any], record: Dict[str, Any]) -> None:
     """
-    Elimina un board y todos sus datos asociados en cascada.
+    Inserta un comentario nuevo en el árbol cacheado de su post.
 
-    Elimina en orden:
-    1. El board de la colección boards.
-    2. Todos los posts del board.
-    3. Todos los comentarios de esos posts.
-    4. Todos los votos sobre esos posts y comentarios.
+    Aplica la misma regla que build_comment_tree(): cuelga del padre si
+    este está en el árbol y la profundidad no supera COMMENT_MAX_DEPTH;
+    si no, va a la raíz. Como el ID nuevo es el mayor del post, el nodo
+    se agrega al final de la lista que le toca, sin reordenar nada.
 
     Args:
-        board_id: ID del board a eliminar.
+        idx: Índices del documento (ver _build_indexes).
+        record: Comentario recién insertado.
+    """
+    post_id = record.get("post_id")
+    entry = _patchable_tree(idx, post_id)
+    if entry is None:
+        return
+    comment_id = record.get("id")
+    if type(comment_id) is not int or comment_id <= entry["last_id"]:
+        # Out-of-order ID (legacy data): appending would break the order
+        idx["comment_trees"].pop(post_id, None)
+        return
+    nodes = entry["nodes"]
+    parent_id = record.get("parent_id")
+    parent = nodes.get(parent_id) if parent_id else None
+    depth = parent["depth"] + 1 if parent is not None else 0
+    node = RecordView(_build_comment(record), {"replies": [], "depth": depth})
+    nodes[comment_id] = node
+    if parent is not None:
+        entry["children"].setdefault(parent_id, []).append(comment_id)
+    # list.append is atomic: readers iterating the tree see the node or not
+    if parent is not None and depth <= COMMENT_MAX_DEPTH:
+        parent["replies"].append(node)
+        _order_insert(idx["doc"], entry, parent_id, node)
+    else:
+        entry["roots"].append(node)
+        _order_insert(idx["doc"], entry, None, node)
+    entry["last_id"] = comment_id
+    entry["version"] = idx["comment_tree_versions"][post_id]
 
-    Returns:
-        True si el board fue eliminado, False si no existía.
+
+def _refresh_comment(idx: Dict[str, Any], record: Dict[str, Any]) -> None:
     """
-    data = load_data()
-    before = len(data.get("boards", []))
-    data["boards"] = [b for b in data.get("boards", []) if b.get("id") != board_id]
-    if len(data["boards"]) != before:
-        # Cascade posts and comments for this board
-        board_post_ids = {p.get("id") for p in data.get("posts", []) if p.get("board_id") == board_id}
-        comment_ids = {c.get("id") for c in data.get("comments", []) if c.get("post_id") in board_post_ids}
-        data["posts"] = [p for p in data.get("posts", []) if p.get("board_id") != board_id]
-        data["comments"] = [c for c in data.get("comments", []) if c.get("post_id") not in board_post_ids]
-        # Cascade: remove votes on board posts and their comments
-        data["votes"] = [
-            v for v in data.get("votes", [])
-            if not (
-                (v.get("target_type") == "post" and v.get("target_id") in board_post_ids)
-                or (v.get("target_type") == "comment" and v.get("target_id") in comment_ids)
-            )
-        ]
-        save_data(data)
-        return True
-    return False
+    Reemplaza en el árbol cacheado el nodo de un comentario editado.
 
+    Cubre ediciones, votos y migraciones de fechas: cambian los campos
+    del comentario pero no su lugar en el árbol. El nodo nuevo conserva
+    depth y la lista de replies del anterior; en los órdenes ya
+    calculados solo se reubica el comentario entre sus hermanos.
 
-# ---------------------------------------------------------------------------
-# Comment helpers
-# ---------------------------------------------------------------------------
-def _build_comment(raw: Dict[str, Any]) -> Dict[str, Any]:
+    Args:
+        idx: Índices del documento (ver _build_indexes).
+        record: Comentario actualizado (mismo post_id y parent_id).
     """
-    Normaliza un comentario crudo del JSON para su uso en respuestas.
+    post_id = record.get("post_id")
+    entry = _patchable_tree(idx, post_id)
+    if entry is None:
+        return
+    nodes = entry["nodes"]
+    comment_id = record.get("id")
+    old = nodes.get(comment_id)
+    if old is None:
+        idx["comment_trees"].pop(post_id, None)
+        return
+    depth = old["depth"]
+    node = RecordView(_build_comment(record), {"replies": old["replies"], "depth": depth})
+    group = old["parent_id"] if 0 < depth <= COMMENT_MAX_DEPTH else None
+    siblings = entry["roots"] if group is None else nodes[group]["replies"]
+    # Item assignment does not shift the list under concurrent readers
+    siblings[_sibling_index(siblings, comment_id)] = node
+    nodes[comment_id] = node
+    # Votes move the comment within its sorted siblings only
+    _order_move(idx["doc"], entry, group, node)
+    entry["version"] = idx["comment_tree_versions"][post_id]
+
+
+def _prune_comment(idx: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """
+    Quita del árbol cacheado un comentario eliminado y reubica su subárbol.
 
-    Normaliza los campos de fecha y establece votes=0 si no existe.
+    Deja el árbol igual a build_comment_tree() sin el comentario: sus
+    hijos quedan huérfanos y pasan a la raíz con depth 0, y sus
+    descendientes recalculan depth, lo que puede anidar de nuevo a los
+    que estaban promovidos por profundidad. Las listas que cambian se
+    reemplazan por copias (también las de los ancestros, hasta la raíz)
+    en lugar de modificarse, para no alterar un árbol que se esté
+    serializando.
 
     Args:
-        raw: Dict de comentario tal como está almacenado en data.json.
+        idx: Índices del documento (ver _build_indexes).
+        record: Comentario eliminado.
+    """
+    post_id = record.get("post_id")
+    entry = _patchable_tree(idx, post_id)
+    if entry is None:
+        return
+    nodes, children = entry["nodes"], entry["children"]
+    comment_id = record.get("id")
+    doomed = nodes.pop(comment_id, None)
+    if doomed is None:
+        idx["comment_trees"].pop(post_id, None)
+        return
+
+    descendants: List[int] = []
+    pending = children.pop(comment_id, [])[:]
+    while pending:
+        child_id = pending.pop()
+        descendants.append(child_id)
+        pending.extend(children.pop(child_id, ()))
+    descendants.sort()
+    removed = {comment_id, *descendants}
+    roots = [n for n in entry["roots"] if n["id"] not in removed]
+    # Sorted siblings: drop the comment and its promoted descendants from
+    # their groups; the groups under the subtree are re-sorted on demand
+    _order_discard(entry, doomed["parent_id"] if 0 < doomed["depth"] <= COMMENT_MAX_DEPTH else None, comment_id)
+    for child_id in descendants:
+        if nodes[child_id]["depth"] > COMMENT_MAX_DEPTH:
+            _order_discard(entry, None, child_id)
+    _order_drop(entry, removed)
+
+    if doomed["depth"] > 0:
+        parent_id = doomed["parent_id"]
+        siblings = children[parent_id]
+        siblings.remove(comment_id)
+        if not siblings:
+            del children[parent_id]
+        if doomed["depth"] <= COMMENT_MAX_DEPTH:
+            # Copy the path from the parent up to its root
+            stale, replies = nodes[parent_id], [n for n in nodes[parent_id]["replies"] if n is not doomed]
+            while True:
+                fresh = stale.with_overlay({"replies": replies})
+                nodes[fresh["id"]] = fresh
+                if fresh["depth"] == 0:
+                    roots = [fresh if n is stale else n for n in roots]
+                    break
+                stale, replies = nodes[fresh["parent_id"]], [
+                    fresh if n is stale else n for n in nodes[fresh["parent_id"]]["replies"]
+                ]
+
+    # Re-place the subtree in ID order, as build_comment_tree() would
+    promoted: List[RecordView] = []
+    for child_id in descendants:
+        parent_id = nodes[child_id]["parent_id"]
+        depth = 0 if parent_id == comment_id else nodes[parent_id]["depth"] + 1
+        node = nodes[child_id] = nodes[child_id].with_overlay({"replies": [], "depth": depth})
+        if depth > 0:
+            children.setdefault(parent_id, []).append(child_id)
+        if 0 < depth <= COMMENT_MAX_DEPTH:
+            nodes[parent_id]["replies"].append(node)
+        else:
+            promoted.append(node)
+    if promoted:
+        roots = sorted(roots + promoted, key=lambda n: n["id"])
+    entry["roots"] = roots
+    for node in promoted:
+        _order_insert(idx["doc"], entry, None, node)
+    entry["version"] = idx["comment_tree_versions"][post_id]
 
-    Returns:
-        Copia del comentario con fechas normalizadas y votes garantizado.
+
+def get_comment_tree(post_id: int) -> List[RecordView]:
     """
-    comment = deepcopy(raw)
-    comment["created_at"] = _normalize_timestamp(comment.get("created_at"))
-    if comment.get("updated_at"):
-        comment["updated_at"] = _normalize_timestamp(comment.get("updated_at"))
-    comment.setdefault("votes", 0)
-    return comment
+    Retorna el árbol de comentarios de un post (ver build_comment_tree()).
 
+    Args:
+        post_id: ID del post.
 
-def build_comment_tree(
-    comments: List[Dict[str, Any]], max_depth: int = 6
-) -> List[Dict[str, Any]]:
+    Returns:
+        Lista de comentarios raíz, cada uno con depth y sus replies
+        anidados. Lista vacía si el post no tiene comentarios o no existe.
+        El árbol es compartido entre lecturas y no debe mutarse.
     """
-    Convierte una lista plana de comentarios en un árbol anidado.
+    return _comment_tree(load_data(), post_id)
 
-    Procesa los comentarios en orden ascendente de ID (los padres siempre
-    tienen ID menor que sus hijos, garantizando que el padre ya esté en
-    el mapa cuando se procese el hijo).
 
-    Cada nodo del árbol recibe:
-    - depth: nivel de anidación (0 = raíz).
-    - replies: lista de comentarios hijo directos.
+def _sibling_keys(data: Dict[str, Any], entry: Dict[str, Any], parent: Optional[RecordView], sort: str) -> List[Tuple]:
+    """
+    Claves de orden de un grupo de hermanos, de menor a mayor.
 
-    Los comentarios cuyo depth superaría max_depth son promovidos al
-    nivel raíz en lugar de ser descartados.
+    Cada grupo (raíces del post o replies de un comentario) se ordena la
+    primera vez que se pide en un orden, y desde entonces las escrituras
+    lo mantienen (ver _order_insert, _order_move, _order_discard). Se
+    guardan en entry["orders"][sort] como groups (ID del padre o None →
+    claves) y key_of (ID → clave vigente).
 
     Args:
-        comments: Lista plana de dicts de comentario (sin replies ni depth).
-        max_depth: Profundidad máxima de anidación permitida. Default: 6
-                   (equivalente al límite de Reddit).
+        data: Documento completo cargado con load_data().
+        entry: Entrada del árbol (ver _comment_tree_entry), con nodes.
+        parent: Nodo padre del grupo, o None para las raíces.
+        sort: Orden (clave de COMMENT_SORTS).
 
     Returns:
-        Lista de comentarios raíz, cada uno con su subárbol de replies
-        anidado recursivamente.
+        Lista ordenada de claves; el último elemento de cada clave es el
+        ID del comentario. Compartida: no debe mutarse.
     """
-    nodes: Dict[int, Dict[str, Any]] = {}
-    roots: List[Dict[str, Any]] = []
-
-    for c in sorted(comments, key=lambda x: x.get("id", 0)):
-        node = {**c, "replies": [], "depth": 0}
-        nodes[c["id"]] = node
-        parent_id = c.get("parent_id")
-        if parent_id and parent_id in nodes:
-            parent_node = nodes[parent_id]
-            node["depth"] = parent_node["depth"] + 1
-            if node["depth"] <= max_depth:
-                parent_node["replies"].append(node)
-            else:
-                roots.append(node)
-        else:
-            roots.append(node)
+    group = parent["id"] if parent is not None else None
+    order = entry["orders"].get(sort)
+    if order is None:
+        order = entry["orders"].setdefault(sort, {"groups": {}, "key_of": {}})
+    keys = order["groups"].get(group)
+    if keys is not None:
+        return keys
+    idx = _index(data)
+    version = idx["comment_tree_versions"].get(entry["post_id"], 0)
+    key = COMMENT_SORTS[sort]
+    keys = sorted(key(data, n) for n in tuple(entry["roots"] if parent is None else parent["replies"]))
+    # Same guard as _comment_tree_cache(): a group sorted while a writer
+    # was patching the tree may miss its change, so it is not kept
+    if idx["comment_tree_versions"].get(entry["post_id"], 0) == version:
+        key_of = order["key_of"]
+        for k in keys:
+            key_of[k[-1]] = k
+        order["groups"][group] = keys
+    return keys
+
+
+def _order_insert(data: Dict[str, Any], entry: Dict[str, Any], group: Optional[int], node: RecordView) -> None:
+    """Agrega node al grupo group de cada orden ya calculado (copia la lista)."""
+    for sort, order in tuple(entry["orders"].items()):
+        keys = order["groups"].get(group)
+        if keys is None:
+            continue
+        key = COMMENT_SORTS[sort](data, node)
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            continue  # sorted by a reader after the node was placed
+        order["groups"][group] = keys[:pos] + [key] + keys[pos:]
+        order["key_of"][node["id"]] = key
+
+
+def _order_discard(entry: Dict[str, Any], group: Optional[int], comment_id: int) -> None:
+    """Quita comment_id del grupo group de cada orden ya calculado (copia la lista)."""
+    for order in tuple(entry["orders"].values()):
+        key = order["key_of"].pop(comment_id, None)
+        keys = order["groups"].get(group)
+        if key is None or keys is None:
+            continue
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            order["groups"][group] = keys[:pos] + keys[pos + 1 :]
+
+
+def _order_move(data: Dict[str, Any], entry: Dict[str, Any], group: Optional[int], node: RecordView) -> None:
+    """Reubica node dentro de su grupo en los órdenes cuya clave cambió."""
+    for sort, order in tuple(entry["orders"].items()):
+        keys = order["groups"].get(group)
+        if keys is None:
+            continue
+        old, new = order["key_of"].get(node["id"]), COMMENT_SORTS[sort](data, node)
+        if old == new:
+            continue
+        moved = list(keys)
+        pos = bisect_left(moved, old) if old is not None else len(moved)
+        if pos < len(moved) and moved[pos] == old:
+            del moved[pos]
+        pos = bisect_left(moved, new)
+        if pos == len(moved) or moved[pos] != new:
+            moved.insert(pos, new)
+        order["groups"][group] = moved
+        order["key_of"][node["id"]] = new
+
+
+def _order_drop(entry: Dict[str, Any], groups: Iterable[int]) -> None:
+    """Descarta los grupos indicados de todos los órdenes; se recalculan al pedirlos."""
+    for order in tuple(entry["orders"].values()):
+        for group in groups:
+            order["groups"].pop(group, None)
+
+
+def _ordered_siblings(
+    data: Dict[str, Any],
+    entry: Dict[str, Any],
+    parent: Optional[RecordView],
+    sort: str,
+    cursor: Optional[int],
+    limit: int,
+) -> Tuple[List[RecordView], int]:
+    """
+    Retorna una página de un grupo de hermanos en el orden pedido.
 
-    return roots
+    Args:
+        data: Documento completo cargado con load_data().
+        entry: Entrada del árbol (ver _comment_tree_entry).
+        parent: Nodo padre del grupo, o None para las raíces.
+        sort: "old" (ID ascendente, el orden del árbol) o una clave de
+            COMMENT_SORTS.
+        cursor: ID del último comentario visto. Con "old" la página sigue
+            desde los IDs mayores; con los demás, desde la posición
+            actual de ese comentario en el orden.
+        limit: Máximo de comentarios de la página.
 
+    Returns:
+        Tupla (nodos de la página, cuántos hermanos quedan después).
 
-def get_comments() -> List[Dict[str, Any]]:
+    Raises:
+        ValueError "invalid_cursor": El comentario del cursor no está en
+            el árbol (orden distinto de "old").
     """
-    Retorna todos los comentarios del sistema ordenados por ID ascendente.
+    siblings = entry["roots"] if parent is None else parent["replies"]
+    if sort == "old":
+        start = _sibling_index(siblings, cursor + 1) if cursor is not None else 0
+        return siblings[start : start + limit], max(len(siblings) - start - limit, 0)
+    key = COMMENT_SORTS[sort]
+    nodes = entry["nodes"]
+    if nodes is None:
+        # Legacy tree without unique IDs: sort the group on every read
+        ordered = sorted(siblings, key=lambda n: key(data, n))
+        start = 0
+        if cursor is not None:
+            start = next((i + 1 for i, n in enumerate(ordered) if n.get("id") == cursor), -1)
+            if start < 0:
+                raise ValueError("invalid_cursor")
+        return ordered[start : start + limit], max(len(ordered) - start - limit, 0)
+    keys = _sibling_keys(data, entry, parent, sort)
+    start = 0
+    if cursor is not None:
+        last = nodes.get(cursor)
+        if last is None:
+            raise ValueError("invalid_cursor")
+        start = bisect_right(keys, key(data, last))
+    page = [nodes.get(k[-1]) for k in keys[start : start + limit]]
+    return [n for n in page if n is not None], max(len(keys) - start - limit, 0)
+
+
+def _comment_page(
+    data: Dict[str, Any],
+    entry: Dict[str, Any],
+    parent: Optional[RecordView],
+    limit: int,
+    cursor: Optional[int],
+    max_depth: int,
+    replies_limit: Optional[int],
+    sort: str,
+) -> Tuple[List[RecordView], Optional[int]]:
+    """
+    Pagina un grupo de hermanos y recorta el subárbol de cada uno.
 
-    Los comentarios se retornan como lista plana (sin anidar). Para obtener
-    el árbol jerárquico usar build_comment_tree() sobre el resultado.
+    Bajo cada comentario de la página se incluyen a lo sumo max_depth
+    niveles y replies_limit replies por comentario, todas en el orden
+    sort, de modo que el tamaño del resultado queda acotado sin importar
+    la forma del hilo. Los comentarios recortados indican cuántas replies
+    directas quedaron fuera (more_replies) y desde dónde seguir
+    (replies_cursor: ID de la última reply incluida, o None si no se
+    incluyó ninguna). Los nodos del árbol cacheado no se modifican: se
+    retornan vistas nuevas.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        entry: Entrada del árbol (ver _comment_tree_entry).
+        parent: Nodo padre del grupo a paginar, o None para las raíces.
+        limit: Máximo de comentarios de la página.
+        cursor: Ver _ordered_siblings().
+        max_depth: Niveles de replies a incluir bajo cada comentario.
+        replies_limit: Máximo de replies incluidas por comentario, o None
+            para incluirlas todas.
+        sort: Ver _ordered_siblings().
 
     Returns:
-        Lista de dicts de comentario normalizados (fechas, votes garantizado).
+        Tupla (página, next_cursor). next_cursor es None si no hay más.
     """
-    data = load_data()
-    comments = [_build_comment(c) for c in data.get("comments", [])]
-    comments.sort(key=lambda c: c.get("id", 0))
-    return comments
+    def _trim(node: RecordView, levels: int) -> RecordView:
+        if levels > 0:
+            width = len(node["replies"]) if replies_limit is None else replies_limit
+            shown, rest = _ordered_siblings(data, entry, node, sort, None, width)
+        else:
+            shown, rest = [], len(node["replies"])
+        overlay: Dict[str, Any] = {"replies": [_trim(r, levels - 1) for r in shown]}
+        if rest:
+            overlay["more_replies"] = rest
+            overlay["replies_cursor"] = shown[-1]["id"] if shown else None
+        return node.with_overlay(overlay)
+
+    page, rest = _ordered_siblings(data, entry, parent, sort, cursor, limit)
+    next_cursor = page[-1]["id"] if page and rest else None
+    return [_trim(node, max_depth) for node in page], next_cursor
+
+
+def get_comment_page(
+    post_id: int,
+    limit: int,
+    cursor: Optional[int],
+    max_depth: int,
+    replies_limit: Optional[int],
+    sort: str = "old",
+) -> Tuple[List[RecordView], Optional[int]]:
+    """
+    Retorna una página de comentarios raíz de un post con su árbol recortado.
 
+    Args:
+        post_id: ID del post.
+        limit: Máximo de comentarios raíz.
+        cursor: ID del último comentario raíz visto (ver _ordered_siblings).
+        max_depth: Niveles de replies a incluir bajo cada raíz (0 = ninguno).
+        replies_limit: Máximo de replies incluidas por comentario (None = todas).
+        sort: Orden dentro de cada grupo de hermanos: "old" (default, ID
+            ascendente) o una clave de COMMENT_SORTS.
 
-def get_comment(comment_id: int) -> Optional[Dict[str, Any]]:
+    Returns:
+        Tupla (comentarios raíz recortados, next_cursor). Ver _comment_page().
+
+    Raises:
+        ValueError "invalid_cursor": Ver _ordered_siblings().
     """
-    Retorna un comentario por su ID, o None si no existe.
+    data = load_data()
+    entry = _comment_tree_cache(data, post_id)
+    return _comment_page(data, entry, None, limit, cursor, max_depth, replies_limit, sort)
+
+
+def get_reply_page(
+    comment_id: int,
+    limit: int,
+    cursor: Optional[int],
+    max_depth: int,
+    replies_limit: Optional[int],
+    sort: str = "old",
+) -> Optional[Tuple[List[RecordView], Optional[int]]]:
+    """
+    Retorna una página de las replies directas de un comentario, recortadas.
+
+    Son las del campo replies del nodo en get_comment_tree(): los
+    comentarios promovidos a la raíz por profundidad no se cuentan.
 
     Args:
-        comment_id: ID del comentario a buscar.
+        comment_id: ID del comentario.
+        limit: Máximo de replies directas.
+        cursor: ID de la última reply vista (ver _ordered_siblings).
+        max_depth: Niveles de replies a incluir bajo cada reply.
+        replies_limit: Máximo de replies incluidas por comentario (None = todas).
+        sort: Ver get_comment_page().
 
     Returns:
-        Dict del comentario normalizado, o None si no existe.
+        Tupla (replies recortadas, next_cursor), o None si el comentario
+        no existe.
+
+    Raises:
+        ValueError "invalid_cursor": Ver _ordered_siblings().
     """
     data = load_data()
-    raw = next((c for c in data.get("comments", []) if c.get("id") == comment_id), None)
-    return _build_comment(raw) if raw else None
+    comment = _lookup(data, "comments", comment_id)
+    if comment is None:
+        return None
+    entry = _comment_tree_cache(data, comment.get("post_id"))
+    if entry["nodes"] is not None:
+        parent = entry["nodes"].get(comment_id)
+    else:
+        # Legacy tree without unique IDs: walk it
+        parent, pending = None, list(entry["roots"])
+        while pending and parent is None:
+            node = pending.pop()
+            parent = node if node.get("id") == comment_id else None
+            pending.extend(node["replies"])
+    if parent is None:
+        return [], None
+    return _comment_page(data, entry, parent, limit, cursor, max_depth, replies_limit, sort)
 
 
 def get_comments_for_post(post_id: int) -> List[Dict[str, Any]]:
@@ -731,9 +3036,10 @@ def get_comments_for_post(post_id: int) -> List[Dict[str, Any]]:
         Lista plana de dicts de comentario del post, ordenados por ID.
         Lista vacía si el post no tiene comentarios o no existe.
     """
-    return [c for c in get_comments() if c.get("post_id") == post_id]
+    return _post_comments(load_data(), post_id)
 
 
+@_serialized
 def create_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
     """
     Crea un nuevo comentario y lo persiste en data.json.
@@ -764,24 +3070,22 @@ def create_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
 
     parent_id = comment.get("parent_id")
     if parent_id is not None:
-        parent = next(
-            (c for c in data.get("comments", []) if c.get("id") == parent_id),
-            None,
-        )
+        parent = _lookup(data, "comments", parent_id)
         if parent is None:
             raise ValueError("parent_not_found")
         if parent.get("post_id") != comment.get("post_id"):
             raise ValueError("parent_wrong_post")
 
     comment_copy = deepcopy(comment)
-    comment_copy["id"] = _next_id(data.get("comments", []))
+    comment_copy["id"] = _allocate_id(data, "comments")
     comment_copy.setdefault("votes", 0)
     comment_copy["created_at"] = _now_utc_iso()
-    data.setdefault("comments", []).append(comment_copy)
-    save_data(data)
-    return _build_comment(comment_copy)
+    stored = _insert_record(data, "comments", comment_copy)
+    _commit(data)
+    return _build_comment(stored)
 
 
+@_serialized
 def update_comment(comment_id: int, body: str) -> Optional[Dict[str, Any]]:
     """
     Actualiza el campo body de un comentario existente.
@@ -795,22 +3099,23 @@ def update_comment(comment_id: int, body: str) -> Optional[Dict[str, Any]]:
         o None si el comentario no existe.
     """
     data = load_data()
-    for comment in data.get("comments", []):
-        if comment.get("id") == comment_id:
-            comment["body"] = body
-            comment["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return _build_comment(comment)
-    return None
+    comment = _lookup(data, "comments", comment_id)
+    if comment is None:
+        return None
+    _update_record(data, "comments", comment, {"body": body, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return _build_comment(comment)
 
 
+@_serialized
 def delete_comment(comment_id: int) -> bool:
     """
     Elimina un comentario y sus votos asociados en cascada.
 
     Nota: los comentarios hijo (replies) NO son eliminados automáticamente;
     quedan huérfanos con un parent_id que ya no existe. build_comment_tree()
-    los promueve a nivel raíz en ese caso.
+    los promueve a nivel raíz en ese caso, y el árbol cacheado del post se
+    corrige igual sin reconstruirse (ver _prune_comment).
 
     Args:
         comment_id: ID del comentario a eliminar.
@@ -819,45 +3124,21 @@ def delete_comment(comment_id: int) -> bool:
         True si el comentario fue eliminado, False si no existía.
     """
     data = load_data()
-    before = len(data.get("comments", []))
-    data["comments"] = [c for c in data.get("comments", []) if c.get("id") != comment_id]
-    if len(data["comments"]) != before:
-        # Cascade: remove votes on this comment
-        data["votes"] = [
-            v for v in data.get("votes", [])
-            if not (v.get("target_type") == "comment" and v.get("target_id") == comment_id)
-        ]
-        save_data(data)
-        return True
-    return False
+    comment = _lookup(data, "comments", comment_id)
+    if comment is None:
+        return False
+    _discount_karma(data, "comment", [comment])
+    _discard_records(data, "comments", [comment])
+    # Cascade: remove votes on this comment
+    _discard_records(data, "votes", _group(data, "votes_by_target", ("comment", comment_id)))
+    _commit(data)
+    return True
 
 
 # ---------------------------------------------------------------------------
 # Post services
 # ---------------------------------------------------------------------------
-def _group_comments_by_post(comments: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
-    """
-    Agrupa una lista plana de comentarios por post_id.
-
-    Dentro de cada grupo, los comentarios se ordenan por ID ascendente
-    para que build_comment_tree() los procese en orden correcto.
-
-    Args:
-        comments: Lista plana de dicts de comentario.
-
-    Returns:
-        Dict donde la clave es post_id y el valor es la lista de
-        comentarios de ese post, ordenados por ID.
-    """
-    grouped: Dict[int, List[Dict[str, Any]]] = {}
-    for comment in comments:
-        grouped.setdefault(comment.get("post_id"), []).append(comment)
-    for bucket in grouped.values():
-        bucket.sort(key=lambda c: c.get("id", 0))
-    return grouped
-
-
-def _hot_score(post: Dict[str, Any]) -> float:
+def _hot_score(post: Dict[str, Any], now: Optional[datetime] = None) -> float:
     """
     Calcula el hot score de un post con el algoritmo inspirado en Reddit.
 
@@ -869,24 +3150,29 @@ def _hot_score(post: Dict[str, Any]) -> float:
 
     Args:
         post: Dict del post con campos 'votes' y 'created_at'.
+        now: Instante de referencia (UTC). Default: ahora. El feed hot
+            pasa el inicio de su intervalo (ver _hot_bucket_now).
 
     Returns:
         Float con el hot score. Mayor = más relevante. Puede ser negativo
         si el post tiene más downvotes que upvotes.
     """
-    votes = post.get("votes", 0)
-    raw = post.get("created_at", "")
-    try:
-        created_dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
-        if created_dt.tzinfo is None:
-            created_dt = created_dt.replace(tzinfo=timezone.utc)
-    except (ValueError, TypeError):
-        created_dt = datetime.now(timezone.utc)
-    hours = max((datetime.now(timezone.utc) - created_dt).total_seconds() / 3600, 0)
+    votes = post.get("votes") or 0
+    if now is None:
+        now = datetime.now(timezone.utc)
+    created = _created_epoch(post)
+    hours = max((now.timestamp() - created) / 3600, 0) if created else 0
     return votes / ((hours + 2) ** 1.5)
 
 
-def get_posts_sorted(sort: str = "new") -> List[Dict[str, Any]]:
+def _feed_name(sort: str) -> str:
+    """Nombre del feed ordenado para un criterio; lo desconocido cae en "new"."""
+    return {"top": "posts_top", "hot": "posts_hot"}.get(sort, "posts_new")
+
+
+def get_posts_sorted(
+    sort: str = "new", *, include_comments: bool = True, board_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Retorna todos los posts ordenados según el criterio indicado.
 
@@ -896,21 +3182,178 @@ def get_posts_sorted(sort: str = "new") -> List[Dict[str, Any]]:
     - "hot": orden descendente por hot score (ver _hot_score).
 
     Cualquier valor distinto de "top" y "hot" produce el orden "new".
+    Los empates se resuelven por ID ascendente. El orden sale de los feeds
+    precalculados (_SORTED_INDEXES): no se ordena en cada llamada.
 
     Args:
         sort: Criterio de ordenamiento. Default: "new".
+        include_comments: Si es False, se usa la proyección resumida
+            (get_post_summaries): sin árbol de comentarios, con
+            comment_count desde el índice. Default: True.
+        board_id: Si se indica, solo los posts de ese board.
 
     Returns:
         Lista completa de posts enriquecidos (con comments, comment_count,
         votes, etc.) ordenados según el criterio elegido.
     """
-    posts = get_posts()
-    if sort == "top":
-        return sorted(posts, key=lambda p: p.get("votes", 0), reverse=True)
-    if sort == "hot":
-        return sorted(posts, key=_hot_score, reverse=True)
-    # "new": newest first by created_at
-    return sorted(posts, key=lambda p: p.get("created_at", ""), reverse=True)
+    posts, _ = get_posts_page(
+        sort, None, include_comments=include_comments, board_id=board_id
+    )
+    return posts
+
+
+def get_posts_page(
+    sort: str = "new",
+    limit: Optional[int] = 20,
+    *,
+    cursor: Optional[str] = None,
+    after_id: Optional[int] = None,
+    include_comments: bool = True,
+    board_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Retorna una página de posts recorriendo el feed ordenado correspondiente.
+
+    Paginación keyset: el cursor codifica la clave de orden y el ID del
+    último post entregado, y la página siguiente se retoma con una búsqueda
+    binaria sobre el feed (O(log n)). Como la posición se fija por clave y
+    no por índice, los cambios de votos entre páginas no duplican ni saltan
+    posts que no se hayan movido. Solo se construyen los posts de la página.
+
+    En el feed hot el cursor incluye además el intervalo de los scores
+    (HOT_SCORE_BUCKET_SECONDS). Si el feed se recalculó desde entonces, la
+    clave vieja no es comparable con las nuevas: se retoma después del
+    último post entregado, según su score actual.
+
+    Args:
+        sort: Criterio de ordenamiento (ver get_posts_sorted).
+        limit: Tamaño de página. None retorna el resto del feed.
+        cursor: Cursor opaco retornado por una llamada anterior con el
+            mismo sort.
+        after_id: Cursor legacy por ID: omite los posts con ID <= after_id.
+            Recorre el feed completo; se ignora si se pasa cursor.
+        include_comments: Si es False, usa la proyección resumida.
+        board_id: Si se indica, usa el feed de ese board en lugar del global.
+
+    Returns:
+        Tupla (posts, next_cursor): la página de posts enriquecidos y el
+        cursor para pedir la siguiente, o None si no quedan más.
+
+    Raises:
+        ValueError "invalid_cursor": Si el cursor está mal formado,
+            pertenece a otro criterio de ordenamiento o es de un intervalo
+            hot anterior y su último post ya no está en el feed.
+    """
+    name = _feed_name(sort)
+    hot = name == "posts_hot"
+    start = 0
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if (
+            len(values) != (4 if hot else 3)
+            or values[0] != name
+            or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values[1:])
+        ):
+            raise ValueError("invalid_cursor")
+    data = load_data()
+    feed = _feed(data, name, board_id)
+    if feed is None:
+        return [], None
+    keys, records = feed["keys"], feed["records"]
+    if cursor is not None:
+        order, last_id = values[1], values[2]
+        if hot and values[3] != feed["hot_now"].timestamp():
+            # Issued before the scores were recomputed: anchor on the last post
+            anchor = _lookup(data, "posts", last_id)
+            if anchor is None or id(anchor) not in records:
+                raise ValueError("invalid_cursor")
+            order = -_hot_score(anchor, now=feed["hot_now"])
+        # Resume strictly after (order, id), whatever record now sits there
+        start = bisect_right(keys, (order, last_id, math.inf))
+    selected: List[Tuple[float, Any, int]] = []
+    for pos in range(start, len(keys)):
+        entry = keys[pos]
+        if cursor is None and after_id is not None and records[entry[2]].get("id") <= after_id:
+            continue
+        if limit is not None and len(selected) == limit:
+            last = selected[-1]
+            posts = [_build_post_view(data, records[e[2]], include_comments) for e in selected]
+            bucket = [int(feed["hot_now"].timestamp())] if hot else []
+            return posts, encode_cursor([name, last[0], last[1], *bucket])
+        selected.append(entry)
+    return [_build_post_view(data, records[e[2]], include_comments) for e in selected], None
+
+
+def _post_overlay(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula las fechas normalizadas y los campos opcionales de un post.
+
+    Args:
+        entry: Dict del post tal como está almacenado (no se modifica).
+
+    Returns:
+        Dict con los campos a superponer sobre el registro en su vista.
+    """
+    overlay = _time_overlay(entry)
+    if "votes" not in entry:
+        overlay["votes"] = 0
+    if "score" not in entry:
+        overlay["score"] = entry.get("votes", 0)
+    if "tags" not in entry:
+        overlay["tags"] = []
+    if "attachments" not in entry:
+        overlay["attachments"] = []
+    return overlay
+
+
+def _build_post(data: Dict[str, Any], entry: Dict[str, Any]) -> RecordView:
+    """
+    Normaliza un post crudo del JSON y le adjunta su árbol de comentarios.
+
+    Enriquece el post con:
+    - Fechas normalizadas (created_at, updated_at).
+    - votes, score, tags, attachments con valores por defecto.
+    - comment_count: número de comentarios del post.
+    - comments: árbol anidado de comentarios (via _comment_tree, cacheado).
+
+    Args:
+        data: Documento completo cargado con load_data().
+        entry: Dict del post tal como está almacenado en data.json.
+
+    Returns:
+        Vista de solo lectura del post enriquecido.
+    """
+    overlay = _post_overlay(entry)
+    overlay["comment_count"] = len(_index(data)["comments_by_post"].get(entry.get("id"), ()))
+    overlay["comments"] = _comment_tree(data, entry.get("id"))
+    return RecordView(entry, overlay)
+
+
+def _build_post_view(data: Dict[str, Any], entry: Dict[str, Any], include_comments: bool) -> RecordView:
+    """Construye el post completo o su proyección resumida."""
+    if include_comments:
+        return _build_post(data, entry)
+    return _build_post_summary(data, entry)
+
+
+def _build_post_summary(data: Dict[str, Any], entry: Dict[str, Any]) -> RecordView:
+    """
+    Proyección resumida de un post: mismos campos que _build_post, sin árbol.
+
+    comment_count se obtiene del índice comments_by_post, sin recorrer ni
+    copiar los comentarios.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        entry: Dict del post tal como está almacenado en data.json.
+
+    Returns:
+        Vista de solo lectura del post con comment_count y comments = [].
+    """
+    overlay = _post_overlay(entry)
+    overlay["comment_count"] = len(_index(data)["comments_by_post"].get(entry.get("id"), ()))
+    overlay["comments"] = []
+    return RecordView(entry, overlay)
 
 
 def get_posts() -> List[Dict[str, Any]]:
@@ -921,33 +3364,18 @@ def get_posts() -> List[Dict[str, Any]]:
     - Fechas normalizadas (created_at, updated_at).
     - votes, score, tags, attachments con valores por defecto.
     - comment_count: número de comentarios del post.
-    - comments: árbol anidado de comentarios (via build_comment_tree).
+    - comments: árbol anidado de comentarios (via _comment_tree, cacheado).
 
     Los posts se retornan ordenados por ID ascendente. Para ordenar por
     otros criterios, usar get_posts_sorted().
 
     Returns:
-        Lista de dicts de post enriquecidos, ordenados por ID ascendente.
+        Lista de vistas de solo lectura (RecordView) de los posts
+        enriquecidos, ordenadas por ID ascendente. No se copia ningún
+        registro del documento.
     """
     data = load_data()
-    comments = [_build_comment(c) for c in data.get("comments", [])]
-    comments_by_post = _group_comments_by_post(comments)
-
-    posts: List[Dict[str, Any]] = []
-    for entry in data.get("posts", []):
-        post = deepcopy(entry)
-        post["created_at"] = _normalize_timestamp(post.get("created_at"))
-        if post.get("updated_at"):
-            post["updated_at"] = _normalize_timestamp(post.get("updated_at"))
-        post.setdefault("votes", 0)
-        post.setdefault("score", post.get("votes", 0))
-        post.setdefault("tags", [])
-        post.setdefault("attachments", [])
-        post_comments = comments_by_post.get(post.get("id"), [])
-        post["comment_count"] = len(post_comments)
-        post["comments"] = build_comment_tree(post_comments)
-        posts.append(post)
-
+    posts = [_build_post(data, entry) for entry in data.get("posts", [])]
     posts.sort(key=lambda p: p.get("id", 0))
     return posts
 
@@ -956,6 +3384,10 @@ def get_post(post_id: int) -> Optional[Dict[str, Any]]:
     """
     Busca y retorna un post por su ID, con comentarios anidados incluidos.
 
+    Solo construye el post pedido y su árbol de comentarios: el post se
+    obtiene por el índice de clave primaria y sus comentarios por el
+    índice comments_by_post, sin materializar el resto de posts.
+
     Args:
         post_id: ID entero del post a buscar.
 
@@ -963,9 +3395,60 @@ def get_post(post_id: int) -> Optional[Dict[str, Any]]:
         Dict del post enriquecido (con comments, comment_count, votes, etc.)
         si existe, None si no se encuentra.
     """
-    return next((post for post in get_posts() if post.get("id") == post_id), None)
+    data = load_data()
+    entry = _lookup(data, "posts", post_id)
+    if entry is None:
+        return None
+    return _build_post(data, entry)
+
+
+def get_post_summaries(board_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Retorna la proyección resumida de los posts, sin árbol de comentarios.
+
+    Pensada para listados: cada post incluye comment_count (tomado del
+    índice comments_by_post) y comments = []. No se construye ningún árbol
+    ni se hace deepcopy de los posts.
+
+    Args:
+        board_id: Si se indica, solo se retornan los posts de ese board
+            (via índice posts_by_board). Default: todos los posts.
+
+    Returns:
+        Lista de posts resumidos ordenados por ID ascendente.
+    """
+    data = load_data()
+    if board_id is None:
+        entries = data.get("posts", [])
+    else:
+        entries = _group(data, "posts_by_board", board_id)
+    posts = [_build_post_summary(data, entry) for entry in entries]
+    posts.sort(key=lambda p: p.get("id", 0))
+    return posts
+
+
+def get_post_summary(post_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Busca un post por ID y retorna su proyección resumida.
+
+    Útil para chequeos de existencia, bloqueo o autoría donde el árbol de
+    comentarios no se usa.
+
+    Args:
+        post_id: ID entero del post a buscar.
+
+    Returns:
+        Dict del post resumido (comment_count, comments = []) si existe,
+        None si no se encuentra.
+    """
+    data = load_data()
+    entry = _lookup(data, "posts", post_id)
+    if entry is None:
+        return None
+    return _build_post_summary(data, entry)
 
 
+@_serialized
 def create_post(post: Dict[str, Any]) -> Dict[str, Any]:
     """
     Crea un nuevo post y lo persiste en data.json.
@@ -997,7 +3480,7 @@ def create_post(post: Dict[str, Any]) -> Dict[str, Any]:
 
     data = load_data()
     post_copy = deepcopy(post)
-    post_copy["id"] = _next_id(data.get("posts", []))
+    post_copy["id"] = _allocate_id(data, "posts")
     post_copy["created_at"] = _now_utc_iso()
     post_copy.setdefault("votes", 0)
     post_copy.setdefault("score", 0)
@@ -1006,21 +3489,20 @@ def create_post(post: Dict[str, Any]) -> Dict[str, Any]:
     post_copy.pop("comments", None)
     post_copy.pop("comment_count", None)
 
-    data.setdefault("posts", []).append(post_copy)
+    _insert_record(data, "posts", post_copy)
 
-    for user in data.get("users", []):
-        if user.get("id") == post_copy["user_id"]:
-            
-            user.setdefault("posts", [])
-            if post_copy["id"] not in user["posts"]:
-                user["posts"].append(post_copy["id"])
-            break
+    author = _lookup(data, "users", post_copy["user_id"])
+    if author is not None:
+        author_posts = author.get("posts", [])
+        if post_copy["id"] not in author_posts:
+            _update_record(data, "users", author, {"posts": [*author_posts, post_copy["id"]]})
 
-    save_data(data)
+    _commit(data)
     created = get_post(post_copy["id"])
     return created if created else post_copy
 
 
+@_serialized
 def update_post(post_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Actualiza los campos de un post existente.
@@ -1040,22 +3522,22 @@ def update_post(post_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any
     """
     data = load_data()
     allowed = {"title", "body", "board_id", "tags"}
-    for post in data.get("posts", []):
-        if post.get("id") == post_id:
-            safe_updates = {
-                key: value
-                for key, value in updates.items()
-                if value is not None and key in allowed
-            }
-            if not safe_updates:
-                return get_post(post_id)
-            post.update(safe_updates)
-            post["updated_at"] = _now_utc_iso()
-            save_data(data)
-            return get_post(post_id)
-    return None
+    post = _lookup(data, "posts", post_id)
+    if post is None:
+        return None
+    safe_updates = {
+        key: value
+        for key, value in updates.items()
+        if value is not None and key in allowed
+    }
+    if not safe_updates:
+        return get_post(post_id)
+    _update_record(data, "posts", post, {**safe_updates, "updated_at": _now_utc_iso()})
+    _commit(data)
+    return get_post(post_id)
 
 
+@_serialized
 def lock_post(post_id: int) -> Optional[Dict[str, Any]]:
     """
     Bloquea un post marcando locked=True, impidiendo nuevos comentarios.
@@ -1069,14 +3551,15 @@ def lock_post(post_id: int) -> Optional[Dict[str, Any]]:
         Dict del post actualizado, o None si el post no existe.
     """
     data = load_data()
-    for post in data.get("posts", []):
-        if post.get("id") == post_id:
-            post["locked"] = True
-            save_data(data)
-            return deepcopy(post)
-    return None
+    post = _lookup(data, "posts", post_id)
+    if post is None:
+        return None
+    _update_record(data, "posts", post, {"locked": True})
+    _commit(data)
+    return deepcopy(post)
 
 
+@_serialized
 def sticky_post(post_id: int) -> Optional[Dict[str, Any]]:
     """
     Fija un post en la parte superior de su board marcando sticky=True.
@@ -1090,14 +3573,15 @@ def sticky_post(post_id: int) -> Optional[Dict[str, Any]]:
         Dict del post actualizado, o None si el post no existe.
     """
     data = load_data()
-    for post in data.get("posts", []):
-        if post.get("id") == post_id:
-            post["sticky"] = True
-            save_data(data)
-            return deepcopy(post)
-    return None
+    post = _lookup(data, "posts", post_id)
+    if post is None:
+        return None
+    _update_record(data, "posts", post, {"sticky": True})
+    _commit(data)
+    return deepcopy(post)
 
 
+@_serialized
 def shadowban_user(user_id: int) -> Optional[Dict[str, Any]]:
     """
     Aplica un shadowban a un usuario marcando shadowbanned=True.
@@ -1112,14 +3596,15 @@ def shadowban_user(user_id: int) -> Optional[Dict[str, Any]]:
         Dict del usuario actualizado, o None si el usuario no existe.
     """
     data = load_data()
-    for user in data.get("users", []):
-        if user.get("id") == user_id:
-            user["shadowbanned"] = True
-            save_data(data)
-            return deepcopy(user)
-    return None
+    user = _lookup(data, "users", user_id)
+    if user is None:
+        return None
+    _update_record(data, "users", user, {"shadowbanned": True})
+    _commit(data)
+    return deepcopy(user)
 
 
+@_serialized
 def delete_post(post_id: int) -> bool:
     """
     Elimina un post y todos sus datos asociados en cascada.
@@ -1137,26 +3622,27 @@ def delete_post(post_id: int) -> bool:
         True si el post fue eliminado, False si no existía.
     """
     data = load_data()
-    before = len(data.get("posts", []))
-    data["posts"] = [p for p in data.get("posts", []) if p.get("id") != post_id]
-    if len(data.get("posts", [])) != before:
-        # Collect comment IDs before removing them
-        comment_ids = {c.get("id") for c in data.get("comments", []) if c.get("post_id") == post_id}
-        data["comments"] = [c for c in data.get("comments", []) if c.get("post_id") != post_id]
-        # Cascade: remove votes on the post and its comments
-        data["votes"] = [
-            v for v in data.get("votes", [])
-            if not (
-                (v.get("target_type") == "post" and v.get("target_id") == post_id)
-                or (v.get("target_type") == "comment" and v.get("target_id") in comment_ids)
-            )
-        ]
-        for user in data.get("users", []):
-            if post_id in user.get("posts", []):
-                user["posts"].remove(post_id)
-        save_data(data)
-        return True
-    return False
+    post = _lookup(data, "posts", post_id)
+    if post is None:
+        return False
+    # Collect comments before removing them
+    doomed_comments = _group(data, "comments_by_post", post_id)
+    _discount_karma(data, "post", [post])
+    _discount_karma(data, "comment", doomed_comments)
+    _discard_records(data, "posts", [post])
+    # Cascade: remove votes on the post and its comments
+    doomed_votes = _group(data, "votes_by_target", ("post", post_id))
+    for comment in doomed_comments:
+        doomed_votes.extend(_group(data, "votes_by_target", ("comment", comment.get("id"))))
+    _discard_records(data, "comments", doomed_comments)
+    _discard_records(data, "votes", doomed_votes)
+    author = _lookup(data, "users", post.get("user_id"))
+    if author is not None and post_id in author.get("posts", []):
+        _update_record(
+            data, "users", author, {"posts": [pid for pid in author["posts"] if pid != post_id]}
+        )
+    _commit(data)
+    return True
 
 
 # ---------------------------------------------------------------------------
@@ -1188,7 +3674,9 @@ def _aggregate_vote_stats(votes: list[dict], target_type: str, target_id: int) -
     Calcula estadísticas de votos para un target específico.
 
     Args:
-        votes: Lista completa de votos del sistema.
+        votes: Lista de votos a considerar. Los llamadores pasan solo los
+               del target (índice votes_by_target); el filtro se mantiene
+               para aceptar también la lista completa.
         target_type: Tipo de target normalizado ("post" o "comment").
         target_id: ID del post o comentario.
 
@@ -1205,6 +3693,72 @@ def _aggregate_vote_stats(votes: list[dict], target_type: str, target_id: int) -
     return score, upvotes, downvotes
 
 
+def _vote_counters(data: Dict[str, Any], target_type: str, entity: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Retorna (upvotes, downvotes) guardados en un post o comentario.
+
+    Si el entity aún no tiene contadores (datos legacy) se calculan desde
+    el índice votes_by_target.
+
+    Args:
+        data: Documento completo cargado con load_data().
+        target_type: Tipo de target normalizado ("post" o "comment").
+        entity: Post o comentario votado.
+
+    Returns:
+        Tupla (upvotes, downvotes).
+    """
+    upvotes, downvotes = entity.get('upvotes'), entity.get('downvotes')
+    if isinstance(upvotes, int) and isinstance(downvotes, int):
+        return upvotes, downvotes
+    target_id = entity.get('id')
+    _, upvotes, downvotes = _aggregate_vote_stats(
+        _group(data, 'votes_by_target', (target_type, target_id)), target_type, target_id
+    )
+    return upvotes, downvotes
+
+
+def _shift_vote_counters(
+    data: Dict[str, Any], target_type: str, entity: Dict[str, Any], old: int, new: int
+) -> Tuple[int, int, int]:
+    """
+    Actualiza por delta los contadores de un entity cuando un voto pasa de old a new.
+
+    También ajusta el karma materializado del autor del entity. Si old y
+    new coinciden no se escribe nada (ni karma, ni entity, ni feeds).
+
+    Debe llamarse antes de modificar el registro del voto, para que el
+    cálculo de respaldo de _vote_counters() vea el estado anterior.
+
+    Args:
+        data: Documento completo cargado con load_data(). Modificado in-place.
+        target_type: Tipo de target normalizado ("post" o "comment").
+        entity: Post o comentario votado. Modificado in-place.
+        old: Valor previo del voto (0 si no existía).
+        new: Valor nuevo del voto (0 si se elimina).
+
+    Returns:
+        Tupla (score, upvotes, downvotes) tras el cambio.
+    """
+    upvotes, downvotes = _vote_counters(data, target_type, entity)
+    if old == new:
+        # Same vote again: nothing to shift, re-rank or write
+        return upvotes - downvotes, upvotes, downvotes
+    _shift_karma(data, entity.get('user_id'), target_type, new - old)
+    upvotes += (new == 1) - (old == 1)
+    downvotes += (new == -1) - (old == -1)
+    score = upvotes - downvotes
+    # Through _update_record so the top/hot feeds re-rank the post
+    _update_record(
+        data,
+        _ENTITY_COLLECTIONS[target_type],
+        entity,
+        {'votes': score, 'score': score, 'upvotes': upvotes, 'downvotes': downvotes},
+    )
+    return score, upvotes, downvotes
+
+
+@_serialized
 def apply_vote(user_id: int, target_type: str, target_id: int, value: int) -> dict:
     """
     Registra, actualiza o elimina el voto de un usuario sobre un post o comentario.
@@ -1212,7 +3766,8 @@ def apply_vote(user_id: int, target_type: str, target_id: int, value: int) -> di
     Lógica idempotente:
     - value=0: elimina el voto existente (si lo hay). No-op si no había voto.
     - value=1 o -1: crea el voto si no existe, o actualiza si ya existía.
-    Tras el cambio, actualiza el campo votes/score del entity votado en data.json.
+    Tras el cambio, actualiza por delta los campos votes/score/upvotes/
+    downvotes del entity votado, sin recorrer sus votos.
 
     Args:
         user_id: ID del usuario que emite el voto.
@@ -1238,43 +3793,42 @@ def apply_vote(user_id: int, target_type: str, target_id: int, value: int) -> di
     if entity is None:
         raise ValueError('target_not_found')
 
-    votes = data.setdefault('votes', [])
-    existing = next(
-        (
-            v
-            for v in votes
-            if v.get('user_id') == user_id
-            and v.get('target_type') == normalized_type
-            and v.get('target_id') == target_id
-        ),
-        None,
-    )
+    existing = _index(data)['vote_keys'].get((user_id, normalized_type, target_id))
+    previous = existing.get('value', 0) if existing else 0
+    score, upvotes, downvotes = _shift_vote_counters(data, normalized_type, entity, previous, value)
 
     if value == 0:
-        if existing:
-            votes.remove(existing)
+        if not existing:
+            # Nothing to remove: committing an empty change would rewrite the snapshot
+            return {
+                'target_type': normalized_type,
+                'target_id': target_id,
+                'value': 0,
+                'score': score,
+                'upvotes': upvotes,
+                'downvotes': downvotes,
+            }
+        _discard_records(data, 'votes', [existing])
     else:
         timestamp = _now_utc_iso()
         if existing:
-            existing['value'] = value
-            existing['updated_at'] = timestamp
+            _update_record(data, 'votes', existing, {'value': value, 'updated_at': timestamp})
         else:
-            votes.append(
+            _insert_record(
+                data,
+                'votes',
                 {
-                    'id': _next_id(votes),
+                    'id': _allocate_id(data, 'votes'),
                     'user_id': user_id,
                     'target_type': normalized_type,
                     'target_id': target_id,
                     'value': value,
                     'created_at': timestamp,
                     'updated_at': timestamp,
-                }
+                },
             )
 
-    score, upvotes, downvotes = _aggregate_vote_stats(votes, normalized_type, target_id)
-    entity['votes'] = score
-    entity['score'] = score
-    save_data(data)
+    _commit(data)
     return {
         'target_type': normalized_type,
         'target_id': target_id,
@@ -1311,20 +3865,11 @@ def get_vote_summary(target_type: str, target_id: int, *, user_id: Optional[int]
     if entity is None:
         return None
 
-    votes = data.get('votes', [])
-    score, upvotes, downvotes = _aggregate_vote_stats(votes, normalized_type, target_id)
+    upvotes, downvotes = _vote_counters(data, normalized_type, entity)
+    score = upvotes - downvotes
     user_vote = None
     if user_id is not None:
-        match = next(
-            (
-                v
-                for v in votes
-                if v.get('user_id') == user_id
-                and v.get('target_type') == normalized_type
-                and v.get('target_id') == target_id
-            ),
-            None,
-        )
+        match = _index(data)['vote_keys'].get((user_id, normalized_type, target_id))
         if match:
             user_vote = match.get('value')
 
@@ -1338,6 +3883,66 @@ def get_vote_summary(target_type: str, target_id: int, *, user_id: Optional[int]
     }
 
 
+@_serialized
+def rebuild_vote_counters() -> int:
+    """
+    Recalcula desde la colección votes los contadores de todos los posts y comentarios.
+
+    Rutina de reparación: los contadores se mantienen por delta en
+    apply_vote(), pero datos editados por fuera de esta capa (o legacy)
+    pueden quedar desalineados. Los votos se agregan en el libro columnar
+    (VoteLedger, vectorizado con NumPy si está instalado). Solo se
+    reescriben los entities cuyos valores difieren.
+
+    Returns:
+        Cantidad de posts y comentarios corregidos.
+    """
+    data = load_data()
+    tallies = VoteLedger.from_votes(data.get('votes', [])).target_counts()
+    repaired = 0
+    for target_type, collection in (('post', 'posts'), ('comment', 'comments')):
+        for entity in list(data.get(collection, [])):
+            upvotes, downvotes = tallies.get((target_type, entity.get('id')), (0, 0))
+            expected = {
+                'votes': upvotes - downvotes,
+                'score': upvotes - downvotes,
+                'upvotes': upvotes,
+                'downvotes': downvotes,
+            }
+            if any(entity.get(key) != value for key, value in expected.items()):
+                _update_record(data, collection, entity, expected)
+                repaired += 1
+    if repaired:
+        _commit(data)
+    return repaired
+
+
+@_serialized
+def migrate_timestamps() -> int:
+    """
+    Migra las fechas de posts, comentarios y boards heredados.
+
+    Migración única: normaliza created_at/updated_at y cachea
+    created_epoch en los registros escritos antes de que esta capa lo
+    hiciera al escribir. Idempotente: los registros ya migrados no se
+    tocan.
+
+    Returns:
+        Cantidad de registros migrados.
+    """
+    data = load_data()
+    migrated = 0
+    for collection in sorted(_TIMESTAMPED):
+        for record in list(data.get(collection, [])):
+            if "created_epoch" not in record:
+                # _update_record() stamps legacy records on its own
+                _update_record(data, collection, record, {})
+                migrated += 1
+    if migrated:
+        _commit(data)
+    return migrated
+
+
 # ---------------------------------------------------------------------------
 # Moderation helpers (reports, actions)
 # ---------------------------------------------------------------------------
@@ -1361,7 +3966,8 @@ def _next_id(sequence: List[Dict[str, Any]], key: str = "id") -> int:
     Genera el siguiente ID disponible para una colección.
 
     Calcula el máximo ID actual y le suma 1. Si la colección está vacía,
-    retorna 1 (primer ID válido).
+    retorna 1 (primer ID válido). Es O(n): las altas usan _allocate_id(),
+    que solo recurre a esta función para inicializar un contador.
 
     Args:
         sequence: Lista de dicts de la colección (users, posts, etc.).
@@ -1373,12 +3979,17 @@ def _next_id(sequence: List[Dict[str, Any]], key: str = "id") -> int:
     return max((item.get(key, 0) for item in sequence), default=0) + 1
 
 
+# Tipo de entity (moderación, votos) → colección que lo almacena.
+_ENTITY_COLLECTIONS = {"user": "users", "post": "posts", "comment": "comments"}
+
+
 def _get_entity(data: Dict[str, Any], target_type: str, target_id: int) -> Optional[Dict[str, Any]]:
     """
     Busca y retorna un entity (user, post o comment) del documento de datos.
 
     Retorna la referencia directa al dict dentro de data (mutable), lo que
     permite modificarlo in-place (p. ej. entity["removed"] = True).
+    La búsqueda es O(1) vía el índice de clave primaria.
 
     Args:
         data: Documento JSON completo cargado con load_data().
@@ -1389,16 +4000,13 @@ def _get_entity(data: Dict[str, Any], target_type: str, target_id: int) -> Optio
         Dict del entity si existe, None si no se encuentra o si target_type
         no es uno de los tipos soportados.
     """
-    kind = target_type.lower()
-    if kind == "user":
-        return next((u for u in data.get("users", []) if u.get("id") == target_id), None)
-    if kind == "post":
-        return next((p for p in data.get("posts", []) if p.get("id") == target_id), None)
-    if kind == "comment":
-        return next((c for c in data.get("comments", []) if c.get("id") == target_id), None)
-    return None
+    collection = _ENTITY_COLLECTIONS.get(target_type.lower())
+    if collection is None:
+        return None
+    return _lookup(data, collection, target_id)
 
 
+@_serialized
 def moderation_report_create(
     reporter_id: int,
     target_type: str,
@@ -1425,7 +4033,7 @@ def moderation_report_create(
     _ensure_moderation_root(data)
 
     report = {
-        "id": _next_id(data["moderation"]["reports"]),
+        "id": _allocate_id(data, "moderation.reports"),
         "created_at": _now_utc_iso(),
         "reporter_id": reporter_id,
         "target_type": target_type,
@@ -1434,8 +4042,8 @@ def moderation_report_create(
         "status": "pending",
         "invalid_target": _get_entity(data, target_type, target_id) is None,
     }
-    data["moderation"]["reports"].append(report)
-    save_data(data)
+    _insert_record(data, "moderation.reports", report)
+    _commit(data)
     return report
 
 
@@ -1459,6 +4067,7 @@ def moderation_queue_list(status: Optional[str] = "pending") -> List[Dict[str, A
     return reports
 
 
+@_serialized
 def moderation_action_apply(
     moderator_id: int,
     target_type: str,
@@ -1505,50 +4114,57 @@ def moderation_action_apply(
     elif act != "approve" and entity is None:
         result = {"applied": False, "error": "target_not_found"}
     else:
+        collection = _ENTITY_COLLECTIONS.get(target_type.lower())
         if act == "remove":
-            entity["removed"] = True
-            if target_type == "post":
-                entity["locked"] = True
+            flags = {"removed": True, "locked": True} if target_type == "post" else {"removed": True}
+            _update_record(data, collection, entity, flags)
         elif act == "approve":
             pass
         elif act == "lock":
             if target_type != "post":
                 result = {"applied": False, "error": "lock_only_for_posts"}
                 _log_moderation_action(data, moderator_id, target_type, target_id, act, reason, False, result["error"], report_id)
-                save_data(data)
+                _commit(data)
                 return result
-            entity["locked"] = True
+            _update_record(data, collection, entity, {"locked": True})
         elif act == "sticky":
             if target_type != "post":
                 result = {"applied": False, "error": "sticky_only_for_posts"}
                 _log_moderation_action(data, moderator_id, target_type, target_id, act, reason, False, result["error"], report_id)
-                save_data(data)
+                _commit(data)
                 return result
-            entity["sticky"] = True
+            _update_record(data, collection, entity, {"sticky": True})
         elif act == "ban_user":
             if target_type != "user":
                 result = {"applied": False, "error": "ban_only_for_users"}
                 _log_moderation_action(data, moderator_id, target_type, target_id, act, reason, False, result["error"], report_id)
-                save_data(data)
+                _commit(data)
                 return result
-            entity["banned"] = True
+            _update_record(data, collection, entity, {"banned": True})
         elif act == "shadowban":
             if target_type != "user":
                 result = {"applied": False, "error": "shadowban_only_for_users"}
                 _log_moderation_action(data, moderator_id, target_type, target_id, act, reason, False, result["error"], report_id)
-                save_data(data)
+                _commit(data)
                 return result
-            entity["shadowbanned"] = True
+            _update_record(data, collection, entity, {"shadowbanned": True})
 
         result = {"applied": True}
 
         if report_id is not None:
             for report in data["moderation"]["reports"]:
                 if report.get("id") == report_id:
-                    report["status"] = "closed"
-                    report["closed_at"] = _now_utc_iso()
-                    report["closed_by"] = moderator_id
-                    report["resolution"] = act
+                    _update_record(
+                        data,
+                        "moderation.reports",
+                        report,
+                        {
+                            "status": "closed",
+                            "closed_at": _now_utc_iso(),
+                            "closed_by": moderator_id,
+                            "resolution": act,
+                        },
+                    )
                     break
 
     _log_moderation_action(
@@ -1562,7 +4178,7 @@ def moderation_action_apply(
         result.get("error"),
         report_id,
     )
-    save_data(data)
+    _commit(data)
     return result
 
 
@@ -1596,7 +4212,7 @@ def _log_moderation_action(
         report_id: ID del reporte relacionado, si aplica.
     """
     entry = {
-        "id": _next_id(data["moderation"]["actions"]),
+        "id": _allocate_id(data, "moderation.actions"),
         "ts": _now_utc_iso(),
         "moderator_id": moderator_id,
         "target_type": target_type,
@@ -1607,7 +4223,7 @@ def _log_moderation_action(
         "error": error,
         "report_id": report_id,
     }
-    data["moderation"]["actions"].append(entry)
+    _insert_record(data, "moderation.actions", entry)
 
 
 # ---------------------------------------------------------------------------
@@ -1671,6 +4287,7 @@ def get_user_acceptance(user_id: int, terms_id: int) -> Optional[Dict[str, Any]]
     )
 
 
+@_serialized
 def create_acceptance(user_id: int, terms_id: int, ip_address: str) -> Dict[str, Any]:
     """
     Registra la aceptación de los T&C por parte de un usuario.
@@ -1695,14 +4312,14 @@ def create_acceptance(user_id: int, terms_id: int, ip_address: str) -> Dict[str,
     _ensure_terms_root(data)
 
     acceptance = {
-        "id": _next_id(data["terms_acceptances"]),
+        "id": _allocate_id(data, "terms_acceptances"),
         "user_id": user_id,
         "terms_id": terms_id,
         "ip_address": ip_address[:45],
         "accepted_at": _now_utc_iso(),
     }
-    data["terms_acceptances"].append(acceptance)
-    save_data(data)
+    _insert_record(data, "terms_acceptances", acceptance)
+    _commit(data)
     return acceptance
 
 
@@ -0,0 +1,68 @@
+"""
+codec.py — Codificación JSON del documento de datos — KLKCHAN.
+
+Punto único por el que pasan data.json, el journal y las filas de la
+base SQLite. Trabaja con bytes de punta a punta: se lee y se parsea el
+contenido del archivo sin decodificarlo antes a str, y se escribe el
+resultado de dumps() tal cual.
+
+Usa orjson si está instalado y, si no, el módulo json de la stdlib. La
+salida es compacta por defecto; pretty=True la indenta (solo para
+depurar: ocupa más y es más lenta). En ambos casos es UTF-8 sin escapar
+caracteres no ASCII, y los registros compactos (records.py) se
+serializan como dicts.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+from app_v1.utils.records import json_default
+
+try:
+    import orjson
+except ImportError:  # optional dependency: stdlib json
+    orjson = None
+
+# Nombre del codec activo, para logs y diagnóstico.
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(raw: Union[bytes, bytearray, str]) -> Any:
+    """
+    Parsea un documento JSON.
+
+    Args:
+        raw: Contenido JSON en UTF-8 (preferentemente bytes, tal como se
+            leyó del archivo).
+
+    Returns:
+        Objeto Python resultante.
+
+    Raises:
+        ValueError: Si el contenido no es JSON válido (json.JSONDecodeError
+            y orjson.JSONDecodeError son subclases).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(obj: Any, *, pretty: bool = False) -> bytes:
+    """
+    Serializa un objeto a JSON en UTF-8.
+
+    Args:
+        obj: Objeto a serializar (documento, entrada de journal, registro).
+        pretty: Si es True, indenta la salida. Default: compacta.
+
+    Returns:
+        JSON codificado en UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, default=json_default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=json_default)
+    return text.encode("utf-8")
@@ -0,0 +1,92 @@
+"""
+conditional.py — GET condicionales (ETag / Last-Modified / 304) — KLKCHAN.
+
+Los endpoints de lectura muy consultados (listados de posts, boards y
+comentarios) obtienen de la capa de servicios la versión de los datos
+que leen (services.get_read_version) y llaman a not_modified() antes
+de armar la respuesta: si el cliente ya tiene esa versión se responde
+304 sin leer ni serializar nada.
+
+Reglas (RFC 9110):
+  - If-None-Match tiene prioridad; si está presente se ignora
+    If-Modified-Since.
+  - If-None-Match compara con comparación débil (W/"x" equivale a "x")
+    y acepta una lista separada por comas o "*".
+  - If-Modified-Since tiene resolución de segundos: la versión no cambió
+    si Last-Modified (truncado) no es posterior a la fecha enviada. Por
+    eso Last-Modified se omite si la última escritura fue hace menos de
+    un segundo (get_read_version retorna None).
+
+Las respuestas llevan Cache-Control: no-cache, de modo que los clientes
+y proxies guardan la respuesta pero la revalidan en cada uso.
+"""
+from __future__ import annotations
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Política de caché de los endpoints condicionales: guardar, pero
+# revalidar siempre (la revalidación es barata: una 304 sin cuerpo).
+CACHE_CONTROL = "no-cache"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match contra etag."""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: Optional[float]) -> bool:
+    """True si last_modified (en segundos) no es posterior a If-Modified-Since."""
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError, IndexError):
+        return False  # unparseable date: the header is ignored
+    if since is None or since.tzinfo is None:
+        return False
+    return int(last_modified) <= since.timestamp()
+
+
+def not_modified(
+    request: Request, response: Response, etag: str, last_modified: Optional[float]
+) -> Optional[Response]:
+    """
+    Agrega los validadores a la respuesta y resuelve el GET condicional.
+
+    Args:
+        request: Request entrante (se leen If-None-Match / If-Modified-Since).
+        response: Response del endpoint; recibe ETag, Last-Modified y
+            Cache-Control.
+        etag: ETag fuerte de la versión actual (entre comillas).
+        last_modified: Instante de la última modificación (epoch UTC), o
+            None para no enviar Last-Modified.
+
+    Returns:
+        Response 304 a retornar tal cual si el cliente ya tiene esta
+        versión, o None si hay que armar la respuesta completa.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = if_modified_since is not None and _not_modified_since(if_modified_since, last_modified)
+    if fresh:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -3,12 +3,15 @@ helpers.py — Utilidades generales — KLKCHAN.
 
 Funciones de propósito general usadas en múltiples capas:
 normalización de texto y email, generación de slugs,
-sanitización HTML y paginación offset-based.
+sanitización HTML, paginación offset-based y cursores opacos.
 
 Nota: paginate_list() implementa paginación page/limit (offset-based).
 Los endpoints usan paginación cursor-based; paginate_list() queda
 como utilidad interna sin uso en producción actualmente.
 """
+import base64
+import binascii
+import json
 import re
 import unicodedata
 import uuid
@@ -134,6 +137,43 @@ def paginate_list(items: list[Any], page: int = 1, limit: int = 10) -> dict:
     }
 
 
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Codifica una lista de valores JSON como cursor opaco (base64 URL-safe).
+
+    Args:
+        values: Valores que identifican la posición (p. ej. [orden, id]).
+
+    Returns:
+        String sin relleno "=", apto para query strings.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> list[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor().
+
+    Args:
+        token: Cursor opaco recibido del cliente.
+
+    Returns:
+        Lista de valores codificados en el cursor.
+
+    Raises:
+        ValueError "invalid_cursor": Si el cursor está mal formado.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("invalid_cursor") from None
+    if not isinstance(values, list):
+        raise ValueError("invalid_cursor")
+    return values
+
+
 def normalize_email(email: str) -> str:
     """
     Convierte un email a minúsculas y elimina espacios externos.
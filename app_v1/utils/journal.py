@@ -0,0 +1,165 @@
+"""
+journal.py — Journal append-only del documento de datos — KLKCHAN.
+
+En modo journal cada commit de services.py no reescribe data.json:
+añade una línea JSON compacta al journal con las operaciones a nivel
+de registro que produjo. data.json pasa a ser un snapshot que se
+compacta periódicamente; el estado vigente es snapshot + journal.
+
+Formato: una línea por commit, {"ops": [op, ...]}, donde cada op es
+  - {"op": "put", "c": colección, "r": registro}  → inserta o reemplaza por id
+  - {"op": "del", "c": colección, "ids": [id, ...]} → elimina por id
+
+La colección puede ser una ruta con puntos ("moderation.reports").
+Las operaciones son idempotentes: reaplicar un journal sobre un
+snapshot que ya las contiene produce el mismo documento, por lo que
+un corte entre escribir el snapshot y truncar el journal es inocuo.
+Una última línea incompleta (corte a mitad de escritura) se ignora.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app_v1.utils import codec
+
+
+def resolve_collection(data: Dict[str, Any], name: str) -> List[Dict[str, Any]]:
+    """
+    Retorna (creándola si falta) la lista de una colección del documento.
+
+    Args:
+        data: Documento completo.
+        name: Nombre de la colección, o ruta con puntos para las anidadas
+            (p. ej. "moderation.actions").
+
+    Returns:
+        Referencia a la lista dentro de data.
+    """
+    *parents, leaf = name.split(".")
+    node = data
+    for part in parents:
+        node = node.setdefault(part, {})
+    return node.setdefault(leaf, [])
+
+
+def apply_ops(data: Dict[str, Any], ops: Iterable[Dict[str, Any]]) -> None:
+    """
+    Aplica operaciones del journal sobre un documento (in place).
+
+    Args:
+        data: Documento completo. Modificado in-place.
+        ops: Operaciones put/del en el formato del journal.
+    """
+    positions: Dict[str, Dict[Any, int]] = {}
+
+    def _positions(name: str, records: List[Dict[str, Any]]) -> Dict[Any, int]:
+        if name not in positions:
+            positions[name] = {r.get("id"): i for i, r in enumerate(records)}
+        return positions[name]
+
+    for op in ops:
+        name = op["c"]
+        records = resolve_collection(data, name)
+        if op["op"] == "put":
+            record = op["r"]
+            where = _positions(name, records)
+            pos = where.get(record.get("id"))
+            if pos is None:
+                where[record.get("id")] = len(records)
+                records.append(record)
+            else:
+                records[pos] = record
+        elif op["op"] == "del":
+            doomed = set(op["ids"])
+            records[:] = [r for r in records if r.get("id") not in doomed]
+            positions.pop(name, None)
+
+
+def read_entries(path: Path, offset: int = 0) -> Tuple[List[List[Dict[str, Any]]], int]:
+    """
+    Lee las entradas completas del journal a partir de un offset en bytes.
+
+    Args:
+        path: Ruta del journal.
+        offset: Posición desde la que leer (0 = desde el inicio).
+
+    Returns:
+        Tupla (entradas, offset_final): la lista de operaciones de cada
+        entrada leída y la posición tras la última línea completa.
+    """
+    try:
+        with path.open("rb") as fh:
+            fh.seek(offset)
+            chunk = fh.read()
+    except FileNotFoundError:
+        return [], 0
+    entries: List[List[Dict[str, Any]]] = []
+    consumed = 0
+    for line in chunk.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break  # torn tail: the writer has not finished this entry
+        try:
+            entries.append(codec.loads(line)["ops"])
+        except (ValueError, KeyError, TypeError):
+            break
+        consumed += len(line)
+    return entries, offset + consumed
+
+
+def encode_entry(ops: List[Dict[str, Any]]) -> bytes:
+    """Serializa una entrada del journal como una línea JSON compacta."""
+    return codec.dumps({"ops": ops}) + b"\n"
+
+
+def append_entry(path: Path, payload: bytes, *, fsync: bool) -> int:
+    """
+    Añade una entrada ya serializada al final del journal.
+
+    Args:
+        path: Ruta del journal (se crea si no existe).
+        payload: Línea producida por encode_entry().
+        fsync: Si es True, fuerza la entrada a disco antes de retornar.
+
+    Returns:
+        Tamaño del journal tras la escritura, en bytes.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        if fsync:
+            os.fsync(fd)
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def sync(path: Path) -> None:
+    """Fuerza a disco las entradas del journal escritas sin fsync."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_directory(path: Path) -> None:
+    """
+    Fuerza a disco las entradas de un directorio (renombres y borrados).
+
+    Sin efecto en plataformas que no permiten abrir un directorio.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
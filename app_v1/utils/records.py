@@ -0,0 +1,176 @@
+"""
+records.py — Registros compactos en memoria — KLKCHAN.
+
+Las colecciones más numerosas del documento (votes y comments) se
+guardan en memoria como objetos con __slots__ en lugar de dicts: cada
+campo conocido ocupa un slot (sin tabla hash por registro), los valores
+repetidos como target_type se internan y updated_at comparte el objeto
+de created_at cuando ambos coinciden.
+
+Los registros compactos son MutableMapping, de modo que el resto de la
+capa de datos los sigue usando como dicts (get, [], update, in, ==).
+Los campos no previstos se guardan aparte en un dict _extra, así que
+cualquier registro admite claves adicionales sin perderlas.
+
+La conversión ocurre en el borde de persistencia: compact_document() /
+compact() al cargar o insertar, y json_default() al serializar.
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple
+
+
+class CompactRecord(MutableMapping):
+    """
+    Registro con slots para los campos conocidos y un dict para el resto.
+
+    Las subclases declaran FIELDS (que se usa también como __slots__).
+    Un slot sin asignar equivale a una clave ausente.
+
+    Attributes:
+        FIELDS: Campos conocidos, en el orden en que se iteran.
+        INTERNED: Campos de texto cuyos valores se internan con sys.intern().
+        ALIASES: Campo → campo cuyo objeto se reutiliza si el valor es igual.
+        _extra: Claves fuera de FIELDS, o None si no hay ninguna.
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: FrozenSet[str] = frozenset()
+    ALIASES: Dict[str, str] = {}
+    _FIELD_SET: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, source: Optional[Mapping] = None) -> None:
+        self._extra: Optional[Dict[str, Any]] = None
+        if source:
+            for key, value in source.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._FIELD_SET:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if key in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        alias = self.ALIASES.get(key)
+        if alias is not None:
+            other = getattr(self, alias, None)
+            if other is not None and other == value:
+                value = other
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+        if not self._extra:
+            self._extra = None
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.FIELDS:
+            if hasattr(self, name):
+                yield name
+        if self._extra:
+            yield from tuple(self._extra)
+
+    def __len__(self) -> int:
+        present = sum(1 for name in self.FIELDS if hasattr(self, name))
+        return present + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retorna el registro como dict, con la forma que tiene en JSON."""
+        return dict(self.items())
+
+
+class VoteRecord(CompactRecord):
+    """Voto de la colección votes."""
+
+    FIELDS = ("id", "user_id", "target_type", "target_id", "value", "created_at", "updated_at")
+    __slots__ = FIELDS
+    INTERNED = frozenset({"target_type"})
+    ALIASES = {"updated_at": "created_at"}
+
+
+class CommentRecord(CompactRecord):
+    """Comentario de la colección comments."""
+
+    FIELDS = (
+        "id", "post_id", "user_id", "parent_id", "body",
+        "votes", "score", "upvotes", "downvotes",
+        "created_at", "updated_at", "created_epoch",
+    )
+    __slots__ = FIELDS
+    ALIASES = {"updated_at": "created_at"}
+
+
+# Colección → clase de sus registros en memoria.
+COMPACT_COLLECTIONS: Dict[str, type] = {"votes": VoteRecord, "comments": CommentRecord}
+
+
+def compact(collection: str, record: Any) -> Any:
+    """
+    Convierte un registro a su forma compacta si su colección la tiene.
+
+    Args:
+        collection: Nombre de la colección del registro.
+        record: Registro (dict o ya compacto).
+
+    Returns:
+        El registro compacto, o el mismo objeto si no aplica.
+    """
+    cls = COMPACT_COLLECTIONS.get(collection)
+    if cls is None or type(record) is cls:
+        return record
+    return cls(record)
+
+
+def compact_document(data: Dict[str, Any]) -> None:
+    """
+    Convierte in place las colecciones de COMPACT_COLLECTIONS de un documento.
+
+    Args:
+        data: Documento completo (p. ej. recién leído de disco).
+    """
+    for collection in COMPACT_COLLECTIONS:
+        records = data.get(collection)
+        if records:
+            records[:] = [compact(collection, record) for record in records]
+
+
+def json_default(obj: Any) -> Dict[str, Any]:
+    """Hook default= de json.dumps para serializar registros compactos."""
+    if isinstance(obj, CompactRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,362 @@
+"""
+sqlite_store.py — Backend SQLite del documento de datos — KLKCHAN.
+
+Alternativa a data.json para DATA_BACKEND=sqlite. Es un backend solo
+de persistencia: load() lee la base completa a un documento en memoria
+y services.py sigue leyendo de ese documento y de sus índices en
+memoria, no con consultas SQL. Los datos deben caber en memoria igual
+que con data.json: servir las lecturas (búsquedas por id, comentarios
+de un post, feeds) con SQL indexado queda fuera de este backend, porque
+toda la capa de servicios lee de los índices en memoria.
+
+Lo que cambia es la escritura: cada commit aplica en una transacción
+las mismas operaciones put/del por id que el journal (ver journal.py),
+de modo que una escritura cuesta lo que cambia y no lo que mide la base.
+
+Esquema:
+  - records(collection, id, pos, doc): un registro por fila, doc en JSON.
+    pos conserva el orden del documento (los registros nuevos van al
+    final). Las colecciones anidadas usan rutas con puntos
+    ("moderation.reports"). Sin índices sobre campos de doc: ninguna
+    consulta filtra por ellos.
+  - changes(seq, collection, record_id, op): log de cambios. Permite a
+    otros procesos ponerse al día aplicando solo lo nuevo.
+  - meta(key, value): "layout", el esqueleto del documento (colecciones
+    vacías y valores que no son listas de registros).
+
+Modo WAL: los lectores no bloquean al escritor. Cada hilo usa su propia
+conexión.
+
+Migración desde data.json:
+    python -m app_v1.utils.sqlite_store app_v1/data/data.json app_v1/data/data.sqlite3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app_v1.utils import codec, journal
+
+# Cambios que se conservan en la tabla changes. Un proceso que quedó más
+# atrás que esto recarga el documento completo.
+CHANGES_RETAINED = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    id NOT NULL,
+    pos INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_records_pos ON records (collection, pos);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT,
+    record_id,
+    op TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """
+    Retorna la conexión del hilo actual a path, creándola si hace falta.
+
+    La conexión queda en autocommit (las transacciones se abren
+    explícitamente), en modo WAL y con el esquema creado.
+
+    Args:
+        path: Ruta del archivo SQLite.
+
+    Returns:
+        Conexión sqlite3 lista para usar desde este hilo.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = str(path)
+    conn = connections.get(key)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(key, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        connections[key] = conn
+    return conn
+
+
+class _transaction:
+    """Context manager: BEGIN IMMEDIATE / COMMIT, o ROLLBACK ante error."""
+
+    def __init__(self, conn: sqlite3.Connection, mode: str = "IMMEDIATE") -> None:
+        self.conn = conn
+        self.mode = mode
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute(f"BEGIN {self.mode}")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _layout_of(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Esqueleto del documento: las colecciones de registros, vacías."""
+    layout: Dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, list):
+            layout[key] = []
+        elif isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+            layout[key] = {sub: [] for sub in value}
+        else:
+            layout[key] = value
+    return layout
+
+
+def _iter_records(data: Dict[str, Any]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Recorre (nombre de colección, lista) para cada colección de registros."""
+    for key, value in data.items():
+        if isinstance(value, list):
+            yield key, value
+        elif isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+            for sub, records in value.items():
+                yield f"{key}.{sub}", records
+
+
+def _head(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM changes ORDER BY seq DESC LIMIT 1").fetchone()
+    return row[0] if row else 0
+
+
+def head(path: Path) -> int:
+    """
+    Número del último cambio confirmado en la base.
+
+    Args:
+        path: Ruta del archivo SQLite.
+
+    Returns:
+        seq del último cambio, o 0 si la base está vacía.
+    """
+    return _head(connect(path))
+
+
+def load(path: Path, empty: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    Lee el documento completo desde la base.
+
+    Args:
+        path: Ruta del archivo SQLite.
+        empty: Estructura a usar si la base aún no tiene layout.
+
+    Returns:
+        Tupla (documento, seq) leída en una misma transacción.
+    """
+    conn = connect(path)
+    with _transaction(conn, "DEFERRED"):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        data = json.loads(row[0]) if row else json.loads(json.dumps(empty))
+        for collection, doc in conn.execute(
+            "SELECT collection, doc FROM records ORDER BY collection, pos"
+        ):
+            journal.resolve_collection(data, collection).append(codec.loads(doc))
+        seq = _head(conn)
+    return data, seq
+
+
+def changes_since(path: Path, seq: int) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """
+    Operaciones confirmadas después de seq, en el formato del journal.
+
+    Args:
+        path: Ruta del archivo SQLite.
+        seq: Último cambio ya aplicado por el llamador.
+
+    Returns:
+        Tupla (ops, seq_final), o None si hace falta recargar todo: hubo
+        un reemplazo completo o los cambios intermedios ya se podaron.
+    """
+    conn = connect(path)
+    with _transaction(conn, "DEFERRED"):
+        rows = conn.execute(
+            "SELECT seq, collection, record_id, op FROM changes WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+        if not rows:
+            return [], seq
+        if rows[0][0] != seq + 1:
+            return None  # seq numbers have no gaps: the missing ones were pruned
+        ops: List[Dict[str, Any]] = []
+        for _, collection, record_id, op in rows:
+            if op == "reset":
+                return None
+            found = conn.execute(
+                "SELECT doc FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+            ).fetchone()
+            if op == "put" and found is not None:
+                ops.append({"op": "put", "c": collection, "r": codec.loads(found[0])})
+            else:
+                ops.append({"op": "del", "c": collection, "ids": [record_id]})
+        return ops, rows[-1][0]
+
+
+def _ensure_layout(conn: sqlite3.Connection, collections: Sequence[str]) -> None:
+    """Añade al layout las colecciones nuevas que aparezcan en un commit."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+    layout = json.loads(row[0]) if row else {}
+    before = json.dumps(layout, sort_keys=True)
+    for name in collections:
+        journal.resolve_collection(layout, name)
+    if json.dumps(layout, sort_keys=True) != before:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('layout', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (json.dumps(layout),),
+        )
+
+
+def apply(path: Path, ops: List[Dict[str, Any]]) -> int:
+    """
+    Aplica operaciones put/del en una sola transacción.
+
+    Args:
+        path: Ruta del archivo SQLite.
+        ops: Operaciones en el formato del journal.
+
+    Returns:
+        seq del último cambio registrado.
+    """
+    conn = connect(path)
+    with _transaction(conn):
+        _ensure_layout(conn, sorted({op["c"] for op in ops}))
+        for op in ops:
+            collection = op["c"]
+            if op["op"] == "put":
+                record = op["r"]
+                conn.execute(
+                    "INSERT INTO records (collection, id, pos, doc) VALUES (?, ?, "
+                    "(SELECT COALESCE(MAX(pos), 0) + 1 FROM records WHERE collection = ?), ?) "
+                    "ON CONFLICT(collection, id) DO UPDATE SET doc = excluded.doc",
+                    (collection, record["id"], collection, codec.dumps(record).decode("utf-8")),
+                )
+                conn.execute(
+                    "INSERT INTO changes (collection, record_id, op) VALUES (?, ?, 'put')",
+                    (collection, record["id"]),
+                )
+            else:
+                for record_id in op["ids"]:
+                    conn.execute(
+                        "DELETE FROM records WHERE collection = ? AND id = ?", (collection, record_id)
+                    )
+                    conn.execute(
+                        "INSERT INTO changes (collection, record_id, op) VALUES (?, ?, 'del')",
+                        (collection, record_id),
+                    )
+        seq = _head(conn)
+        # Pruned on every commit: a commit may advance seq by several ops,
+        # so a "seq % N == 0" check could skip every multiple of N. seq is
+        # the rowid, so this range delete is cheap when nothing is stale.
+        conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - CHANGES_RETAINED,))
+    return seq
+
+
+def _assign_missing_ids(records: List[Dict[str, Any]]) -> int:
+    """Asigna id (máximo + 1) a los registros legacy sin id. Retorna cuántos."""
+    missing = [r for r in records if r.get("id") is None]
+    next_id = max((r["id"] for r in records if isinstance(r.get("id"), int)), default=0) + 1
+    for offset, record in enumerate(missing):
+        record["id"] = next_id + offset
+    return len(missing)
+
+
+def replace_all(path: Path, data: Dict[str, Any]) -> int:
+    """
+    Reemplaza todo el contenido de la base por data.
+
+    Los registros sin id reciben uno nuevo (en data y en la base), ya que
+    la base identifica cada registro por (colección, id).
+
+    Args:
+        path: Ruta del archivo SQLite.
+        data: Documento completo.
+
+    Returns:
+        seq del cambio "reset" registrado.
+    """
+    conn = connect(path)
+    with _transaction(conn):
+        conn.execute("DELETE FROM records")
+        conn.execute("DELETE FROM changes")
+        for collection, records in _iter_records(data):
+            _assign_missing_ids(records)
+            conn.executemany(
+                "INSERT OR REPLACE INTO records (collection, id, pos, doc) VALUES (?, ?, ?, ?)",
+                (
+                    (collection, r["id"], pos, codec.dumps(r).decode("utf-8"))
+                    for pos, r in enumerate(records, start=1)
+                ),
+            )
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('layout', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (json.dumps(_layout_of(data)),),
+        )
+        conn.execute("INSERT INTO changes (collection, record_id, op) VALUES (NULL, NULL, 'reset')")
+        return _head(conn)
+
+
+def migrate(json_path: Path, sqlite_path: Path, *, force: bool = False) -> Dict[str, int]:
+    """
+    Copia data.json (más su journal, si lo hay) a una base SQLite.
+
+    Args:
+        json_path: Ruta de data.json.
+        sqlite_path: Ruta de la base destino.
+        force: Si es False y la base ya tiene registros, no se toca.
+
+    Returns:
+        Dict colección → número de registros migrados.
+
+    Raises:
+        FileExistsError: Si la base ya tiene datos y force es False.
+    """
+    data = codec.loads(json_path.read_bytes())
+    entries, _ = journal.read_entries(json_path.with_name(json_path.stem + ".journal.jsonl"))
+    for ops in entries:
+        journal.apply_ops(data, ops)
+    conn = connect(sqlite_path)
+    if not force and conn.execute("SELECT 1 FROM records LIMIT 1").fetchone():
+        raise FileExistsError(f"{sqlite_path} already contains records (use --force)")
+    replace_all(sqlite_path, data)
+    return {collection: len(records) for collection, records in _iter_records(data)}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de la herramienta de migración data.json → SQLite."""
+    parser = argparse.ArgumentParser(description="Migrate a KLKCHAN data.json into SQLite.")
+    parser.add_argument("json_path", type=Path, help="Source data.json")
+    parser.add_argument("sqlite_path", type=Path, help="Destination SQLite file")
+    parser.add_argument("--force", action="store_true", help="Overwrite a non-empty database")
+    args = parser.parse_args(argv)
+    try:
+        counts = migrate(args.json_path, args.sqlite_path, force=args.force)
+    except FileExistsError as exc:
+        parser.error(str(exc))
+    for collection, count in counts.items():
+        print(f"{collection}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
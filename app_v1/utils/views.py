@@ -0,0 +1,81 @@
+"""
+views.py — Vistas de solo lectura sobre registros del documento — KLKCHAN.
+
+Las lecturas de services.py no copian los registros almacenados:
+retornan un RecordView, un Mapping inmutable que lee del registro
+vivo y superpone los campos calculados para la respuesta (fechas
+normalizadas, valores por defecto, contadores, árbol de comentarios).
+
+El registro base no se copia ni se modifica. Los valores anidados
+(listas de tags, attachments, etc.) se comparten con el documento y
+no deben mutarse; quien necesite un dict modificable debe usar
+to_dict() (o dict(view)) y trabajar sobre esa copia.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+
+class RecordView(Mapping):
+    """
+    Vista de solo lectura de un registro con campos superpuestos.
+
+    Las claves de overlay tienen prioridad sobre las del registro base.
+    El orden de iteración es el de base seguido de las claves nuevas de
+    overlay, el mismo que produciría {**base, **overlay}.
+
+    Attributes:
+        _base: Registro tal como está almacenado (no se copia).
+        _overlay: Campos calculados que se superponen al registro.
+    """
+
+    __slots__ = ("_base", "_overlay")
+
+    def __init__(self, base: Mapping, overlay: Optional[Dict[str, Any]] = None) -> None:
+        self._base = base
+        self._overlay = overlay if overlay is not None else {}
+
+    def __getitem__(self, key: str) -> Any:
+        overlay = self._overlay
+        if key in overlay:
+            return overlay[key]
+        return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._overlay or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        overlay = self._overlay
+        # tuple() snapshots the keys so a writer touching the live record
+        # cannot break an iteration in progress (e.g. during serialization)
+        base_keys = tuple(self._base)
+        yield from base_keys
+        for key in tuple(overlay):
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for key in self._overlay if key not in self._base)
+
+    def __repr__(self) -> str:
+        return f"RecordView({self.to_dict()!r})"
+
+    def with_overlay(self, changes: Dict[str, Any]) -> "RecordView":
+        """
+        Retorna una vista nueva del mismo registro con más campos superpuestos.
+
+        La vista original no se modifica: sirve para reemplazar un valor
+        calculado sin afectar a quien todavía la esté leyendo.
+
+        Args:
+            changes: Campos que se superponen a los de esta vista.
+
+        Returns:
+            RecordView sobre el mismo registro base.
+        """
+        return RecordView(self._base, {**self._overlay, **changes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retorna una copia superficial modificable de la vista."""
+        return {**self._base, **self._overlay}
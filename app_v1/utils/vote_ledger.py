@@ -0,0 +1,112 @@
+"""
+vote_ledger.py — Libro columnar de votos para agregaciones masivas — KLKCHAN.
+
+Las rutinas que recalculan contadores de todo el documento (scores por
+target, karma por usuario) no necesitan los votos como registros: solo
+sus columnas target_type, target_id y value. El karma se acredita al
+autor del contenido votado, no al votante, así que user_id no hace
+falta. VoteLedger copia esas columnas a arrays paralelos compactos y
+agrega sobre ellos.
+
+NumPy es opcional: si está instalado, las agregaciones usan
+np.unique/np.bincount vectorizados; si no, un bucle equivalente en
+Python puro sobre los mismos arrays (módulo array de la stdlib).
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pure-Python aggregation
+    np = None
+
+# Código de target_type en la columna kinds.
+TARGET_KINDS: Tuple[str, ...] = ("post", "comment")
+_KIND_CODES = {kind: code for code, kind in enumerate(TARGET_KINDS)}
+
+
+class VoteLedger:
+    """
+    Columnas paralelas de una colección de votos.
+
+    Solo se incluyen votos con target_type conocido, target_id entero y
+    value +1/-1; el resto no cuenta en ningún contador.
+
+    Attributes:
+        kinds: Código de target_type por voto (índice en TARGET_KINDS).
+        target_ids: ID del post o comentario votado.
+        values: +1 o -1.
+    """
+
+    __slots__ = ("kinds", "target_ids", "values")
+
+    def __init__(self) -> None:
+        self.kinds = array("b")
+        self.target_ids = array("q")
+        self.values = array("b")
+
+    @classmethod
+    def from_votes(cls, votes: Iterable[Mapping[str, Any]]) -> "VoteLedger":
+        """
+        Construye el libro a partir de los registros de la colección votes.
+
+        Args:
+            votes: Registros de voto (dicts o registros compactos).
+
+        Returns:
+            VoteLedger con una fila por voto válido.
+        """
+        ledger = cls()
+        kinds, target_ids, values = ledger.kinds, ledger.target_ids, ledger.values
+        for vote in votes:
+            kind = _KIND_CODES.get(vote.get("target_type"))
+            target_id = vote.get("target_id")
+            value = vote.get("value")
+            if kind is None or type(target_id) is not int or value not in (1, -1):
+                continue
+            kinds.append(kind)
+            target_ids.append(target_id)
+            values.append(value)
+        return ledger
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def target_counts(self) -> Dict[Tuple[str, int], Tuple[int, int]]:
+        """
+        Agrega los votos por target.
+
+        Returns:
+            Dict (target_type, target_id) → (upvotes, downvotes), solo
+            para los targets con al menos un voto.
+        """
+        if not self.values:
+            return {}
+        if np is not None:
+            return self._target_counts_numpy()
+        counts: Dict[Tuple[str, int], list] = {}
+        for kind, target_id, value in zip(self.kinds, self.target_ids, self.values):
+            slot = counts.get((kind, target_id))
+            if slot is None:
+                slot = counts[(kind, target_id)] = [0, 0]
+            slot[value < 0] += 1
+        return {(TARGET_KINDS[kind], target_id): (up, down) for (kind, target_id), (up, down) in counts.items()}
+
+    def _target_counts_numpy(self) -> Dict[Tuple[str, int], Tuple[int, int]]:
+        """target_counts() vectorizado: una clave por target y dos bincount."""
+        target_ids = np.frombuffer(self.target_ids, dtype=np.int64)
+        kinds = np.frombuffer(self.kinds, dtype=np.int8).astype(np.int64)
+        values = np.frombuffer(self.values, dtype=np.int8)
+        keys, inverse = np.unique(target_ids * len(TARGET_KINDS) + kinds, return_inverse=True)
+        upvotes = np.bincount(inverse, weights=values > 0, minlength=len(keys)).astype(np.int64)
+        downvotes = np.bincount(inverse, weights=values < 0, minlength=len(keys)).astype(np.int64)
+        target_of = np.floor_divide(keys, len(TARGET_KINDS))
+        kind_of = np.remainder(keys, len(TARGET_KINDS))
+        return {
+            (TARGET_KINDS[kind], target_id): (up, down)
+            for kind, target_id, up, down in zip(
+                kind_of.tolist(), target_of.tolist(), upvotes.tolist(), downvotes.tolist()
+            )
+        }
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from app_v2.schemas import CommentCreateV2, CommentResponseV2
 from app_v2.security import require_guest_token, create_guest_token, derive_anon_id, GUEST_TOKEN_EXPIRE_SECONDS
-from app_v1.services import get_comments_for_post, create_comment, get_post
+from app_v1.services import get_comments_for_post, create_comment, get_post_summary
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
@@ -10,13 +10,13 @@ def _fmt(c):
 
 @router.get("/{post_id}", response_model=list[CommentResponseV2])
 def get_comments_v2(post_id: int):
-    if not get_post(post_id):
+    if not get_post_summary(post_id):
         raise HTTPException(status_code=404, detail="Post no encontrado")
     return [_fmt(c) for c in get_comments_for_post(post_id)]
 
 @router.post("", response_model=CommentResponseV2, status_code=201)
 def create_comment_v2(body: CommentCreateV2, response: Response, guest: dict = Depends(require_guest_token)):
-    if not get_post(body.post_id):
+    if not get_post_summary(body.post_id):
         raise HTTPException(status_code=404, detail="Post no encontrado")
     c = create_comment({"body": body.body, "post_id": body.post_id, "parent_comment_id": body.parent_comment_id, "user_id": None, "anon_id": derive_anon_id(guest), "votes": 0})
     response.set_cookie(key="guest_token", value=create_guest_token(), httponly=True, secure=False, samesite="lax", max_age=GUEST_TOKEN_EXPIRE_SECONDS)
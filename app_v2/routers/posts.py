@@ -2,18 +2,16 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from app_v2.schemas import PostCreateV2, PostResponseV2, PostListResponseV2
 from app_v2.security import require_guest_token, create_guest_token, derive_anon_id, GUEST_TOKEN_EXPIRE_SECONDS
-from app_v1.services import get_posts, get_post, create_post
+from app_v1.services import get_comment_tree, get_post_summaries, get_post_summary, create_post
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
 def _fmt(p):
-    return PostResponseV2(id=p["id"], title=p["title"], body=p["body"], board_id=p.get("board_id", 0), created_at=str(p.get("created_at", "")), votes=p.get("votes", 0), image=p.get("image"), anon_id=p.get("anon_id"), comment_count=len(p.get("comments", [])))
+    return PostResponseV2(id=p["id"], title=p["title"], body=p["body"], board_id=p.get("board_id", 0), created_at=str(p.get("created_at", "")), votes=p.get("votes", 0), image=p.get("image"), anon_id=p.get("anon_id"), comment_count=len(get_comment_tree(p["id"])))
 
 @router.get("", response_model=PostListResponseV2)
 def list_posts_v2(board_id: Optional[int] = None, limit: int = Query(50, ge=1, le=100), cursor: Optional[int] = None):
-    posts = get_posts()
-    if board_id is not None:
-        posts = [p for p in posts if p.get("board_id") == board_id]
+    posts = get_post_summaries(board_id)
     if cursor:
         posts = [p for p in posts if p["id"] > cursor]
     posts = posts[:limit]
@@ -21,7 +19,7 @@ def list_posts_v2(board_id: Optional[int] = None, limit: int = Query(50, ge=1, l
 
 @router.get("/{post_id}", response_model=PostResponseV2)
 def get_post_v2(post_id: int):
-    p = get_post(post_id)
+    p = get_post_summary(post_id)
     if not p:
         raise HTTPException(status_code=404, detail="Post no encontrado")
     return _fmt(p)
@@ -38,6 +38,8 @@ def temp_data_path(monkeypatch):
     data_file = tmp_dir / "test_data.json"
 
     monkeypatch.setattr(services, "DATA_PATH", data_file, raising=False)
+    # journal de un test anterior (modo DATA_PERSISTENCE=journal)
+    services._journal_path().unlink(missing_ok=True)
 
     # estructura base vacía
     base = {
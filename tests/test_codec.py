@@ -0,0 +1,52 @@
+# tests/test_codec.py
+"""
+Tests para la capa de codificación JSON (codec.py): bytes de punta a
+punta, salida compacta por defecto, orjson opcional con respaldo stdlib.
+"""
+import pytest
+
+import app_v1.services as services
+from app_v1.utils import codec
+from app_v1.utils.records import VoteRecord
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(codec, "orjson", None)
+    return request.param
+
+
+def test_roundtrip_bytes_compact_and_utf8(backend):
+    doc = {"users": [{"id": 1, "username": "José"}], "votes": [VoteRecord({"id": 1, "value": -1})]}
+    raw = codec.dumps(doc)
+    assert isinstance(raw, bytes)
+    assert b"\n" not in raw and b": " not in raw
+    assert "José".encode("utf-8") in raw
+    assert codec.loads(raw) == {"users": [{"id": 1, "username": "José"}], "votes": [{"id": 1, "value": -1}]}
+
+
+def test_pretty_is_indented(backend):
+    raw = codec.dumps({"a": [1, 2]}, pretty=True)
+    assert b"\n" in raw
+    assert codec.loads(raw) == {"a": [1, 2]}
+
+
+def test_invalid_json_raises_decode_error(backend):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"users": [')
+
+
+def test_data_file_is_compact_unless_pretty(temp_data_path, monkeypatch):
+    services.create_board({"name": "Compacto"})
+    compact = temp_data_path.read_bytes()
+    assert b"\n" not in compact.strip()
+
+    monkeypatch.setattr(services, "PRETTY_JSON", True)
+    services.save_data(services.load_data())
+    pretty = temp_data_path.read_bytes()
+    assert b"\n" in pretty and len(pretty) > len(compact)
+    services._invalidate_cache()
+    assert services.get_board(3)["name"] == "Compacto"
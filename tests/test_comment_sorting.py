@@ -0,0 +1,126 @@
+# tests/test_comment_sorting.py
+"""
+Tests para los órdenes de comentarios (?sort=old|new|top|controversial|best)
+dentro de cada grupo de hermanos, mantenidos en la caché del árbol.
+"""
+import random
+
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _comment(parent_id=None):
+    return services.create_comment({"body": "c", "post_id": 1, "user_id": 2, "parent_id": parent_id})["id"]
+
+
+def _set_votes(comment_id, up, down):
+    data = services.load_data()
+    comment = services._lookup(data, "comments", comment_id)
+    services._update_record(
+        data, "comments", comment, {"upvotes": up, "downvotes": down, "votes": up - down, "score": up - down}
+    )
+    services._commit(data)
+
+
+def _page(sort):
+    items, _ = services.get_comment_page(1, 200, None, services.COMMENT_MAX_DEPTH, 200, sort)
+    return items
+
+
+def _shape(nodes):
+    return [(n["id"], _shape(n["replies"])) for n in nodes]
+
+
+def _naive(sort):
+    data = services.load_data()
+    key = services.COMMENT_SORTS.get(sort)
+
+    def _order(nodes):
+        ordered = sorted(nodes, key=lambda n: key(data, n)) if key else nodes
+        return [(n["id"], _order(n["replies"])) for n in ordered]
+
+    return _order(services.build_comment_tree(services._post_comments(data, 1)))
+
+
+def test_scores():
+    assert services._wilson_lower_bound(0, 0) == 0.0
+    assert services._wilson_lower_bound(10, 1) > services._wilson_lower_bound(1, 0)
+    assert services._wilson_lower_bound(1, 0) > services._wilson_lower_bound(1, 1)
+    assert services._controversy(5, 0) == 0.0
+    assert services._controversy(5, 5) > services._controversy(10, 1) > 0
+
+
+def test_sort_modes_order_siblings(client: TestClient):
+    a, b, c = _comment(), _comment(), _comment()
+    _set_votes(a, 1, 0)
+    _set_votes(b, 10, 1)
+    _set_votes(c, 6, 6)
+    replies = [_comment(a) for _ in range(3)]
+    _set_votes(replies[0], 0, 2)
+    _set_votes(replies[2], 3, 0)
+
+    def _ids(sort):
+        items = client.get(f"/posts/1/comments?sort={sort}").json()["items"]
+        return [i["id"] for i in items], [r["id"] for r in next(i for i in items if i["id"] == a)["replies"]]
+
+    assert _ids("old") == ([a, b, c], replies)
+    assert _ids("new")[1] == replies[::-1]
+    assert _ids("top") == ([b, a, c], [replies[2], replies[1], replies[0]])
+    assert _ids("best")[0] == [b, a, c]
+    assert _ids("controversial")[0] == [c, b, a]
+    assert client.get("/comments?post_id=1&sort=top").json()["items"][0]["id"] == b
+    assert client.get("/posts/1/comments?sort=rising").status_code == 422
+
+
+def test_votes_resort_only_the_sibling_group(temp_data_path, monkeypatch):
+    roots = [_comment() for _ in range(20)]
+    child = _comment(roots[0])
+    calls = []
+    top = services.COMMENT_SORTS["top"]
+    monkeypatch.setitem(services.COMMENT_SORTS, "top", lambda data, c: calls.append(c["id"]) or top(data, c))
+
+    _page("top")
+    assert len(calls) == 21  # every group sorted once
+    calls.clear()
+
+    _set_votes(roots[7], 5, 0)
+    _set_votes(child, 2, 0)
+    assert sorted(calls) == sorted([roots[7], child])  # only the voted comments get new keys
+    calls.clear()
+    assert [n["id"] for n in _page("top")][:1] == [roots[7]]
+    assert calls == []
+
+
+def test_sorted_cursor_pages_and_invalid_cursor(client: TestClient):
+    roots = [_comment() for _ in range(5)]
+    for i, comment_id in enumerate(roots):
+        _set_votes(comment_id, i, 0)
+    first = client.get("/posts/1/comments?sort=top&limit=2").json()
+    assert [i["id"] for i in first["items"]] == roots[:2:-1][:2]
+    second = client.get(f"/posts/1/comments?sort=top&limit=3&cursor={first['next_cursor']}").json()
+    assert [i["id"] for i in second["items"]] == [roots[2], roots[1], roots[0]]
+    assert second["next_cursor"] is None
+    assert client.get("/posts/1/comments?sort=top&cursor=999").status_code == 400
+    assert client.get(f"/comments/{roots[0]}/replies?sort=best&cursor=999").status_code == 400
+
+
+def test_random_writes_keep_sorted_groups_exact(temp_data_path):
+    rng = random.Random(24)
+    alive = []
+    for sort in services.COMMENT_SORTS:
+        _page(sort)
+    for step in range(250):
+        roll = rng.random()
+        if alive and roll < 0.15:
+            services.delete_comment(alive.pop(rng.randrange(len(alive))))
+        elif alive and roll < 0.5:
+            _set_votes(rng.choice(alive), rng.randint(0, 6), rng.randint(0, 6))
+        else:
+            parent = rng.choice(alive[-6:]) if alive and rng.random() < 0.7 else None
+            alive.append(_comment(parent))
+        if step % 25 == 0:
+            for sort in ("old", *services.COMMENT_SORTS):
+                assert _shape(_page(sort)) == _naive(sort), sort
+    for sort in ("old", *services.COMMENT_SORTS):
+        assert _shape(_page(sort)) == _naive(sort), sort
@@ -0,0 +1,77 @@
+# tests/test_comment_subtrees.py
+"""
+Tests para los listados de comentarios recortados por nivel (max_depth,
+replies_limit) y la continuación con GET /comments/{id}/replies.
+"""
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _comment(parent_id=None, post_id=1):
+    return services.create_comment({"body": "c", "post_id": post_id, "user_id": 2, "parent_id": parent_id})["id"]
+
+
+def _count(nodes):
+    return sum(1 + _count(n["replies"]) for n in nodes)
+
+
+def test_wide_node_is_cut_and_continued(client: TestClient):
+    root = _comment()
+    replies = [_comment(root) for _ in range(7)]
+
+    item = client.get("/posts/1/comments?replies_limit=3").json()["items"][0]
+    assert [r["id"] for r in item["replies"]] == replies[:3]
+    assert item["more_replies"] == 4 and item["replies_cursor"] == replies[2]
+    assert item["replies"][0]["more_replies"] == 0 and item["replies"][0]["replies_cursor"] is None
+
+    page = client.get(f"/comments/{root}/replies?cursor={item['replies_cursor']}&limit=3").json()
+    assert [r["id"] for r in page["items"]] == replies[3:6]
+    page = client.get(f"/comments/{root}/replies?cursor={page['next_cursor']}&limit=3").json()
+    assert [r["id"] for r in page["items"]] == replies[6:] and page["next_cursor"] is None
+
+
+def test_deep_node_is_cut_and_continued(client: TestClient):
+    chain = [_comment()]
+    for _ in range(3):
+        chain.append(_comment(chain[-1]))
+
+    item = client.get("/comments?post_id=1&max_depth=1").json()["items"][0]
+    cut = item["replies"][0]
+    assert cut["id"] == chain[1] and cut["replies"] == []
+    assert cut["more_replies"] == 1 and cut["replies_cursor"] is None
+
+    page = client.get(f"/comments/{chain[1]}/replies?max_depth=0").json()
+    assert [r["id"] for r in page["items"]] == [chain[2]]
+    assert page["items"][0]["depth"] == 2 and page["items"][0]["more_replies"] == 1
+
+
+def test_response_size_is_bounded(client: TestClient):
+    roots = [_comment() for _ in range(3)]
+    frontier = roots
+    for _ in range(4):
+        frontier = [_comment(parent) for parent in frontier for _ in range(3)]
+
+    items = client.get("/posts/1/comments?limit=2&max_depth=2&replies_limit=2").json()["items"]
+    assert _count(items) == 2 * (1 + 2 + 4)
+    # The cached tree itself is left whole
+    assert _count(services.get_comment_tree(1)) == 3 + 9 + 27 + 81 + 243
+
+
+def test_replies_of_unknown_comment_is_404(client: TestClient):
+    assert client.get("/comments/999/replies").status_code == 404
+    leaf = _comment()
+    assert client.get(f"/comments/{leaf}/replies").json()["items"] == []
+
+
+def test_untrimmed_by_default(client: TestClient):
+    chain = [_comment()]
+    for _ in range(services.COMMENT_MAX_DEPTH):
+        chain.append(_comment(chain[-1]))
+    wide = [_comment(chain[0]) for _ in range(8)]
+
+    for url in ("/posts/1/comments", "/comments?post_id=1"):
+        items = client.get(url).json()["items"]
+        assert _count(items) == _count(services.get_comment_tree(1)) == len(chain) + len(wide)
+        assert len(items[0]["replies"]) == 1 + len(wide)
+        assert items[0]["more_replies"] == 0
@@ -0,0 +1,98 @@
+# tests/test_comment_tree_cache.py
+"""
+Tests para la caché de árboles de comentarios por post: se reutiliza
+entre lecturas y refleja cada escritura sobre los comentarios del post
+(crear, editar, votar, eliminar, cascadas).
+"""
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _spy_builds(monkeypatch):
+    built = []
+    original = services.build_comment_tree
+
+    def _spy(comments, *args, **kwargs):
+        built.append([c["id"] for c in comments])
+        return original(comments, *args, **kwargs)
+
+    monkeypatch.setattr(services, "build_comment_tree", _spy)
+    return built
+
+
+def _comment(body, post_id=1, **extra):
+    return services.create_comment({"body": body, "post_id": post_id, "user_id": 2, **extra})
+
+
+def test_hits_reuse_the_built_tree(temp_data_path, monkeypatch):
+    root = _comment("raíz")
+    _comment("hija", parent_id=root["id"])
+    built = _spy_builds(monkeypatch)
+
+    first = services.get_comment_tree(1)
+    assert services.get_comment_tree(1) is first
+    assert services.get_post(1)["comments"] is first
+    assert len(built) == 1
+    assert first[0]["replies"][0]["body"] == "hija"
+
+
+def test_comment_writes_update_only_their_post(temp_data_path, monkeypatch):
+    root = _comment("raíz")
+    other = services.get_comment_tree(2)
+    built = _spy_builds(monkeypatch)
+
+    reply = _comment("nueva", parent_id=root["id"])
+    assert services.get_comment_tree(1)[0]["replies"][0]["id"] == reply["id"]
+
+    services.update_comment(reply["id"], "editada")
+    assert services.get_comment_tree(1)[0]["replies"][0]["body"] == "editada"
+
+    services.apply_vote(3, "comment", reply["id"], 1)
+    assert services.get_comment_tree(1)[0]["replies"][0]["votes"] == 1
+
+    services.delete_comment(root["id"])
+    assert [c["id"] for c in services.get_comment_tree(1)] == [reply["id"]]
+
+    assert services.get_comment_tree(2) is other
+    # Built once; every later write patched the cached tree in place
+    assert len(built) == 1
+
+
+def test_post_cascade_drops_tree(temp_data_path):
+    _comment("x")
+    assert services.get_comment_tree(1)
+    services.delete_post(1)
+    assert services.get_comment_tree(1) == []
+
+
+def test_tree_built_during_a_write_is_not_cached(temp_data_path, monkeypatch):
+    _comment("x")
+    original = services.build_comment_tree
+
+    def _racing(comments, *args, **kwargs):
+        tree = original(comments, *args, **kwargs)
+        # A writer touches the post's comments while the tree is built
+        services._invalidate_comment_tree(services._index(services.load_data()), 1)
+        return tree
+
+    monkeypatch.setattr(services, "build_comment_tree", _racing)
+    services.get_comment_tree(1)
+    assert 1 not in services._index(services.load_data())["comment_trees"]
+
+
+def test_cache_keeps_most_recent_posts(temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "COMMENT_TREE_CACHE_SIZE", 2)
+    post = services.create_post({"title": "t", "body": "b", "board_id": 1, "user_id": 3})
+    services.get_comment_tree(1)
+    services.get_comment_tree(2)
+    services.get_comment_tree(1)
+    services.get_comment_tree(post["id"])
+    assert list(services._index(services.load_data())["comment_trees"]) == [1, post["id"]]
+
+
+def test_comment_endpoints_see_new_comments(client: TestClient):
+    assert client.get("/comments?post_id=1").json()["items"] == []
+    _comment("hola")
+    assert [c["body"] for c in client.get("/comments?post_id=1").json()["items"]] == ["hola"]
+    assert [c["body"] for c in client.get("/posts/1/comments").json()["items"]] == ["hola"]
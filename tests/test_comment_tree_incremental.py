@@ -0,0 +1,95 @@
+# tests/test_comment_tree_incremental.py
+"""
+Tests para la corrección incremental del árbol de comentarios cacheado:
+tras crear, editar o eliminar comentarios, el árbol debe ser idéntico al
+que arma build_comment_tree() desde cero, sin reconstruirse.
+"""
+import random
+
+import app_v1.services as services
+
+
+def _plain(tree):
+    return [{**node.to_dict(), "replies": _plain(node["replies"])} for node in tree]
+
+
+def _fresh(post_id):
+    data = services.load_data()
+    return _plain(services.build_comment_tree(services._post_comments(data, post_id)))
+
+
+def _no_rebuilds(monkeypatch):
+    def _forbidden(*args, **kwargs):
+        raise AssertionError("comment tree rebuilt")
+
+    monkeypatch.setattr(services, "build_comment_tree", _forbidden)
+
+
+def _comment(parent_id=None, body="c"):
+    return services.create_comment({"body": body, "post_id": 1, "user_id": 2, "parent_id": parent_id})
+
+
+def test_reply_deeper_than_max_depth_is_promoted(temp_data_path, monkeypatch):
+    chain = [_comment()]
+    services.get_comment_tree(1)
+    original = services.build_comment_tree
+    _no_rebuilds(monkeypatch)
+    for _ in range(services.COMMENT_MAX_DEPTH + 1):
+        chain.append(_comment(chain[-1]["id"]))
+    tree = services.get_comment_tree(1)
+
+    monkeypatch.setattr(services, "build_comment_tree", original)
+    assert _plain(tree) == _fresh(1)
+    assert [node["id"] for node in tree] == [chain[0]["id"], chain[-1]["id"]]
+    assert tree[1]["depth"] == services.COMMENT_MAX_DEPTH + 1
+
+
+def test_delete_renests_promoted_descendants(temp_data_path, monkeypatch):
+    chain = [_comment()]
+    for _ in range(services.COMMENT_MAX_DEPTH + 2):
+        chain.append(_comment(chain[-1]["id"]))
+    sibling = _comment(chain[1]["id"])
+    services.get_comment_tree(1)
+    original = services.build_comment_tree
+    _no_rebuilds(monkeypatch)
+
+    services.delete_comment(chain[1]["id"])
+    tree = services.get_comment_tree(1)
+
+    monkeypatch.setattr(services, "build_comment_tree", original)
+    assert _plain(tree) == _fresh(1)
+    # The orphans moved to the root and the deepest reply nests again
+    assert [node["id"] for node in tree] == [chain[0]["id"], chain[2]["id"], sibling["id"]]
+    nodes = services._index(services.load_data())["comment_trees"][1]["nodes"]
+    assert nodes[chain[-1]["id"]]["depth"] == services.COMMENT_MAX_DEPTH
+
+
+def test_random_writes_match_a_fresh_build(temp_data_path, monkeypatch):
+    rng = random.Random(22)
+    alive, deepest = [], 0
+    services.get_comment_tree(1)
+    original = services.build_comment_tree
+    _no_rebuilds(monkeypatch)
+    for step in range(300):
+        roll = rng.random()
+        if alive and roll < 0.2:
+            services.delete_comment(alive.pop(rng.randrange(len(alive))))
+        elif alive and roll < 0.3:
+            services.update_comment(rng.choice(alive), f"editado {step}")
+        elif alive and roll < 0.4:
+            services.apply_vote(rng.randint(1, 3), "comment", rng.choice(alive), rng.choice([1, -1]))
+        else:
+            # Bias towards recent comments to grow chains past max depth
+            parent = rng.choice(alive[-5:]) if alive and rng.random() < 0.8 else None
+            alive.append(_comment(parent, body=f"c{step}")["id"])
+        if step % 10 == 0:
+            tree = _plain(services.get_comment_tree(1))
+            monkeypatch.setattr(services, "build_comment_tree", original)
+            assert tree == _fresh(1)
+            nodes = services._index(services.load_data())["comment_trees"][1]["nodes"]
+            deepest = max([deepest, *(node["depth"] for node in nodes.values())])
+            _no_rebuilds(monkeypatch)
+
+    monkeypatch.setattr(services, "build_comment_tree", original)
+    assert _plain(services.get_comment_tree(1)) == _fresh(1)
+    assert deepest > services.COMMENT_MAX_DEPTH
@@ -0,0 +1,79 @@
+# tests/test_compact_records.py
+"""
+Tests para los registros compactos (records.py) con que se guardan en
+memoria las colecciones votes y comments.
+"""
+import json
+import sys
+import tracemalloc
+
+import app_v1.services as services
+from app_v1.utils import journal
+from app_v1.utils.records import CommentRecord, VoteRecord, compact, json_default
+
+
+def _vote(i):
+    ts = f"2024-01-01T00:00:{i % 60:02d}+00:00"
+    return {"id": i, "user_id": i % 7, "target_type": "post", "target_id": i % 11,
+            "value": 1, "created_at": ts, "updated_at": ts}
+
+
+def test_record_behaves_like_a_dict():
+    record = VoteRecord(json.loads(json.dumps(_vote(1))))
+    assert record == _vote(1) and _vote(1) == record
+    assert record["target_type"] is sys.intern("post")
+    assert record["updated_at"] is record["created_at"]
+
+    record.update({"value": -1, "flag": True})
+    assert record.get("value") == -1 and record["flag"] is True and "flag" in record
+    del record["updated_at"]
+    assert "updated_at" not in record and record.get("updated_at") is None
+    assert list(record) == ["id", "user_id", "target_type", "target_id", "value", "created_at", "flag"]
+    assert json.loads(json.dumps(record, default=json_default)) == dict(record)
+
+
+def test_compact_votes_use_less_memory():
+    raw = [json.loads(json.dumps(_vote(i))) for i in range(2000)]
+
+    def _measure(build):
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return kept, size
+
+    _, as_dicts = _measure(lambda: [json.loads(json.dumps(v)) for v in raw])
+    _, as_records = _measure(lambda: [compact("votes", json.loads(json.dumps(v))) for v in raw])
+    assert as_records < as_dicts * 0.6
+
+
+def test_loaded_and_inserted_records_are_compact(temp_data_path):
+    services.apply_vote(1, "post", 1, 1)
+    comment = services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+    services._invalidate_cache()
+    data = services.load_data()
+    assert all(type(v) is VoteRecord for v in data["votes"])
+    assert all(type(c) is CommentRecord for c in data["comments"])
+    assert services.get_comment(comment["id"])["body"] == "hola"
+    assert services.get_vote_summary("post", 1, user_id=1)["user_vote"] == 1
+
+
+def test_persisted_shape_is_plain_json(temp_data_path):
+    services.apply_vote(2, "post", 1, -1)
+    services.flush_data()
+    services._invalidate_cache()
+    disk = json.loads(json.dumps(services.load_data(), default=json_default))
+    vote = disk["votes"][0]
+    assert {"user_id": 2, "target_type": "post", "target_id": 1, "value": -1}.items() <= vote.items()
+
+
+def test_replayed_journal_entries_are_compacted(temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", "journal")
+    data = services.load_data()
+    journal.append_entry(
+        services._journal_path(),
+        journal.encode_entry([{"op": "put", "c": "votes", "r": _vote(40)}]),
+        fsync=False,
+    )
+    assert services.load_data() is data
+    assert type(services._lookup(data, "votes", 40)) is VoteRecord
@@ -0,0 +1,209 @@
+# tests/test_concurrency.py
+"""
+Tests para la serialización de escrituras (_write_lock / @_serialized).
+
+Escrituras concurrentes desde varios hilos o procesos no deben perder
+cambios ni repetir IDs; las lecturas no esperan a los escritores ni
+ven sus cambios a medias.
+"""
+import multiprocessing
+import threading
+
+import pytest
+
+import app_v1.services as services
+
+
+def _reload():
+    services._invalidate_cache()
+    return services.load_data()
+
+
+def _run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_concurrent_threads_do_not_lose_writes(temp_data_path, monkeypatch, mode):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", mode)
+    created = []
+
+    def _worker(n):
+        for i in range(10):
+            created.append(services.create_comment({"body": f"{n}-{i}", "post_id": 1, "user_id": 3}))
+            services.apply_vote(n + 1, "post", 2, 1 if i % 2 else -1)
+
+    _run_threads(_worker, 8)
+    ids = [c["id"] for c in created]
+    assert len(set(ids)) == len(ids) == 80
+
+    data = _reload()
+    assert sorted(c["id"] for c in data["comments"]) == sorted(ids)
+    assert len(data["votes"]) == 8
+    post = services._lookup(data, "posts", 2)
+    assert post["votes"] == sum(v["value"] for v in data["votes"])
+
+
+def _create_boards(prefix):
+    for i in range(15):
+        services.create_board({"name": f"{prefix}-{i}", "description": ""})
+
+
+@pytest.mark.skipif(services.fcntl is None, reason="requires fcntl")
+def test_concurrent_processes_do_not_lose_writes(temp_data_path):
+    ctx = multiprocessing.get_context("fork")
+    services.load_data()
+    workers = [ctx.Process(target=_create_boards, args=(f"w{n}",)) for n in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [w.exitcode for w in workers] == [0, 0, 0]
+
+    boards = _reload()["boards"]
+    ids = [b["id"] for b in boards]
+    assert len(boards) == 2 + 45
+    assert len(set(ids)) == len(ids)
+
+
+def test_readers_do_not_wait_for_writers(temp_data_path):
+    data = services.load_data()
+    holding, release = threading.Event(), threading.Event()
+
+    def _writer():
+        with services._write_lock():
+            holding.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=_writer)
+    writer.start()
+    holding.wait(5)
+    try:
+        # The store changed behind the cache while the lock is held elsewhere
+        services._cache["stamp"] = ("stale", -1)
+        assert services.load_data() is data
+        assert [p["id"] for p in services.get_posts()] == [1, 2]
+        with services._write_lock(blocking=False) as acquired:
+            assert acquired is False
+    finally:
+        release.set()
+        writer.join()
+    assert services.load_data() is not data
+
+
+def test_write_lock_is_reentrant(temp_data_path):
+    with services._write_lock():
+        with services._write_lock(blocking=False) as acquired:
+            assert acquired is True
+        board = services.create_board({"name": "Nested", "description": ""})
+    assert services.get_board(board["id"])["name"] == "Nested"
+    assert services._file_lock["depth"] == 0
+
+
+def _spy_index_builds(monkeypatch):
+    builds = []
+    original = services._build_indexes
+
+    def _spy(data, publish=True):
+        builds.append(publish)
+        return original(data, publish)
+
+    monkeypatch.setattr(services, "_build_indexes", _spy)
+    return builds
+
+
+@pytest.mark.skipif(services.fcntl is None, reason="flock not available")
+def test_index_is_published_while_another_worker_writes(temp_data_path, monkeypatch):
+    services.load_data()
+    services._drop_indexes()
+    builds = _spy_index_builds(monkeypatch)
+    fd = services.os.open(services._lock_path(), services.os.O_RDWR)
+    try:
+        # Another worker holds data.lock: it cannot touch our document
+        services.fcntl.flock(fd, services.fcntl.LOCK_EX)
+        for _ in range(3):
+            assert [p["id"] for p in services.get_posts()] == [1, 2]
+    finally:
+        services.os.close(fd)
+    assert builds == [True]
+
+
+def test_build_during_a_write_is_published_once(temp_data_path, monkeypatch):
+    data = services.load_data()
+    services._drop_indexes()
+    builds = _spy_index_builds(monkeypatch)
+    holding, release = threading.Event(), threading.Event()
+
+    def _writer():
+        with services._write_lock():
+            holding.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=_writer)
+    writer.start()
+    holding.wait(5)
+    try:
+        # The reader does not wait, and its build serves the next readers
+        for _ in range(3):
+            assert [p["id"] for p in services.get_posts()] == [1, 2]
+        assert builds == [False]
+        assert services._indexes["doc"] is data
+    finally:
+        release.set()
+        writer.join()
+
+
+def test_build_during_a_write_is_not_published_over_a_drop(temp_data_path, monkeypatch):
+    data = services.load_data()
+    services._drop_indexes()
+    original = services._build_indexes
+
+    def _racing(data, publish=True):
+        fresh = original(data, publish)
+        if not publish:
+            services._drop_indexes()  # e.g. save_data() finishing meanwhile
+        return fresh
+
+    monkeypatch.setattr(services, "_build_indexes", _racing)
+    with services._lock:
+        thread = threading.Thread(target=services._index, args=(data,))
+        thread.start()
+        thread.join()
+    assert services._indexes["doc"] is None
+
+
+def test_feed_readers_never_see_a_half_moved_post(temp_data_path, monkeypatch):
+    for i in range(3):
+        services.create_post({"title": f"t{i}", "body": "b", "board_id": 1, "user_id": 3})
+    expected = sorted(p["id"] for p in services.get_posts())
+    moving, release = threading.Event(), threading.Event()
+    original = services.insort
+
+    def _paused(keys, entry):
+        # The vote is mid-flight: the post left its old slot, not yet in the new one
+        if threading.current_thread() is not threading.main_thread():
+            moving.set()
+            release.wait(5)
+        return original(keys, entry)
+
+    monkeypatch.setattr(services, "insort", _paused)
+    writer = threading.Thread(target=services.apply_vote, args=(1, "post", expected[0], 1))
+    writer.start()
+    moving.wait(5)
+    try:
+        for sort in ("top", "hot", "new"):
+            posts, _ = services.get_posts_page(sort, None, include_comments=False)
+            assert sorted(p["id"] for p in posts) == expected, sort
+            page, cursor = services.get_posts_page(sort, 2, include_comments=False)
+            while cursor is not None:
+                more, cursor = services.get_posts_page(sort, 2, cursor=cursor, include_comments=False)
+                page += more
+            assert sorted(p["id"] for p in page) == expected, sort
+    finally:
+        release.set()
+        writer.join()
+    assert [p["id"] for p in services.get_posts_page("top", 1, include_comments=False)[0]] == [expected[0]]
@@ -0,0 +1,147 @@
+# tests/test_conditional_get.py
+"""
+Tests para los GET condicionales de los listados (GET /posts, /boards y
+los comentarios de un post): ETag por versión, 304 con If-None-Match o
+If-Modified-Since sin armar la respuesta y cambio de versión al escribir.
+"""
+import multiprocessing
+import time
+from datetime import timedelta
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+LISTINGS = ["/posts", "/posts?include_comments=false&sort=hot", "/boards", "/posts/1/comments", "/comments?post_id=1"]
+
+
+def _age_versions(seconds=10):
+    """Mueve al pasado las últimas escrituras, como si hubieran pasado `seconds`."""
+    data = services.load_data()
+    for counter in data["versions"]:
+        counter["at"] -= seconds
+    services._write_document(data)  # counters live in the store, not in the process
+
+
+def _revalidate(client, url, **headers):
+    return client.get(url, headers={k.replace("_", "-"): v for k, v in headers.items()})
+
+
+def test_matching_etag_gets_304_with_validators(client: TestClient):
+    for url in LISTINGS:
+        first = client.get(url)
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "no-cache"
+        etag = first.headers["etag"]
+        assert etag.startswith('"')
+
+        again = _revalidate(client, url, if_none_match=etag)
+        assert again.status_code == 304, url
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+        assert _revalidate(client, url, if_none_match=f'"x", W/{etag}').status_code == 304
+        assert _revalidate(client, url, if_none_match="*").status_code == 304
+        assert _revalidate(client, url, if_none_match='"otro"').status_code == 200
+
+
+def test_writes_change_the_etag(client: TestClient):
+    posts = client.get("/posts").headers["etag"]
+    boards = client.get("/boards").headers["etag"]
+    thread = client.get("/posts/1/comments").headers["etag"]
+
+    services.create_comment({"body": "nuevo", "post_id": 1, "user_id": 2})
+    fresh = _revalidate(client, "/posts/1/comments", if_none_match=thread)
+    assert fresh.status_code == 200 and fresh.headers["etag"] != thread
+    assert [c["body"] for c in fresh.json()["items"]] == ["nuevo"]
+    # comment_count is part of the post listing
+    assert _revalidate(client, "/posts", if_none_match=posts).status_code == 200
+    assert _revalidate(client, "/boards", if_none_match=boards).status_code == 304
+
+    boards = client.get("/boards").headers["etag"]
+    services.create_post({"title": "t", "body": "b", "board_id": 1, "user_id": 3})
+    assert _revalidate(client, "/boards", if_none_match=boards).status_code == 200
+
+
+def test_comment_etags_are_per_post(client: TestClient):
+    other = client.get("/posts/2/comments").headers["etag"]
+    comment = services.create_comment({"body": "c", "post_id": 1, "user_id": 2})
+    services.apply_vote(3, "comment", comment["id"], 1)
+    services.delete_comment(comment["id"])
+    assert _revalidate(client, "/posts/2/comments", if_none_match=other).status_code == 304
+
+
+def test_etag_survives_a_reload(client: TestClient):
+    services.create_post({"title": "t", "body": "b", "board_id": 1, "user_id": 3})
+    etag = client.get("/posts").headers["etag"]
+    services._invalidate_cache()
+    services._drop_indexes()
+    assert _revalidate(client, "/posts", if_none_match=etag).status_code == 304
+
+    services.save_data(services.load_data())  # may carry changes made elsewhere
+    assert _revalidate(client, "/posts", if_none_match=etag).status_code == 200
+
+
+def _write_in_another_worker(conn):
+    # A worker of its own: nothing inherited from the parent's memory
+    services._invalidate_cache()
+    services._drop_indexes()
+    services.create_comment({"body": "de otro worker", "post_id": 1, "user_id": 2})
+    conn.send(services.get_read_version(["posts"], post_id=1)[0])
+
+
+@pytest.mark.skipif(services.fcntl is None, reason="requires fcntl")
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_workers_agree_on_the_etag(temp_data_path, monkeypatch, mode):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", mode)
+    before = services.get_read_version(["posts"], post_id=1)[0]
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe()
+    worker = ctx.Process(target=_write_in_another_worker, args=(child,))
+    worker.start()
+    theirs = parent.recv()
+    worker.join()
+
+    assert services.get_read_version(["posts"], post_id=1)[0] == theirs != before
+
+
+def test_if_modified_since(client: TestClient):
+    # Right after a write Last-Modified is withheld: it could not tell
+    # that write apart from another one in the same second
+    assert "last-modified" not in client.get("/boards").headers
+
+    _age_versions()
+    last_modified = client.get("/boards").headers["last-modified"]
+    assert _revalidate(client, "/boards", if_modified_since=last_modified).status_code == 304
+    assert _revalidate(client, "/boards", if_modified_since=formatdate(time.time(), usegmt=True)).status_code == 304
+    assert _revalidate(client, "/boards", if_modified_since=formatdate(time.time() - 3600, usegmt=True)).status_code == 200
+    assert _revalidate(client, "/boards", if_modified_since="ayer").status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    stale = _revalidate(client, "/boards", if_none_match='"otro"', if_modified_since=last_modified)
+    assert stale.status_code == 200
+
+    services.create_board({"name": "Nuevo"})
+    _age_versions(5)
+    assert _revalidate(client, "/boards", if_modified_since=last_modified).status_code == 200
+
+
+def test_304_skips_building_the_response(client: TestClient, monkeypatch):
+    etags = {url: client.get(url).headers["etag"] for url in LISTINGS}
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("response built for a 304")
+
+    for name in ("get_posts_page", "list_boards", "get_comment_page"):
+        monkeypatch.setattr(f"app_v1.routers.posts.{name}", _fail, raising=False)
+        monkeypatch.setattr(f"app_v1.routers.boards.{name}", _fail, raising=False)
+        monkeypatch.setattr(f"app_v1.routers.comments.{name}", _fail, raising=False)
+    for url, etag in etags.items():
+        assert _revalidate(client, url, if_none_match=etag).status_code == 304
+
+
+def test_hot_etag_follows_the_bucket(client: TestClient, monkeypatch):
+    etag = client.get("/posts?sort=hot").headers["etag"]
+    later = services._hot_bucket_now() + timedelta(seconds=services.HOT_SCORE_BUCKET_SECONDS)
+    monkeypatch.setattr(services, "_hot_bucket_now", lambda: later)
+    assert _revalidate(client, "/posts?sort=hot", if_none_match=etag).status_code == 200
@@ -0,0 +1,73 @@
+# tests/test_data_cache.py
+"""
+Tests para la caché en memoria del documento (load_data / save_data).
+
+load_data() solo debe volver a parsear data.json cuando cambia la firma
+del archivo en disco (mtime, tamaño, inode); save_data() actualiza la
+caché sin forzar una nueva lectura.
+"""
+import json
+
+import pytest
+
+import app_v1.services as services
+
+
+def test_load_data_returns_cached_document(temp_data_path):
+    """Dos lecturas seguidas sin cambios en disco retornan el mismo objeto."""
+    assert services.load_data() is services.load_data()
+
+
+def test_load_data_does_not_reparse_when_file_unchanged(temp_data_path, monkeypatch):
+    """Con el archivo intacto, load_data no vuelve a invocar json.loads."""
+    services.load_data()
+    calls = []
+    original = services.json.loads
+
+    def _spy(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(services.json, "loads", _spy)
+    services.load_data()
+    services.get_user(1)
+    services.list_boards()
+    assert calls == []
+
+
+def test_save_data_updates_cache_in_place(temp_data_path):
+    """Tras save_data, load_data retorna el documento guardado sin releerlo."""
+    data = services.load_data()
+    data["boards"].append({"id": 99, "name": "Cached", "description": ""})
+    services.save_data(data)
+    assert services.load_data() is data
+    assert services.get_board(99)["name"] == "Cached"
+
+
+def test_external_write_is_detected(temp_data_path):
+    """Una escritura externa sobre data.json invalida la caché."""
+    before = services.load_data()
+    on_disk = json.loads(temp_data_path.read_text(encoding="utf-8"))
+    on_disk["boards"].append({"id": 77, "name": "External", "description": "x"})
+    temp_data_path.write_text(json.dumps(on_disk), encoding="utf-8")
+
+    after = services.load_data()
+    assert after is not before
+    assert any(b["id"] == 77 for b in after["boards"])
+
+
+def test_failed_write_discards_cache(temp_data_path, monkeypatch):
+    """Si la escritura falla, la caché se descarta y se relee el disco."""
+    data = services.load_data()
+    data["boards"].append({"id": 55, "name": "Ghost", "description": ""})
+
+    def _boom(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(services.Path, "replace", _boom)
+        with pytest.raises(OSError):
+            services.save_data(data)
+
+    reloaded = services.load_data()
+    assert all(b["id"] != 55 for b in reloaded["boards"])
@@ -0,0 +1,103 @@
+# tests/test_group_commit.py
+"""
+Tests para el group commit (DATA_GROUP_COMMIT_MS > 0).
+
+Las mutaciones de una misma ventana se persisten en una sola escritura y
+cada llamador retorna solo cuando su lote ya está en disco.
+"""
+import threading
+
+import pytest
+
+import app_v1.services as services
+
+
+@pytest.fixture
+def group_commit(temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "GROUP_COMMIT_WINDOW_MS", 20)
+    writes = []
+    original = services._persist
+
+    def _spy(data, durable=False):
+        writes.append(durable)
+        return original(data, durable)
+
+    monkeypatch.setattr(services, "_persist", _spy)
+    return writes
+
+
+def _on_disk(temp_data_path):
+    services._invalidate_cache()
+    return services.load_data()
+
+
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_concurrent_votes_share_writes(group_commit, temp_data_path, monkeypatch, mode):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", mode)
+    acked = []
+
+    def _vote(user_id):
+        services.apply_vote(user_id, "post", 1, 1)
+        # Acknowledged only once the vote is on disk
+        raw = temp_data_path.read_text(encoding="utf-8")
+        journal = services._journal_path()
+        if journal.exists():
+            raw += journal.read_text(encoding="utf-8")
+        acked.append(f'"user_id": {user_id}' in raw or f'"user_id":{user_id}' in raw)
+
+    threads = [threading.Thread(target=_vote, args=(uid,)) for uid in range(1, 13)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert acked == [True] * 12
+    assert 1 <= len(group_commit) < 12
+    assert all(group_commit)
+    data = _on_disk(temp_data_path)
+    assert services._lookup(data, "posts", 1)["votes"] == 12
+    assert len(data["votes"]) == 12
+
+
+def test_sequential_writes_each_flush(group_commit, temp_data_path):
+    board = services.create_board({"name": "G", "description": ""})
+    services.update_board(board["id"], {"description": "d"})
+    assert len(group_commit) == 2
+    assert services._lookup(_on_disk(temp_data_path), "boards", board["id"])["description"] == "d"
+    assert services._batch_state["batch"] is None
+    assert services._file_lock["depth"] == 0
+
+
+def test_failed_batch_raises_in_every_caller(group_commit, temp_data_path, monkeypatch):
+    def _boom(data, durable=False):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(services, "_persist", _boom)
+    errors = []
+
+    def _vote(user_id):
+        try:
+            services.apply_vote(user_id, "post", 2, 1)
+        except OSError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=_vote, args=(uid,)) for uid in (1, 2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["disk full"] * 3
+    assert services._file_lock["depth"] == 0
+
+
+def test_flush_data_writes_open_batch(group_commit, temp_data_path):
+    """Un lote abierto (p. ej. al apagar) se persiste con flush_data()."""
+    with services._write_lock():
+        data = services.load_data()
+        services._insert_record(data, "boards", {"id": 77, "name": "pending", "description": ""})
+        services._commit(data)
+        services._batch_local.batch = None
+    assert services._batch_state["batch"] is not None
+    services.flush_data()
+    assert services._batch_state["batch"] is None
+    assert services._lookup(_on_disk(temp_data_path), "boards", 77)["name"] == "pending"
@@ -0,0 +1,138 @@
+# tests/test_indexes.py
+"""
+Tests para los índices en memoria de services.py.
+
+Los índices de clave primaria (id → registro) y los secundarios
+(comments_by_post, posts_by_board, votes_by_target, ...) deben
+mantenerse sincronizados con las colecciones tras creates, updates,
+deletes y cascadas, y reconstruirse si el documento se modifica por fuera.
+"""
+import app_v1.services as services
+
+
+def _assert_indexes_consistent():
+    """Compara los índices incrementales con los de una reconstrucción completa."""
+    data = services.load_data()
+    idx = services._index(data)
+    for name in services._INDEXED_COLLECTIONS:
+        expected = {r.get("id"): r for r in data.get(name, [])}
+        assert idx[name] == expected, name
+        for record_id, record in idx[name].items():
+            assert record is expected[record_id], name
+    expected_keys = {services._vote_key(v): v for v in data.get("votes", [])}
+    assert idx["vote_keys"] == expected_keys
+    for name, (collection, key) in services._GROUP_INDEXES.items():
+        expected_groups = {}
+        for record in data.get(collection, []):
+            expected_groups.setdefault(key(record), {})[id(record)] = record
+        assert idx[name] == expected_groups, name
+    for name in services._SORTED_INDEXES:
+        expected_feed = {"doc": data, "hot_now": idx["hot_now"]}
+        services._build_feed(expected_feed, name)
+        assert idx[name] == expected_feed[name], name
+
+
+def test_lookup_returns_stored_reference(temp_data_path):
+    data = services.load_data()
+    user = services._lookup(data, "users", 3)
+    assert user is next(u for u in data["users"] if u["id"] == 3)
+    assert services._lookup(data, "users", 999) is None
+
+
+def test_indexes_follow_creates_and_votes(temp_data_path):
+    post = services.create_post({"title": "Idx", "body": "b", "board_id": 1, "user_id": 3})
+    comment = services.create_comment({"body": "c", "post_id": post["id"], "user_id": 2})
+    services.create_board({"name": "IdxBoard"})
+    services.apply_vote(1, "post", post["id"], 1)
+    services.apply_vote(2, "comment", comment["id"], -1)
+    services.apply_vote(1, "post", post["id"], -1)
+    _assert_indexes_consistent()
+
+    assert services.get_comment(comment["id"])["body"] == "c"
+    summary = services.get_vote_summary("post", post["id"], user_id=1)
+    assert summary["user_vote"] == -1
+
+
+def test_indexes_follow_vote_removal(temp_data_path):
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(1, "post", 1, 0)
+    _assert_indexes_consistent()
+    assert services.get_vote_summary("post", 1, user_id=1)["user_vote"] is None
+
+
+def test_indexes_follow_cascades(temp_data_path):
+    post = services.create_post({"title": "Cascade", "body": "b", "board_id": 2, "user_id": 3})
+    comment = services.create_comment({"body": "c", "post_id": post["id"], "user_id": 2})
+    services.apply_vote(2, "post", post["id"], 1)
+    services.apply_vote(3, "comment", comment["id"], 1)
+
+    services.delete_comment(comment["id"])
+    _assert_indexes_consistent()
+    services.delete_post(1)
+    _assert_indexes_consistent()
+    services.delete_board(2)
+    _assert_indexes_consistent()
+    services.delete_user(2)
+    _assert_indexes_consistent()
+
+    assert services.get_post(post["id"]) is None
+    assert services.get_comment(comment["id"]) is None
+    assert services.get_user(2) is None
+
+
+def test_external_save_rebuilds_indexes(temp_data_path):
+    """Mutaciones hechas fuera de la capa + save_data() no dejan índices obsoletos."""
+    data = services.load_data()
+    services.get_user(1)  # fuerza la construcción del índice
+    data["users"].append({"id": 50, "username": "outside", "email": "o@x.com", "password": "x"})
+    services.save_data(data)
+    assert services.get_user(50)["username"] == "outside"
+    _assert_indexes_consistent()
+
+
+def test_update_post_moves_board_index(temp_data_path):
+    """Mover un post de board actualiza posts_by_board y post_count."""
+    services.update_post(1, {"board_id": 2})
+    _assert_indexes_consistent()
+    assert services.get_board(1)["post_count"] == 0
+    assert services.get_board(2)["post_count"] == 2
+
+
+def test_comments_for_post_uses_only_its_bucket(temp_data_path):
+    first = services.create_comment({"body": "a", "post_id": 1, "user_id": 2})
+    services.create_comment({"body": "b", "post_id": 2, "user_id": 2})
+    reply = services.create_comment({"body": "c", "post_id": 1, "user_id": 3, "parent_id": first["id"]})
+    ids = [c["id"] for c in services.get_comments_for_post(1)]
+    assert ids == [first["id"], reply["id"]]
+
+
+def test_karma_from_indexes_matches_votes(temp_data_path):
+    comment = services.create_comment({"body": "k", "post_id": 2, "user_id": 3})
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 1)
+    services.apply_vote(1, "post", 2, -1)
+    services.apply_vote(1, "comment", comment["id"], 1)
+    assert services.calculate_user_karma(3) == {"post_karma": 1, "comment_karma": 1, "karma": 2}
+    assert services.calculate_user_karma(1) == {"post_karma": 0, "comment_karma": 0, "karma": 0}
+
+
+def test_get_post_builds_only_requested_post(temp_data_path, monkeypatch):
+    """get_post no materializa el resto de posts ni sus árboles."""
+    parent = services.create_comment({"body": "root", "post_id": 2, "user_id": 2})
+    services.create_comment({"body": "reply", "post_id": 2, "user_id": 3, "parent_id": parent["id"]})
+    services.create_comment({"body": "other", "post_id": 1, "user_id": 3})
+
+    built = []
+    original = services._build_post
+
+    def _spy(data, entry):
+        built.append(entry["id"])
+        return original(data, entry)
+
+    monkeypatch.setattr(services, "_build_post", _spy)
+    post = services.get_post(2)
+    assert built == [2]
+    assert post["comment_count"] == 2
+    assert [c["id"] for c in post["comments"]] == [parent["id"]]
+    assert post["comments"][0]["replies"][0]["body"] == "reply"
+    assert post == next(p for p in services.get_posts() if p["id"] == 2)
@@ -0,0 +1,207 @@
+# tests/test_journal.py
+"""
+Tests para la persistencia en modo journal (DATA_PERSISTENCE=journal).
+
+Los commits añaden operaciones a data.journal.jsonl en lugar de reescribir
+data.json; load_data() reproduce snapshot + journal, y el journal se
+compacta en data.json cada JOURNAL_COMPACT_EVERY entradas.
+"""
+import json
+import threading
+
+import pytest
+
+import app_v1.services as services
+from app_v1.utils import journal
+
+
+@pytest.fixture
+def journal_mode(temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", "journal")
+    monkeypatch.setattr(services, "JOURNAL_COMPACT_EVERY", 1000)
+    services.load_data()
+    _cancel_deferred_sync()
+    yield services._journal_path()
+    _cancel_deferred_sync()
+
+
+def _cancel_deferred_sync():
+    """Descarta el fsync diferido pendiente, para que no dispare en otro test."""
+    timer, services._journal_state["timer"] = services._journal_state["timer"], None
+    if timer is not None:
+        timer.cancel()
+
+
+def _reload():
+    services._invalidate_cache()
+    return services.load_data()
+
+
+def test_commit_appends_instead_of_rewriting(journal_mode, temp_data_path):
+    snapshot = temp_data_path.read_bytes()
+    services.apply_vote(1, "post", 1, 1)
+    comment = services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+
+    assert temp_data_path.read_bytes() == snapshot
+    lines = journal_mode.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert all(json.loads(line)["ops"] for line in lines)
+
+    data = _reload()
+    assert services._lookup(data, "posts", 1)["votes"] == 1
+    assert services._lookup(data, "comments", comment["id"])["body"] == "hola"
+
+
+def test_replay_applies_deletes_and_nested_collections(journal_mode):
+    comment = services.create_comment({"body": "x", "post_id": 2, "user_id": 3})
+    services.apply_vote(1, "comment", comment["id"], 1)
+    services.moderation_report_create(1, "post", 2, "spam")
+    services.delete_post(2)
+
+    data = _reload()
+    assert services._lookup(data, "posts", 2) is None
+    assert services._lookup(data, "comments", comment["id"]) is None
+    assert data["votes"] == []
+    assert [r["target_id"] for r in data["moderation"]["reports"]] == [2]
+
+
+def test_compaction_writes_snapshot_and_drops_journal(journal_mode, temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "JOURNAL_COMPACT_EVERY", 2)
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 1)
+    assert journal_mode.exists()
+
+    services.apply_vote(3, "post", 1, 1)
+    assert not journal_mode.exists()
+    on_disk = json.loads(temp_data_path.read_text(encoding="utf-8"))
+    assert next(p for p in on_disk["posts"] if p["id"] == 1)["votes"] == 3
+
+
+def test_compaction_syncs_snapshot_before_dropping_journal(journal_mode, temp_data_path, monkeypatch):
+    monkeypatch.setattr(services, "JOURNAL_COMPACT_EVERY", 1)
+    monkeypatch.setattr(services, "JOURNAL_FSYNC_INTERVAL_MS", 60_000)
+    services.apply_vote(1, "post", 1, 1)
+    synced = []
+    monkeypatch.setattr(journal, "sync", lambda path: synced.append((path, journal_mode.exists())))
+    monkeypatch.setattr(
+        journal, "sync_directory", lambda path: synced.append((path, journal_mode.exists()))
+    )
+
+    services.apply_vote(2, "post", 1, 1)
+    assert not journal_mode.exists()
+    tmp = temp_data_path.with_name(temp_data_path.stem + ".tmp")
+    assert synced == [(tmp, True), (temp_data_path.parent, True)]
+
+
+def test_torn_tail_is_ignored_and_truncated(journal_mode):
+    services.apply_vote(1, "post", 1, 1)
+    with journal_mode.open("ab") as fh:
+        fh.write(b'{"ops":[{"op":"put"')
+    data = _reload()
+    assert services._lookup(data, "posts", 1)["votes"] == 1
+    assert journal_mode.read_bytes().endswith(b"\n")
+
+    services.apply_vote(2, "post", 1, 1)
+    assert services._lookup(_reload(), "posts", 1)["votes"] == 2
+
+
+def test_foreign_entries_are_replayed_incrementally(journal_mode):
+    """Entradas añadidas por otro proceso se aplican sobre el documento cacheado."""
+    data = services.load_data()
+    board = {"id": 50, "name": "Remote", "description": ""}
+    journal.append_entry(
+        journal_mode, journal.encode_entry([{"op": "put", "c": "boards", "r": board}]), fsync=False
+    )
+    assert services.load_data() is data
+    assert services.get_board(50)["name"] == "Remote"
+
+
+def test_fsync_is_batched(journal_mode, monkeypatch):
+    monkeypatch.setattr(services, "JOURNAL_FSYNC_INTERVAL_MS", 60_000)
+    monkeypatch.setattr(services, "GROUP_COMMIT_WINDOW_MS", 0)
+    monkeypatch.setitem(services._journal_state, "last_fsync", 0.0)
+    synced = []
+    original = journal.os.fsync
+    monkeypatch.setattr(journal.os, "fsync", lambda fd: synced.append(fd) or original(fd))
+    for user_id in (1, 2, 3):
+        services.apply_vote(user_id, "post", 1, 1)
+    assert len(synced) == 1
+    services.flush_data()
+    assert len(synced) == 2
+
+
+def test_idle_journal_is_synced_when_the_interval_ends(journal_mode, monkeypatch):
+    monkeypatch.setattr(services, "JOURNAL_FSYNC_INTERVAL_MS", 200)
+    monkeypatch.setattr(services, "GROUP_COMMIT_WINDOW_MS", 0)
+    monkeypatch.setitem(services._journal_state, "last_fsync", 0.0)
+    synced = threading.Event()
+    services.apply_vote(1, "post", 1, 1)  # first write: synced in place
+    original = journal.sync
+    monkeypatch.setattr(journal, "sync", lambda path: (original(path), synced.set()))
+
+    services.apply_vote(2, "post", 1, 1)  # inside the window: deferred
+    assert not synced.is_set()
+    # No more writes arrive, yet the tail reaches the disk
+    assert synced.wait(5)
+    assert services._journal_state["timer"] is None
+
+
+def test_snapshot_mode_absorbs_leftover_journal(journal_mode, monkeypatch):
+    services.apply_vote(1, "post", 1, 1)
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", "snapshot")
+    assert services._lookup(_reload(), "posts", 1)["votes"] == 1
+    services.apply_vote(2, "post", 1, 1)
+    assert not journal_mode.exists()
+    assert services._lookup(_reload(), "posts", 1)["votes"] == 2
+
+
+def _read_state():
+    return {
+        "new": [p["id"] for p in services.get_posts_page("new", 10)[0]],
+        "top": [(p["id"], p["votes"]) for p in services.get_posts_page("top", 10)[0]],
+        "board_2": [p["id"] for p in services.get_posts_page("new", 10, board_id=2)[0]],
+        "boards": [(b["id"], b["post_count"]) for b in services.list_boards()],
+        "tree": [(c["id"], c["body"], [r["id"] for r in c["replies"]]) for c in services.get_comment_tree(1)],
+    }
+
+
+def test_foreign_entries_patch_the_indexes(journal_mode):
+    """Las entradas de otro proceso corrigen los índices en lugar de reconstruirlos."""
+    data = services.load_data()
+    root = services.create_comment({"body": "local", "post_id": 1, "user_id": 2})
+    _read_state()
+    idx = services._indexes
+    etag, _ = services.get_read_version(post_id=1)
+    thread = dict(idx["versions"]["comments:1"])
+
+    def _counted(ops):
+        """Como los escribe otro worker: cada entrada trae el contador del hilo."""
+        thread["n"] += 1
+        return [*ops, {"op": "put", "c": "versions", "r": dict(thread)}]
+
+    post = {**services._lookup(data, "posts", 1), "votes": 7, "score": 7, "board_id": 2}
+    stamp = "2030-01-01T00:00:00+00:00"
+    remote = {"id": 100, "post_id": 1, "parent_id": root["id"], "user_id": 3, "body": "remoto", "created_at": stamp,
+              "created_epoch": 1893456000.0}
+    for ops in (
+        [
+            {"op": "put", "c": "sequences", "r": {"id": "comments", "last": 101}},
+            {"op": "put", "c": "posts", "r": post},
+            {"op": "put", "c": "comments", "r": remote},
+        ],
+        [{"op": "put", "c": "comments", "r": {**remote, "body": "editado"}}],
+        [{"op": "put", "c": "comments", "r": {**remote, "id": 101, "parent_id": None, "body": "otro"}}],
+        [{"op": "del", "c": "comments", "ids": [root["id"]]}],
+    ):
+        journal.append_entry(journal_mode, journal.encode_entry(_counted(ops)), fsync=False)
+
+    patched = _read_state()
+    assert services.load_data() is data
+    assert services._indexes is idx
+    assert services.get_read_version(post_id=1)[0] != etag
+    assert services._indexes["versions"]["comments:1"]["n"] == thread["n"]
+    assert patched["top"][0] == (1, 7)
+    assert 1 in patched["board_2"]
+
+    services._drop_indexes()
+    assert _read_state() == patched
@@ -0,0 +1,109 @@
+# tests/test_karma_materialized.py
+"""
+Tests para el karma materializado (post_karma / comment_karma en el perfil).
+
+apply_vote y los borrados en cascada lo ajustan por delta; el valor debe
+coincidir siempre con el cálculo al vuelo (_scan_user_karma), que también
+usa rebuild_user_karma para repararlo.
+"""
+import random
+
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _assert_matches_scan():
+    data = services.load_data()
+    for user in data["users"]:
+        expected = services._scan_user_karma(data, user["id"])
+        assert services._user_karma(data, user) == expected, user["id"]
+
+
+def _seed_content():
+    """Posts y comentarios de distintos autores sobre los dos boards."""
+    posts = [
+        services.create_post({"title": f"p{i}", "body": "x", "board_id": 1 + i % 2, "user_id": 1 + i % 3})
+        for i in range(4)
+    ]
+    comments = [
+        services.create_comment({"body": f"c{i}", "post_id": posts[i % 4]["id"], "user_id": 1 + (i + 1) % 3})
+        for i in range(6)
+    ]
+    return posts, comments
+
+
+def test_votes_update_author_karma(temp_data_path):
+    comment = services.create_comment({"body": "x", "post_id": 1, "user_id": 2})
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 1)
+    services.apply_vote(1, "comment", comment["id"], -1)
+    assert services.calculate_user_karma(3) == {"post_karma": 2, "comment_karma": 0, "karma": 2}
+    assert services.calculate_user_karma(2) == {"post_karma": 0, "comment_karma": -1, "karma": -1}
+
+    services.apply_vote(2, "post", 1, -1)
+    services.apply_vote(1, "comment", comment["id"], 0)
+    assert services.calculate_user_karma(3)["post_karma"] == 0
+    assert services.calculate_user_karma(2)["comment_karma"] == 0
+    user = services._lookup(services.load_data(), "users", 3)
+    assert (user["post_karma"], user["comment_karma"]) == (0, 0)
+
+
+def test_random_operations_keep_karma_consistent(temp_data_path):
+    rng = random.Random(7)
+    posts, comments = _seed_content()
+    targets = [("post", p["id"]) for p in posts] + [("comment", c["id"]) for c in comments]
+    for _ in range(60):
+        kind, target_id = rng.choice(targets)
+        try:
+            services.apply_vote(rng.randint(1, 3), kind, target_id, rng.choice((-1, 0, 1)))
+        except ValueError:
+            pass  # target deleted below
+        roll = rng.random()
+        if roll < 0.05:
+            services.delete_comment(rng.choice(comments)["id"])
+        elif roll < 0.08:
+            services.delete_post(rng.choice(posts)["id"])
+        _assert_matches_scan()
+    services.delete_board(2)
+    _assert_matches_scan()
+    services.delete_user(1)
+    _assert_matches_scan()
+
+
+def test_reads_do_not_scan(temp_data_path, monkeypatch):
+    services.apply_vote(1, "post", 1, 1)
+
+    def _no_scan(*args):
+        raise AssertionError("karma was recomputed")
+
+    monkeypatch.setattr(services, "_scan_user_karma", _no_scan)
+    assert services.calculate_user_karma(3)["karma"] == 1
+
+
+def test_rebuild_matches_on_the_fly_calculation(temp_data_path):
+    posts, comments = _seed_content()
+    services.apply_vote(1, "post", posts[1]["id"], 1)
+    services.apply_vote(3, "comment", comments[0]["id"], -1)
+    data = services.load_data()
+    for user in data["users"]:
+        user.pop("post_karma", None)
+        user.pop("comment_karma", None)
+    services._lookup(data, "users", 2)["post_karma"] = 99
+    services.save_data(data)
+
+    assert services.rebuild_user_karma() == 3
+    _assert_matches_scan()
+    data = services.load_data()
+    assert all("post_karma" in u and "comment_karma" in u for u in data["users"])
+    assert services.rebuild_user_karma() == 0
+
+
+def test_admin_rebuild_endpoint(client: TestClient):
+    token = client.post(
+        "/auth/login", data={"username": "admin@example.com", "password": "Aa123456!"}
+    ).json()["access_token"]
+    r = client.post("/admin/maintenance/karma", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert r.json() == {"repaired": 3, "detail": "User karma rebuilt"}
+    assert client.post("/admin/maintenance/karma").status_code == 401
@@ -0,0 +1,183 @@
+# tests/test_post_feeds.py
+"""
+Tests para los feeds ordenados precalculados (new/top/hot, globales y
+por board) que usan get_posts_sorted y get_posts_page.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _ids(posts):
+    return [p["id"] for p in posts]
+
+
+def _reference_order(sort, board_id=None):
+    """Orden esperado calculado a la antigua: ordenar la lista completa."""
+    posts = [p for p in services.get_posts() if board_id is None or p.get("board_id") == board_id]
+    if sort == "top":
+        return _ids(sorted(posts, key=lambda p: p.get("votes", 0), reverse=True))
+    if sort == "hot":
+        now = services._index(services.load_data())["hot_now"]
+        return _ids(sorted(posts, key=lambda p: services._hot_score(p, now=now), reverse=True))
+    return _ids(sorted(posts, key=lambda p: services._timestamp_epoch(p["created_at"]), reverse=True))
+
+
+def _seed():
+    posts = [
+        services.create_post({"title": f"P{i}", "body": "x", "board_id": 1 + i % 2, "user_id": 2})
+        for i in range(5)
+    ]
+    services.apply_vote(1, "post", posts[0]["id"], 1)
+    services.apply_vote(2, "post", posts[0]["id"], 1)
+    services.apply_vote(1, "post", posts[3]["id"], 1)
+    services.apply_vote(1, "post", posts[4]["id"], -1)
+    return posts
+
+
+def test_feeds_match_full_sort(temp_data_path):
+    _seed()
+    for sort in ("new", "top", "hot"):
+        assert _ids(services.get_posts_sorted(sort)) == _reference_order(sort), sort
+        for board_id in (1, 2):
+            got = _ids(services.get_posts_sorted(sort, board_id=board_id))
+            assert got == _reference_order(sort, board_id), (sort, board_id)
+
+
+def test_vote_reranks_top_feed(temp_data_path):
+    posts = _seed()
+    last = posts[4]["id"]
+    assert _ids(services.get_posts_sorted("top"))[-1] == last
+    for user_id in (1, 2, 3):
+        services.apply_vote(user_id, "post", last, 1)
+    assert _ids(services.get_posts_sorted("top"))[0] == last
+
+
+def test_delete_post_leaves_feeds(temp_data_path):
+    posts = _seed()
+    services.delete_post(posts[0]["id"])
+    for sort in ("new", "top", "hot"):
+        assert posts[0]["id"] not in _ids(services.get_posts_sorted(sort))
+
+
+def test_page_builds_only_page_posts(temp_data_path, monkeypatch):
+    _seed()
+    built = []
+    original = services._build_post_summary
+
+    def _spy(data, entry):
+        built.append(entry["id"])
+        return original(data, entry)
+
+    monkeypatch.setattr(services, "_build_post_summary", _spy)
+    page, next_cursor = services.get_posts_page("top", 2, include_comments=False)
+    assert next_cursor is not None
+    assert built == _ids(page) == _reference_order("top")[:2]
+
+
+def test_hot_scores_frozen_within_bucket(temp_data_path, monkeypatch):
+    """El feed hot se recalcula al cambiar de intervalo, no en cada llamada."""
+    frozen = services._hot_bucket_now()
+    monkeypatch.setattr(services, "_hot_bucket_now", lambda: frozen)
+    _seed()
+    services.get_posts_sorted("hot")
+    calls = []
+    original = services._hot_score
+
+    def _spy(post, now=None):
+        calls.append(post.get("id"))
+        return original(post, now=now)
+
+    monkeypatch.setattr(services, "_hot_score", _spy)
+    services.get_posts_sorted("hot")
+    assert calls == []
+
+    later = frozen + timedelta(seconds=services.HOT_SCORE_BUCKET_SECONDS)
+    monkeypatch.setattr(services, "_hot_bucket_now", lambda: later)
+    services.get_posts_sorted("hot")
+    assert len(calls) >= len(services.load_data()["posts"])
+    assert services._indexes["hot_now"] == later
+
+
+def test_hot_bucket_is_aligned():
+    now = services._hot_bucket_now()
+    assert now.tzinfo == timezone.utc
+    assert now.timestamp() % services.HOT_SCORE_BUCKET_SECONDS == 0
+    assert datetime.now(timezone.utc) - now < timedelta(seconds=services.HOT_SCORE_BUCKET_SECONDS + 1)
+
+
+def _walk(sort, limit, **kwargs):
+    """Recorre el feed completo página a página con el cursor opaco."""
+    ids, cursor = [], None
+    while True:
+        page, cursor = services.get_posts_page(sort, limit, cursor=cursor, **kwargs)
+        ids.extend(_ids(page))
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["new", "top", "hot"])
+def test_keyset_pages_cover_feed(temp_data_path, sort):
+    _seed()
+    assert _walk(sort, 2) == _reference_order(sort)
+    assert _walk(sort, 1, board_id=1) == _reference_order(sort, board_id=1)
+
+
+def test_keyset_page_stable_while_votes_change(temp_data_path):
+    """Un post que sube por votos tras la página 1 no se repite ni desplaza."""
+    posts = _seed()
+    first, cursor = services.get_posts_page("top", 3)
+    rest_before = _ids(services.get_posts_page("top", None, cursor=cursor)[0])
+
+    climber = rest_before[-1]
+    for user_id in (1, 2, 3):
+        services.apply_vote(user_id, "post", climber, 1)
+
+    rest_after = _ids(services.get_posts_page("top", None, cursor=cursor)[0])
+    assert rest_after == [pid for pid in rest_before if pid != climber]
+    assert not set(rest_after) & set(_ids(first))
+    assert len(posts) + 2 == len(_ids(first)) + len(rest_before)
+
+
+def test_hot_cursor_survives_a_bucket_rollover(temp_data_path, monkeypatch):
+    """Un cursor hot emitido antes de recalcular los scores retoma tras su último post."""
+    _seed()
+    order = _reference_order("hot")
+    first, cursor = services.get_posts_page("hot", 2)
+    later = services._hot_bucket_now() + timedelta(days=1)
+    monkeypatch.setattr(services, "_hot_bucket_now", lambda: later)
+
+    rest = _ids(services.get_posts_page("hot", None, cursor=cursor)[0])
+    assert _ids(first) + rest == order == _reference_order("hot")
+
+    services.delete_post(_ids(first)[-1])
+    with pytest.raises(ValueError, match="invalid_cursor"):
+        services.get_posts_page("hot", None, cursor=cursor)
+
+
+def test_cursor_rejected_for_other_sort(temp_data_path):
+    _seed()
+    _, cursor = services.get_posts_page("top", 1)
+    with pytest.raises(ValueError, match="invalid_cursor"):
+        services.get_posts_page("new", 1, cursor=cursor)
+    with pytest.raises(ValueError, match="invalid_cursor"):
+        services.get_posts_page("top", 1, cursor="not-a-cursor")
+
+
+def test_list_posts_cursor_roundtrip(client: TestClient):
+    _seed()
+    r = client.get("/posts?sort=top&limit=2&include_comments=false")
+    assert r.status_code == 200
+    body = r.json()
+    assert isinstance(body["next_cursor"], str)
+    r2 = client.get(f"/posts?sort=top&limit=100&cursor={body['next_cursor']}")
+    assert r2.status_code == 200
+    ids = _ids(body["items"]) + _ids(r2.json()["items"])
+    assert ids == _reference_order("top")
+    assert r2.json()["next_cursor"] is None
+
+    assert client.get("/posts?cursor=garbage").status_code == 400
+    assert client.get(f"/posts?sort=hot&cursor={body['next_cursor']}").status_code == 400
@@ -0,0 +1,64 @@
+# tests/test_post_summary.py
+"""
+Tests para la proyección resumida de posts (sin árbol de comentarios).
+
+get_post_summaries / get_post_summary y GET /posts?include_comments=false
+deben retornar comment_count desde el índice sin construir árboles ni
+hacer deepcopy.
+"""
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _seed_comments():
+    parent = services.create_comment({"body": "root", "post_id": 2, "user_id": 2})
+    services.create_comment({"body": "reply", "post_id": 2, "user_id": 3, "parent_id": parent["id"]})
+    services.create_comment({"body": "other", "post_id": 1, "user_id": 3})
+
+
+def test_summaries_skip_comment_trees(temp_data_path, monkeypatch):
+    """Ni build_comment_tree ni deepcopy se invocan en la proyección resumida."""
+    _seed_comments()
+
+    def _forbidden(*args, **kwargs):
+        raise AssertionError("summary projection must not build trees or deep-copy")
+
+    monkeypatch.setattr(services, "build_comment_tree", _forbidden)
+    monkeypatch.setattr(services, "deepcopy", _forbidden)
+
+    summaries = services.get_post_summaries()
+    assert [p["id"] for p in summaries] == [1, 2]
+    assert [p["comment_count"] for p in summaries] == [1, 2]
+    assert all(p["comments"] == [] for p in summaries)
+    assert services.get_post_summary(2)["comment_count"] == 2
+    assert services.get_post_summary(999) is None
+
+
+def test_summaries_match_full_posts_except_comments(temp_data_path):
+    _seed_comments()
+    full = {p["id"]: p for p in services.get_posts()}
+    for summary in services.get_post_summaries():
+        expected = dict(full[summary["id"]], comments=[])
+        assert summary == expected
+
+
+def test_summaries_filter_by_board(temp_data_path):
+    post = services.create_post({"title": "B2", "body": "x", "board_id": 2, "user_id": 2})
+    ids = [p["id"] for p in services.get_post_summaries(board_id=2)]
+    assert post["id"] in ids
+    assert all(p["board_id"] == 2 for p in services.get_post_summaries(board_id=2))
+
+
+def test_list_posts_without_comments(client: TestClient):
+    _seed_comments()
+    r = client.get("/posts?include_comments=false&limit=100")
+    assert r.status_code == 200
+    items = {item["id"]: item for item in r.json()["items"]}
+    assert items[2]["comment_count"] == 2
+    assert items[2]["comments"] == []
+
+    r_full = client.get("/posts?limit=100")
+    full = {item["id"]: item for item in r_full.json()["items"]}
+    assert len(full[2]["comments"]) == 1
+    assert list(full) == list(items)
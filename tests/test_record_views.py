@@ -0,0 +1,57 @@
+# tests/test_record_views.py
+"""
+Tests para las vistas de solo lectura (RecordView) que retornan las
+lecturas de posts, boards y comentarios en lugar de copias profundas.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+from app_v1.utils.views import RecordView
+
+
+def test_view_overlays_and_keeps_base_order():
+    base = {"id": 1, "votes": 3, "title": "x"}
+    view = RecordView(base, {"votes": 5, "comment_count": 0})
+    assert list(view) == ["id", "votes", "title", "comment_count"]
+    assert view["votes"] == 5 and view.get("missing") is None
+    assert len(view) == 4 and "title" in view
+    assert view.to_dict() == {**base, "votes": 5, "comment_count": 0}
+    with pytest.raises(TypeError):
+        view["title"] = "y"
+    assert base == {"id": 1, "votes": 3, "title": "x"}
+
+
+def test_reads_do_not_deepcopy(temp_data_path, monkeypatch):
+    parent = services.create_comment({"body": "a", "post_id": 1, "user_id": 2})
+    services.create_comment({"body": "b", "post_id": 1, "user_id": 3, "parent_id": parent["id"]})
+
+    def _boom(*args, **kwargs):
+        raise AssertionError("deepcopy on read path")
+
+    monkeypatch.setattr(services, "deepcopy", _boom)
+    posts = services.get_posts()
+    assert posts[0]["comments"][0]["replies"][0]["depth"] == 1
+    assert services.get_post(1)["comment_count"] == 2
+    assert [b["post_count"] for b in services.list_boards()] == [1, 1]
+    assert services.get_comment(parent["id"])["body"] == "a"
+    assert len(services.get_comments()) == 2
+
+
+def test_views_leave_document_untouched(temp_data_path):
+    post = services.get_post(1)
+    assert isinstance(post, RecordView)
+    stored = services._lookup(services.load_data(), "posts", 1)
+    assert "comment_count" not in stored and "tags" not in stored
+    assert post["tags"] == [] and post["comments"] == []
+
+
+def test_endpoints_serialize_views(client: TestClient):
+    services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+    r = client.get("/posts/1")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["comment_count"] == 1
+    assert body["comments"][0]["body"] == "hola"
+    boards = client.get("/boards").json()
+    assert {"id": 1, "post_count": 1}.items() <= boards["items"][0].items()
@@ -0,0 +1,65 @@
+# tests/test_sequences.py
+"""
+Tests para los contadores de ID por colección (_allocate_id).
+
+Los IDs se asignan en O(1) desde data["sequences"], son monótonos (no se
+reutilizan tras borrar el más alto) y sobreviven a una recarga.
+"""
+import pytest
+
+import app_v1.services as services
+
+
+def _reload():
+    services._invalidate_cache()
+    return services.load_data()
+
+
+def _counter(data, collection):
+    return next(s["last"] for s in data["sequences"] if s["id"] == collection)
+
+
+def test_counter_starts_from_legacy_max(temp_data_path):
+    """El seed no trae contadores: el primero parte del máximo ID existente."""
+    assert not services.load_data().get("sequences")
+    post = services.create_post({"title": "t", "body": "b", "board_id": 1, "user_id": 3})
+    assert post["id"] == 3
+    assert _counter(services.load_data(), "posts") == 3
+
+
+def test_ids_are_not_reused_after_delete(temp_data_path):
+    post = services.create_post({"title": "t", "body": "b", "board_id": 1, "user_id": 3})
+    services.delete_post(post["id"])
+    again = services.create_post({"title": "t2", "body": "b", "board_id": 1, "user_id": 3})
+    assert again["id"] == post["id"] + 1
+
+
+@pytest.mark.parametrize("mode", ["snapshot", "journal"])
+def test_counters_survive_reload(temp_data_path, monkeypatch, mode):
+    monkeypatch.setattr(services, "PERSISTENCE_MODE", mode)
+    comment = services.create_comment({"body": "x", "post_id": 1, "user_id": 3})
+    services.delete_comment(comment["id"])
+    report = services.moderation_report_create(3, "post", 1, "spam")
+
+    data = _reload()
+    assert _counter(data, "comments") == comment["id"]
+    assert _counter(data, "moderation.reports") == report["id"]
+    assert services.create_comment({"body": "y", "post_id": 1, "user_id": 3})["id"] == comment["id"] + 1
+
+
+def test_allocation_does_not_scan_collection(temp_data_path, monkeypatch):
+    services.create_board({"name": "first", "description": ""})
+    calls = []
+    monkeypatch.setattr(services, "_next_id", lambda *a, **k: calls.append(1) or 1)
+    ids = [services.create_board({"name": f"b{i}", "description": ""})["id"] for i in range(3)]
+    assert calls == []
+    assert ids == [4, 5, 6]
+
+
+def test_save_data_advances_stale_counters(temp_data_path):
+    """Registros añadidos por fuera de la capa no provocan IDs duplicados."""
+    services.create_board({"name": "x", "description": ""})
+    data = services.load_data()
+    data["boards"].append({"id": 40, "name": "manual", "description": ""})
+    services.save_data(data)
+    assert services.create_board({"name": "y", "description": ""})["id"] == 41
@@ -0,0 +1,147 @@
+# tests/test_sqlite_store.py
+"""
+Tests para el backend SQLite (DATA_BACKEND=sqlite).
+
+Los commits aplican solo los registros modificados en la base; otros
+procesos (aquí, otra conexión/hilo) se ponen al día con la tabla changes.
+"""
+import json
+import threading
+
+import pytest
+
+import app_v1.services as services
+from app_v1.utils import sqlite_store
+
+
+@pytest.fixture
+def sqlite_mode(temp_data_path, monkeypatch):
+    path = temp_data_path.with_suffix(".sqlite3")
+    seed = json.loads(json.dumps(services.load_data()))
+    monkeypatch.setattr(services, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(services, "SQLITE_PATH", str(path))
+    services.save_data(seed)
+    return path
+
+
+def _reload():
+    services._invalidate_cache()
+    return services.load_data()
+
+
+def _in_other_thread(fn):
+    """Ejecuta fn en otro hilo, con su propia conexión SQLite."""
+    out = {}
+    thread = threading.Thread(target=lambda: out.setdefault("value", fn()))
+    thread.start()
+    thread.join()
+    return out["value"]
+
+
+def test_roundtrip_preserves_document(sqlite_mode):
+    services.apply_vote(1, "post", 1, 1)
+    comment = services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+    services.moderation_report_create(1, "post", 2, "spam")
+    before = services.load_data()
+
+    data = _reload()
+    assert data is not before
+    assert [u["id"] for u in data["users"]] == [u["id"] for u in before["users"]]
+    assert services._lookup(data, "posts", 1)["votes"] == 1
+    assert services._lookup(data, "comments", comment["id"])["body"] == "hola"
+    assert [r["target_id"] for r in data["moderation"]["reports"]] == [2]
+
+
+def test_commit_writes_only_changed_records(sqlite_mode):
+    seq = sqlite_store.head(sqlite_mode)
+    services.apply_vote(1, "post", 1, 1)
+    ops, new_seq = sqlite_store.changes_since(sqlite_mode, seq)
+    assert {(op["c"], op["r"]["id"]) for op in ops} == {
+        ("sequences", "votes"), ("votes", 1), ("posts", 1), ("users", 3),
+        ("versions", "votes"), ("versions", "posts"), ("versions", "users"),
+    }
+    assert new_seq == seq + len(ops)
+
+
+def test_deletes_are_persisted(sqlite_mode):
+    comment = services.create_comment({"body": "x", "post_id": 2, "user_id": 3})
+    services.delete_post(2)
+    data = _reload()
+    assert services._lookup(data, "posts", 2) is None
+    assert services._lookup(data, "comments", comment["id"]) is None
+
+
+def test_foreign_commits_are_applied_incrementally(sqlite_mode):
+    """Cambios de otra conexión se aplican sobre el documento cacheado."""
+    data = services.load_data()
+    board = {"id": 50, "name": "Remote", "description": ""}
+    _in_other_thread(lambda: sqlite_store.apply(sqlite_mode, [{"op": "put", "c": "boards", "r": board}]))
+    assert services.load_data() is data
+    assert services.get_board(50)["name"] == "Remote"
+
+
+def test_foreign_commits_patch_the_indexes(sqlite_mode):
+    data = services.load_data()
+    services.get_posts_page("top", 10)
+    idx = services._indexes
+    post = {**services._lookup(data, "posts", 2), "votes": 9, "score": 9}
+    _in_other_thread(lambda: sqlite_store.apply(sqlite_mode, [{"op": "put", "c": "posts", "r": post}]))
+
+    assert [p["id"] for p in services.get_posts_page("top", 10)[0]] == [2, 1]
+    assert services.load_data() is data
+    assert services._indexes is idx
+
+
+def test_pruned_changes_force_full_reload(sqlite_mode):
+    """Si los cambios pendientes ya se podaron, se relee la base completa."""
+    data = services.load_data()
+    seen = sqlite_store.head(sqlite_mode)
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 1)
+    sqlite_store.connect(sqlite_mode).execute("DELETE FROM changes WHERE seq <= ?", (seen + 2,))
+    services._cache["stamp"] = (services._cache["stamp"][0], seen)
+    reloaded = services.load_data()
+    assert reloaded is not data
+    assert services._lookup(reloaded, "posts", 1)["votes"] == 2
+
+
+def test_changes_log_stays_bounded_with_multi_op_commits(sqlite_mode, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "CHANGES_RETAINED", 50)
+    for i in range(100):
+        # Each vote commits several ops (vote, post, author, sequence)
+        services.apply_vote(1, "post", 1, 1 if i % 2 else -1)
+    conn = sqlite_store.connect(sqlite_mode)
+    count, oldest = conn.execute("SELECT COUNT(*), MIN(seq) FROM changes").fetchone()
+    head = sqlite_store.head(sqlite_mode)
+    assert head > 200
+    assert count <= 50
+    assert oldest == head - count + 1
+
+
+def test_no_indexes_on_document_fields(sqlite_mode):
+    """Las lecturas salen del documento en memoria: no se mantienen índices sobre doc."""
+    conn = sqlite_store.connect(sqlite_mode)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {name for name in names if not name.startswith("sqlite_autoindex")} == {"idx_records_pos"}
+
+
+def test_migrate_copies_snapshot_and_journal(temp_data_path, tmp_path, capsys):
+    journal_path = services._journal_path()
+    journal_path.write_bytes(
+        services.journal.encode_entry([{"op": "put", "c": "boards", "r": {"id": 9, "name": "J"}}])
+    )
+    target = tmp_path / "migrated.sqlite3"
+    try:
+        assert sqlite_store.main([str(temp_data_path), str(target)]) == 0
+    finally:
+        journal_path.unlink()
+    assert "boards: 3" in capsys.readouterr().out
+
+    data, _ = sqlite_store.load(target, services.EMPTY_STRUCTURE)
+    assert [b["id"] for b in data["boards"]] == [1, 2, 9]
+    assert [u["username"] for u in data["users"]] == ["admin", "mod", "alice"]
+
+    with pytest.raises(FileExistsError):
+        sqlite_store.migrate(temp_data_path, target)
+    sqlite_store.migrate(temp_data_path, target, force=True)
+    assert [b["id"] for b in sqlite_store.load(target, {})[0]["boards"]] == [1, 2]
@@ -0,0 +1,91 @@
+# tests/test_timestamps.py
+"""
+Tests para las fechas normalizadas al escribir: created_at/updated_at se
+guardan ya normalizados junto con created_epoch, las lecturas no vuelven
+a parsearlos y migrate_timestamps() migra los registros heredados.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _legacy_post(post_id=99):
+    """Persiste un post escrito antes de que existiera created_epoch."""
+    data = services.load_data()
+    data["posts"].append({
+        "id": post_id, "title": "Viejo", "body": "x", "board_id": 1, "user_id": 3,
+        "created_at": "2024-01-15T12:00:00Z", "updated_at": "2024-01-16",
+    })
+    # _write_document() skips the migration that save_data() applies
+    services._write_document(data)
+    services._drop_indexes()
+    return data
+
+
+def _no_parsing(monkeypatch):
+    def _boom(*args, **kwargs):
+        raise AssertionError("timestamp parsed on read")
+
+    monkeypatch.setattr(services, "_normalize_timestamp", _boom)
+    monkeypatch.setattr(services, "_timestamp_epoch", _boom)
+
+
+def test_writes_store_normalized_dates_and_epoch(temp_data_path):
+    board = services.create_board({"name": "B", "created_at": "2024-03-01"})
+    assert board["created_at"] == "2024-03-01T00:00:00+00:00"
+    assert board["created_epoch"] == services._timestamp_epoch("2024-03-01T00:00:00+00:00")
+
+    comment = services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+    services.update_comment(comment["id"], "editado")
+    stored = services._lookup(services.load_data(), "comments", comment["id"])
+    assert stored["created_epoch"] == services._timestamp_epoch(stored["created_at"])
+    assert stored["updated_at"].endswith("+00:00")
+
+
+def test_reads_and_feeds_do_not_parse_dates(temp_data_path, monkeypatch):
+    services.create_comment({"body": "hola", "post_id": 1, "user_id": 2})
+    services._drop_indexes()
+    _no_parsing(monkeypatch)
+    assert len(services.get_posts()) == 2
+    assert len(services.list_boards()) == 2
+    assert len(services.get_comments()) == 1
+    for sort in ("new", "top", "hot"):
+        assert len(services.get_posts_sorted(sort)) == 2
+
+
+def test_legacy_records_are_normalized_on_read(temp_data_path):
+    _legacy_post()
+    post = services.get_post(99)
+    assert post["created_at"] == "2024-01-15T12:00:00+00:00"
+    assert post["updated_at"] == "2024-01-16T00:00:00+00:00"
+    assert services.get_posts_sorted("new")[-1]["id"] == 99
+
+
+def test_migrate_timestamps_persists(temp_data_path, monkeypatch):
+    _legacy_post()
+    assert services.migrate_timestamps() == 1
+    assert services.migrate_timestamps() == 0
+
+    services._invalidate_cache()
+    stored = services._lookup(services.load_data(), "posts", 99)
+    assert stored["created_at"] == "2024-01-15T12:00:00+00:00"
+    assert stored["created_epoch"] == pytest.approx(1705320000.0)
+    _no_parsing(monkeypatch)
+    assert services.get_post(99)["updated_at"] == "2024-01-16T00:00:00+00:00"
+
+
+def test_api_hides_epoch_and_migration_endpoint(client: TestClient):
+    body = client.get("/posts/1").json()
+    assert "created_epoch" not in body
+    stored = services._lookup(services.load_data(), "posts", 1)
+    assert body["created_at"][:19] == stored["created_at"][:19]
+
+    _legacy_post()
+    token = client.post(
+        "/auth/login", data={"username": "admin@example.com", "password": "Aa123456!"}
+    ).json()["access_token"]
+    r = client.post("/admin/maintenance/timestamps", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert r.json() == {"migrated": 1, "detail": "Timestamps migrated"}
+    assert client.post("/admin/maintenance/timestamps").status_code == 401
@@ -0,0 +1,75 @@
+# tests/test_user_enrichment.py
+"""
+Tests para get_users_enrichment: posts y karma de una página de usuarios
+en una sola llamada, usada por GET /users y GET /admin/users.
+"""
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+from app_v1.routers import admin as admin_router
+from app_v1.routers import users as users_router
+
+
+def _admin_headers(client):
+    token = client.post(
+        "/auth/login", data={"username": "admin@example.com", "password": "Aa123456!"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_enrichment_matches_per_user_calculation(temp_data_path):
+    extra = services.create_post({"title": "m", "body": "x", "board_id": 1, "user_id": 2})
+    comment = services.create_comment({"body": "c", "post_id": 1, "user_id": 2})
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(3, "comment", comment["id"], -1)
+    services.apply_vote(1, "post", extra["id"], 1)
+
+    enrichment = services.get_users_enrichment([1, 2, 3, 404])
+    all_posts = services.get_posts()
+    for user_id in (1, 2, 3, 404):
+        expected_posts = [p["id"] for p in all_posts if p.get("user_id") == user_id]
+        assert enrichment[user_id] == {"posts": expected_posts, **services.calculate_user_karma(user_id)}
+    assert enrichment[2]["karma"] == 0 and enrichment[2]["post_karma"] == 1
+
+
+def _spy_enrichment(monkeypatch, module):
+    calls = []
+    original = services.get_users_enrichment
+
+    def _spy(user_ids):
+        calls.append(list(user_ids))
+        return original(user_ids)
+
+    def _forbidden(*args, **kwargs):
+        raise AssertionError("listing must not build posts")
+
+    monkeypatch.setattr(module, "get_users_enrichment", _spy)
+    monkeypatch.setattr(services, "get_posts", _forbidden)
+    return calls
+
+
+def test_list_users_enriches_page_once(client: TestClient, monkeypatch):
+    services.apply_vote(1, "post", 2, 1)
+    calls = _spy_enrichment(monkeypatch, users_router)
+    r = client.get("/users?limit=2")
+    assert r.status_code == 200
+    assert calls == [[1, 2]]
+    items = r.json()["items"]
+    assert [u["id"] for u in items] == [1, 2]
+    assert all("password" not in u for u in items)
+
+    r = client.get("/users/3")
+    assert r.json()["posts"] == [1, 2]
+    assert r.json()["karma"] == 1
+
+
+def test_admin_list_users_includes_karma_and_posts(client: TestClient, monkeypatch):
+    services.apply_vote(2, "post", 1, 1)
+    headers = _admin_headers(client)
+    calls = _spy_enrichment(monkeypatch, admin_router)
+    r = client.get("/admin/users", headers=headers)
+    assert r.status_code == 200
+    assert calls == [[1, 2, 3]]
+    alice = next(u for u in r.json()["items"] if u["id"] == 3)
+    assert alice["posts"] == [1, 2]
+    assert (alice["post_karma"], alice["karma"]) == (1, 1)
@@ -0,0 +1,114 @@
+# tests/test_vote_counters.py
+"""
+Tests para los contadores de votos denormalizados (upvotes/downvotes) de
+posts y comentarios: apply_vote los ajusta por delta, get_vote_summary
+los lee en O(1) y rebuild_vote_counters los repara.
+"""
+from fastapi.testclient import TestClient
+
+import app_v1.services as services
+
+
+def _post(post_id):
+    return services._lookup(services.load_data(), "posts", post_id)
+
+
+def _counters(entity):
+    return entity["upvotes"], entity["downvotes"], entity["votes"], entity["score"]
+
+
+def test_counters_follow_create_flip_and_remove(temp_data_path):
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 1)
+    services.apply_vote(3, "post", 1, -1)
+    assert _counters(_post(1)) == (2, 1, 1, 1)
+
+    services.apply_vote(2, "post", 1, -1)
+    assert _counters(_post(1)) == (1, 2, -1, -1)
+
+    result = services.apply_vote(3, "post", 1, 0)
+    assert _counters(_post(1)) == (1, 1, 0, 0)
+    assert (result["score"], result["upvotes"], result["downvotes"]) == (0, 1, 1)
+
+
+def test_repeated_vote_is_idempotent(temp_data_path):
+    comment = services.create_comment({"body": "x", "post_id": 1, "user_id": 3})
+    for _ in range(3):
+        services.apply_vote(1, "comment", comment["id"], 1)
+    entity = services._lookup(services.load_data(), "comments", comment["id"])
+    assert _counters(entity) == (1, 0, 1, 1)
+
+
+def test_unchanged_vote_leaves_the_entity_alone(temp_data_path, monkeypatch):
+    services.apply_vote(1, "post", 1, 1)
+    idx = services._index(services.load_data())
+    version = idx["versions"]["posts"]["n"]
+    updated = []
+    real_update = services._update_record
+
+    def _spy(data, collection, record, changes, **kwargs):
+        updated.append(collection)
+        return real_update(data, collection, record, changes, **kwargs)
+
+    monkeypatch.setattr(services, "_update_record", _spy)
+    result = services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 1, 0)  # removing a vote that never existed
+    assert "posts" not in updated
+    assert services._index(services.load_data())["versions"]["posts"]["n"] == version
+    assert (result["score"], result["upvotes"], result["downvotes"]) == (1, 1, 0)
+
+
+def test_summary_reads_counters_without_scanning_votes(temp_data_path, monkeypatch):
+    services.apply_vote(1, "post", 2, 1)
+    services.apply_vote(2, "post", 2, -1)
+
+    def _no_scan(*args):
+        raise AssertionError("votes were re-aggregated")
+
+    monkeypatch.setattr(services, "_aggregate_vote_stats", _no_scan)
+    summary = services.get_vote_summary("post", 2, user_id=2)
+    assert (summary["score"], summary["upvotes"], summary["downvotes"]) == (0, 1, 1)
+    assert summary["user_vote"] == -1
+
+
+def test_legacy_entity_without_counters(temp_data_path):
+    """Un post con votos pero sin contadores los inicializa desde sus votos."""
+    data = services.load_data()
+    data["votes"] = [
+        {"id": 1, "user_id": 1, "target_type": "post", "target_id": 1, "value": 1},
+        {"id": 2, "user_id": 2, "target_type": "post", "target_id": 1, "value": 1},
+    ]
+    services.save_data(data)
+    assert services.get_vote_summary("post", 1)["upvotes"] == 2
+    services.apply_vote(3, "post", 1, -1)
+    assert _counters(_post(1)) == (2, 1, 1, 1)
+
+
+def test_delete_user_discounts_their_votes(temp_data_path):
+    services.apply_vote(2, "post", 1, 1)
+    services.apply_vote(1, "post", 1, -1)
+    services.delete_user(2)
+    assert _counters(_post(1)) == (0, 1, -1, -1)
+
+
+def test_rebuild_repairs_drift(temp_data_path):
+    services.apply_vote(1, "post", 1, 1)
+    services.apply_vote(2, "post", 2, -1)
+    data = services.load_data()
+    services._lookup(data, "posts", 1).update({"upvotes": 40, "votes": 40, "score": 40})
+    services.save_data(data)
+
+    assert services.rebuild_vote_counters() == 1
+    assert _counters(_post(1)) == (1, 0, 1, 1)
+    assert _counters(_post(2)) == (0, 1, -1, -1)
+    assert services.rebuild_vote_counters() == 0
+
+
+def test_admin_rebuild_endpoint(client: TestClient):
+    token = client.post(
+        "/auth/login", data={"username": "admin@example.com", "password": "Aa123456!"}
+    ).json()["access_token"]
+    r = client.post("/admin/maintenance/vote-counters", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert r.json()["repaired"] == 2  # seeded posts had no counters yet
+    assert client.post("/admin/maintenance/vote-counters").status_code == 401